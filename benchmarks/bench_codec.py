@@ -0,0 +1,109 @@
+"""Socket framings: encode/decode throughput for status and event payloads.
+
+Builds real payloads from an in-process daemon (a ``status`` reply and the
+events a busy subscriber sees) and times a whole wire unit each way:
+JSON lines, MessagePack frames with the compiled ``msgpack`` package (when
+installed) and with the pure-Python fallback in ``atk.codec``.
+
+    python benchmarks/bench_codec.py [--count 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import miniaudio
+
+from atk import codec
+from atk.codec import FRAME_HEADER, JSON_LINES, MSGPACK, MsgpackFrames
+from atk.daemon import Daemon
+from atk.protocol import PROTOCOL_VERSION
+
+
+class _NullDevice:
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self, gen):
+        next(gen)
+
+    def close(self):
+        pass
+
+
+def _pure() -> MsgpackFrames:
+    framing = MsgpackFrames()
+    framing._packb = codec.packb
+    framing._unpackb = codec.unpackb
+    return framing
+
+
+async def _payloads() -> dict[str, dict]:
+    with tempfile.TemporaryDirectory(prefix="atk-bench-") as tmp:
+        daemon = Daemon(Path(tmp) / "rt", event_window=0)
+        daemon.queue = [f"/music/Artist {i} - Title {i}.flac" for i in range(1000)]
+        status = await daemon._cmd_status({})
+        tracks = [t.info() for t in daemon._queue.tracks(0)][:50]
+        daemon.player.close()
+    delta = {"op": "insert", "index": 0, "tracks": tracks}
+    events = {
+        "position_update": daemon._clock(),
+        "volume_changed": {"volume": 42},
+        "queue_updated (50 tracks)": {**delta, "current_index": 0, "version": 7},
+    }
+    payloads = {
+        "status reply": {"v": PROTOCOL_VERSION, "id": "b", "ok": True, "data": status}
+    }
+    for name, data in events.items():
+        event = name.split()[0]
+        payloads[name] = {"v": PROTOCOL_VERSION, "event": event, "data": data}
+    return payloads
+
+
+def _rate(fn, arg, count: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(count):
+        fn(arg)
+    return (time.perf_counter() - t0) / count
+
+
+def _payload(framing, wire: bytes) -> bytes:
+    if framing is JSON_LINES:
+        return wire[:-1]
+    return wire[FRAME_HEADER.size :]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--count", type=int, default=20000)
+    opts = ap.parse_args()
+
+    miniaudio.PlaybackDevice = _NullDevice
+    payloads = asyncio.run(_payloads())
+    framings = [("json", JSON_LINES)]
+    if MSGPACK.compiled:
+        framings.append(("msgpack", MSGPACK))
+    framings.append(("msgpack (pure)", _pure()))
+
+    head = f"{'payload':26s} {'framing':15s} {'bytes':>6s}"
+    print(f"{head} {'encode':>10s} {'decode':>10s}")
+    for name, msg in payloads.items():
+        for label, framing in framings:
+            wire = framing.encode(msg)
+            payload = _payload(framing, wire)
+            assert framing.decode(payload) == msg
+            count = max(opts.count // max(1, len(wire) // 256), 200)
+            enc = _rate(framing.encode, msg, count)
+            dec = _rate(framing.decode, payload, count)
+            print(
+                f"{name:26s} {label:15s} {len(wire):6d} "
+                f"{enc * 1e6:7.2f} us {dec * 1e6:7.2f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
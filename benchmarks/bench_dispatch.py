@@ -0,0 +1,92 @@
+"""Per-command dispatch overhead: parse, validate, route and run in-process.
+
+Drives ``Daemon._dispatch`` directly (no transport) for a set of cheap
+commands against a small queue, and separately times each command's
+compiled argument validator, so the cost of declaration-driven validation
+can be read against the whole dispatch.
+
+    python benchmarks/bench_dispatch.py [--count 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import miniaudio
+
+from atk.daemon import Daemon
+
+COMMANDS = [
+    ("ping", {}),
+    ("status", {}),
+    ("status", {"fields": ["state", "position"]}),
+    ("volume", {"level": 50}),
+    ("rate", {"speed": 1.0, "mode": "stretch"}),
+    ("repeat", {"mode": "queue"}),
+    ("queue", {"offset": 0, "limit": 10}),
+    ("info", {"index": [0, 1, 2]}),
+    ("schedule", {"action": "clear"}),
+    ("jump", {"index": 5}),
+]
+
+
+class _NullDevice:
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self, gen):
+        next(gen)
+
+    def close(self):
+        pass
+
+
+async def _time(fn, count: int) -> list[float]:
+    lat = []
+    for _ in range(count):
+        t = time.perf_counter()
+        await fn()
+        lat.append(time.perf_counter() - t)
+    return lat
+
+
+async def _run(runtime: Path, count: int) -> None:
+    daemon = Daemon(runtime, event_window=0)
+    daemon.queue = [f"/music/Artist {i} - Title {i}.flac" for i in range(1000)]
+    print(f"{'command':28s} {'dispatch p50':>13s} {'mean':>9s} {'validate':>9s}")
+    for cmd, args in COMMANDS:
+        line = json.dumps({"id": "b", "cmd": cmd, "args": args})
+        validate = daemon._commands[cmd].validate
+        lat = await _time(lambda: daemon._dispatch(line), count)
+        t0 = time.perf_counter()
+        for _ in range(count):
+            validate(args)
+        check = (time.perf_counter() - t0) / count
+        while not daemon._resp_queue.empty():
+            daemon._resp_queue.get_nowait()
+        name = f"{cmd} {','.join(args)}".strip()
+        print(
+            f"{name:28s} {statistics.median(lat) * 1e6:10.1f} us "
+            f"{statistics.fmean(lat) * 1e6:6.1f} us {check * 1e6:6.2f} us"
+        )
+    daemon.player.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--count", type=int, default=20000)
+    opts = ap.parse_args()
+
+    miniaudio.PlaybackDevice = _NullDevice
+    with tempfile.TemporaryDirectory(prefix="atk-bench-") as tmp:
+        asyncio.run(_run(Path(tmp) / "rt", opts.count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Underruns during heavy command load: in-process vs. out-of-process engine.
+
+A fake playback device pulls audio from the generator on a real-time
+schedule (like miniaudio's callback thread) and counts every period whose
+buffer was not ready by its deadline. Meanwhile the daemon's event loop is
+hammered with ``queue``/``add`` commands against a large queue.
+
+    python benchmarks/bench_engine.py [--seconds 5] [--period 256]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import miniaudio
+import numpy as np
+
+from atk import player as player_mod
+from atk.daemon import Daemon
+from atk.engine import RemotePlayer
+
+PERIOD_FRAMES = 256
+UNDERRUNS = mp.Value("i", 0)
+CALLBACKS = mp.Value("i", 0)
+
+
+class _Decoded:
+    def __init__(self, seconds: float = 600.0):
+        n = int(seconds * player_mod.SAMPLE_RATE) * player_mod.CHANNELS
+        self.samples = np.zeros(n, dtype=np.float32)
+
+
+class FakeDevice:
+    """Real-time paced consumer standing in for miniaudio.PlaybackDevice."""
+
+    def __init__(self, **kwargs):
+        self._gen = None
+        self._stop = threading.Event()
+
+    def start(self, gen):
+        self._gen = gen
+        next(gen)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        period = PERIOD_FRAMES / player_mod.SAMPLE_RATE
+        deadline = time.perf_counter() + period
+        while not self._stop.is_set():
+            try:
+                self._gen.send(PERIOD_FRAMES)
+            except StopIteration:
+                return
+            now = time.perf_counter()
+            with CALLBACKS.get_lock():
+                CALLBACKS.value += 1
+            if now > deadline:
+                with UNDERRUNS.get_lock():
+                    UNDERRUNS.value += 1
+                deadline = now
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+            deadline += period
+
+    def close(self):
+        self._stop.set()
+
+
+def _patch_audio() -> None:
+    miniaudio.PlaybackDevice = FakeDevice
+    miniaudio.decode_file = lambda path, **kw: _Decoded()
+
+
+async def _run(mode: str, seconds: float, queue_len: int, track: Path) -> dict:
+    daemon = Daemon(track.parent / f"rt-{mode}")
+    if mode == "process":
+        daemon.player.close()
+        daemon.player = RemotePlayer(mp_context="fork")
+        daemon.player.set_end_callback(daemon._on_track_end)
+        daemon.player.set_action_callback(daemon._on_scheduled_action)
+    daemon.queue = [f"/music/Artist {i} - Title {i}.flac" for i in range(queue_len)]
+    daemon.queue.insert(0, str(track))
+    await daemon._play_current()
+    await asyncio.sleep(0.5)  # settle
+
+    UNDERRUNS.value = 0
+    CALLBACKS.value = 0
+    commands = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        await daemon._dispatch('{"id": "q", "cmd": "queue", "args": {}}')
+        await daemon._dispatch(
+            '{"id": "a", "cmd": "add", "args": {"uri": "/music/x - y.flac"}}'
+        )
+        while not daemon._resp_queue.empty():
+            daemon._resp_queue.get_nowait()
+        commands += 2
+    elapsed = time.perf_counter() - start
+    result = {
+        "mode": mode,
+        "commands": commands,
+        "cmd_per_s": commands / elapsed,
+        "callbacks": CALLBACKS.value,
+        "underruns": UNDERRUNS.value,
+    }
+    daemon.player.close()
+    return result
+
+
+def main() -> None:
+    global PERIOD_FRAMES
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--period", type=int, default=256)
+    ap.add_argument("--queue", type=int, default=20000)
+    opts = ap.parse_args()
+
+    PERIOD_FRAMES = opts.period
+    _patch_audio()
+    with tempfile.TemporaryDirectory() as tmp:
+        track = Path(tmp) / "bench.wav"
+        track.write_bytes(b"\0" * 64)
+        print(
+            f"period={opts.period} frames "
+            f"({opts.period / player_mod.SAMPLE_RATE * 1000:.1f} ms), "
+            f"queue={opts.queue}, {opts.seconds:.0f}s of load"
+        )
+        for mode in ("thread", "process"):
+            r = asyncio.run(_run(mode, opts.seconds, opts.queue, track))
+            print(
+                f"  {r['mode']:8s} underruns {r['underruns']:5d} / "
+                f"{r['callbacks']:6d} callbacks  ({r['cmd_per_s']:.0f} cmd/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""``pause`` latency while heavy commands run: priority lanes at work.
+
+Starts a real daemon with a 100k-track playlist on disk. One thread keeps
+``load``, ``queue`` and ``playlists`` going on its own connection while
+``pause`` round trips are timed:
+
+- ``socket``: pause on a second connection;
+- ``fifo``: each pause written to atk.cmd right behind a ``queue`` request,
+  so it shares the command reader with heavy work.
+
+Each run is repeated with the daemon started under ``ATK_SWITCH_INTERVAL``
+(seconds), and the heavy thread's throughput is reported alongside, so
+the latency a shorter GIL switch interval buys can be read against what
+it costs the worker threads.
+
+    python benchmarks/bench_lanes.py [--count 300] [--tracks 100000]
+        [--switch-interval 0.0005]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from bench_transport import report, start_daemon
+
+
+def heavy_load(path: Path, stop: threading.Event, done: list[int]) -> None:
+    from atk.cli import SocketClient
+
+    client = SocketClient(path, timeout=60.0)
+    while not stop.is_set():
+        for cmd, args in (("load", {"name": "big"}), ("queue", {}), ("playlists", {})):
+            client.request(cmd, args)
+        done[0] += 1
+    client.close()
+
+
+def bench_socket(path: Path, count: int) -> None:
+    from atk.cli import SocketClient
+
+    client = SocketClient(path, timeout=60.0)
+    lat = []
+    t0 = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        client.request("pause")
+        lat.append(time.perf_counter() - t)
+        time.sleep(0.005)
+    report("socket", lat, time.perf_counter() - t0)
+    client.close()
+
+
+def bench_fifo(root: Path, count: int) -> None:
+    reply = root / "bench-reply"
+    os.mkfifo(reply)
+    fd = os.open(reply, os.O_RDWR)
+    cmd_pipe = os.open(root / "rt" / "atk.cmd", os.O_WRONLY)
+    queue = json.dumps({"id": "q", "cmd": "queue", "reply": str(reply)})
+    pause = json.dumps({"id": "p", "cmd": "pause", "reply": str(reply)})
+    lat = []
+    t0 = time.perf_counter()
+    for _ in range(count):
+        os.write(cmd_pipe, f"{queue}\n".encode())
+        t = time.perf_counter()
+        os.write(cmd_pipe, f"{pause}\n".encode())
+        buf, got = b"", None
+        while got != "p":
+            buf += os.read(fd, 1 << 20)
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                if json.loads(line).get("id") == "p":
+                    got = "p"
+                    lat.append(time.perf_counter() - t)
+        time.sleep(0.005)
+    report("fifo", lat, time.perf_counter() - t0)
+    os.close(cmd_pipe)
+    os.close(fd)
+
+
+def run(tracks: int, count: int, interval: float | None) -> None:
+    label = f"switch interval {interval * 1e3:g} ms" if interval else "default"
+    print(f"-- {label}")
+    if interval:
+        os.environ["ATK_SWITCH_INTERVAL"] = str(interval)
+    else:
+        os.environ.pop("ATK_SWITCH_INTERVAL", None)
+    with tempfile.TemporaryDirectory(prefix="atk-bench-") as tmp:
+        root = Path(tmp)
+        pldir = root / "data" / "atk" / "playlists"
+        pldir.mkdir(parents=True)
+        uris = [f"/music/Artist - Song {i}.flac" for i in range(tracks)]
+        (pldir / "big.json").write_text(json.dumps({"tracks": uris}))
+        proc = start_daemon(root)
+        stop = threading.Event()
+        done = [0]
+        try:
+            path = root / "rt" / "atk.sock"
+            worker = threading.Thread(target=heavy_load, args=(path, stop, done))
+            worker.start()
+            time.sleep(0.5)
+            t0, start = time.perf_counter(), done[0]
+            bench_socket(path, count)
+            bench_fifo(root, count)
+            rate = (done[0] - start) / (time.perf_counter() - t0)
+            stop.set()
+            worker.join()
+            print(f"{'heavy':18s} {rate:6.2f} load+queue+playlists rounds/s")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--count", type=int, default=300)
+    ap.add_argument("--tracks", type=int, default=100_000)
+    ap.add_argument("--switch-interval", type=float, default=0.0005)
+    opts = ap.parse_args()
+
+    run(opts.tracks, opts.count, None)
+    run(opts.tracks, opts.count, opts.switch_interval)
+
+
+if __name__ == "__main__":
+    main()
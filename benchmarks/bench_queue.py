@@ -0,0 +1,120 @@
+"""Queue operations at 1k / 100k / 1M entries: TrackQueue vs. plain lists.
+
+The baseline mirrors the old daemon code: ``list[str]`` plus a parallel
+``shuffle_order`` list of indices, with ``.index()`` on every track change
+and a full renumbering comprehension on remove.
+
+    python benchmarks/bench_queue.py [--sizes 1000 100000 1000000] [--ops 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from atk.tracklist import TrackQueue
+
+
+def per_op(fn, ops: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(ops):
+        fn()
+    return (time.perf_counter() - t0) / ops * 1e6
+
+
+def bench_list(n: int, ops: int) -> dict[str, float]:
+    queue = [f"/music/{i}.flac" for i in range(n)]
+    order = list(range(n))
+    random.shuffle(order)
+    state = {"pos": order[n // 2]}  # mid-queue, as after a long session
+
+    def advance():
+        state["pos"] = order[(order.index(state["pos"]) + 1) % len(order)]
+
+    def remove():
+        idx = random.randrange(len(queue) - 1) + 1
+        queue.pop(idx)
+        order.remove(idx)
+        order[:] = [i if i < idx else i - 1 for i in order]
+        queue.append("/music/new.flac")
+        order.append(len(queue) - 1)
+
+    def move():
+        queue.insert(random.randrange(n), queue.pop(random.randrange(n)))
+
+    def get():
+        return queue[random.randrange(n)]
+
+    return {
+        "advance": per_op(advance, ops),
+        "remove": per_op(remove, ops // 10 or 1),
+        "move": per_op(move, ops),
+        "get": per_op(get, ops),
+    }
+
+
+def bench_indexed(n: int, ops: int) -> dict[str, float]:
+    q = TrackQueue(f"/music/{i}.flac" for i in range(n))
+    q.shuffle_on(first=0)
+    state = {"pos": q.shuffled(n // 2)}
+
+    def advance():
+        k = (q.shuffle_index(state["pos"]) + 1) % q.shuffle_len()
+        state["pos"] = q.shuffled(k)
+
+    def remove():
+        q.pop(random.randrange(len(q) - 1) + 1)
+        q.append("/music/new.flac")
+        q.shuffle_insert(q.shuffle_len(), len(q) - 1)
+
+    def move():
+        q.move(random.randrange(n), random.randrange(n))
+
+    def get():
+        return q[random.randrange(n)]
+
+    return {
+        "advance": per_op(advance, ops),
+        "remove": per_op(remove, ops),
+        "move": per_op(move, ops),
+        "get": per_op(get, ops),
+    }
+
+
+def bench_enable_shuffle(n: int) -> tuple[float, float]:
+    """ms to turn shuffle on: full random.shuffle vs. LazyShuffle."""
+    order = list(range(n))
+    t0 = time.perf_counter()
+    random.shuffle(order)
+    eager = (time.perf_counter() - t0) * 1e3
+    q = TrackQueue(f"/music/{i}.flac" for i in range(n))
+    t0 = time.perf_counter()
+    q.shuffle_on(first=0)
+    lazy = (time.perf_counter() - t0) * 1e3
+    return eager, lazy
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    ap.add_argument("--ops", type=int, default=200)
+    opts = ap.parse_args()
+
+    print(
+        f"{'entries':>9s} {'impl':8s} "
+        + " ".join(f"{k:>12s}" for k in ("advance", "remove", "move", "get"))
+        + "   (us/op)"
+    )
+    for n in opts.sizes:
+        for name, fn in (("list", bench_list), ("indexed", bench_indexed)):
+            r = fn(n, opts.ops)
+            print(f"{n:9d} {name:8s} " + " ".join(f"{r[k]:12.1f}" for k in r))
+    print(f"\n{'entries':>9s} {'enable shuffle (ms)':>22s} {'lazy (ms)':>12s}")
+    for n in opts.sizes:
+        eager, lazy = bench_enable_shuffle(n)
+        print(f"{n:9d} {eager:22.2f} {lazy:12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Daemon restart: time to replay the state journal against queue size.
+
+For each queue size, writes what a running daemon leaves in the state
+directory just before a snapshot is due (a snapshot plus a journal of
+position samples, track changes and queue edits) and times a restart:
+``Journal.load`` (read and replay) and ``Daemon.restore`` (rebuild the
+queue and the shuffle). Also times what journaling costs the event loop:
+``Journal.record`` per change, and taking the state for a snapshot.
+
+    python benchmarks/bench_recovery.py [--sizes 1000,10000,100000,1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import miniaudio
+
+from atk import journal as journal_mod
+from atk.daemon import Daemon
+from atk.journal import Journal, empty_state
+
+
+class _NullDevice:
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self, gen):
+        next(gen)
+
+    def close(self):
+        pass
+
+
+def _write(state_dir: Path, size: int, records: int) -> None:
+    rng = random.Random(size)
+    queue = [
+        f"/music/Artist {i % 500}/Album {i % 40}/{i:07d}.flac" for i in range(size)
+    ]
+    drawn = rng.sample(range(size), min(size, 200))
+    state = {
+        **empty_state(),
+        "seq": 1,
+        "queue": queue,
+        "shuffle": True,
+        "seed": 1,
+        "drawn": drawn,
+        "state": "playing",
+    }
+    (state_dir / journal_mod.SNAPSHOT_NAME).write_text(json.dumps(state))
+    lines = []
+    n = size
+    for seq in range(2, records + 2):
+        kind = seq % 10
+        if kind == 0:
+            rec = {"op": "current_changed", "current": rng.randrange(n)}
+        elif kind == 1 and n > 1:
+            n -= 1
+            rec = {"op": "remove", "index": rng.randrange(n), "current": 0}
+        else:
+            rec = {"op": "clock", "state": "playing", "position": seq * 5.0}
+            rec["rate"] = 1.0
+        lines.append(json.dumps({**rec, "seq": seq}, separators=(",", ":")))
+    (state_dir / journal_mod.JOURNAL_NAME).write_text("\n".join(lines) + "\n")
+
+
+async def _record_cost(state_dir: Path, count: int) -> float:
+    j = Journal(state_dir)
+    rec = {"op": "clock", "state": "playing", "position": 1.0, "rate": 1.0}
+    t0 = time.perf_counter()
+    for _ in range(count):
+        j.record(dict(rec))
+    cost = (time.perf_counter() - t0) / count
+    await j.close()
+    return cost
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="1000,10000,100000,1000000")
+    ap.add_argument("--repeat", type=int, default=5)
+    opts = ap.parse_args()
+
+    miniaudio.PlaybackDevice = _NullDevice
+    head = f"{'tracks':>9s} {'records':>8s} {'files':>9s}"
+    cols = ("load", "restore", "total", "snapshot")
+    print(head, *(f"{c:>10s}" for c in cols))
+    with tempfile.TemporaryDirectory(prefix="atk-bench-") as tmp:
+        for size in (int(s) for s in opts.sizes.split(",")):
+            records = journal_mod.SNAPSHOT_EVERY - 1
+            state_dir = Path(tmp) / f"state-{size}"
+            state_dir.mkdir()
+            _write(state_dir, size, records)
+            nbytes = sum(f.stat().st_size for f in state_dir.iterdir())
+            loads, restores, snaps = [], [], []
+            for _ in range(opts.repeat):
+                t0 = time.perf_counter()
+                saved = Journal(state_dir).load()
+                t1 = time.perf_counter()
+                daemon = Daemon(Path(tmp) / "rt", event_window=0)
+                t2 = time.perf_counter()
+                daemon.restore(saved)
+                t3 = time.perf_counter()
+                daemon._saved_state()
+                t4 = time.perf_counter()
+                daemon.player.close()
+                loads.append(t1 - t0)
+                restores.append(t3 - t2)
+                snaps.append(t4 - t3)
+            load, restore, snap = (
+                statistics.median(t) * 1e3 for t in (loads, restores, snaps)
+            )
+            print(
+                f"{size:9d} {records:8d} {nbytes / 1e6:6.1f} MB "
+                f"{load:7.1f} ms {restore:7.1f} ms {load + restore:7.1f} ms "
+                f"{snap:7.1f} ms"
+            )
+        cost = asyncio.run(_record_cost(Path(tmp) / "record", 100000))
+    print(f"Journal.record on the loop: {cost * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
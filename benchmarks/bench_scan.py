@@ -0,0 +1,70 @@
+"""Bulk enqueue of a large music tree.
+
+Builds a synthetic library (artists/albums/tracks, empty files) and times
+``scan_paths`` with a single worker vs. the default thread pool, plus the
+daemon's ``add {paths, recursive}`` end to end.
+
+    python benchmarks/bench_scan.py [--files 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from atk.scan import scan_paths
+
+
+def build_tree(
+    root: Path, files: int, per_album: int = 12, per_artist: int = 8
+) -> None:
+    for i in range(files):
+        album, track = divmod(i, per_album)
+        artist = album // per_artist
+        d = root / f"artist{artist:04d}" / f"album{album:05d}"
+        if track == 0:
+            d.mkdir(parents=True)
+        (d / f"{track:02d} track.flac").write_bytes(b"")
+
+
+def timed(label: str, fn) -> object:
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"{label:28s} {time.perf_counter() - t0:7.3f} s")
+    return result
+
+
+async def daemon_add(root: Path, runtime: Path) -> int:
+    with patch("atk.player.miniaudio"):
+        from atk.daemon import Daemon
+
+        daemon = Daemon(runtime)
+        result = await daemon._cmd_add({"paths": [str(root)], "recursive": True})
+        daemon.decoder.shutdown()
+        return result["added"]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--files", type=int, default=50_000)
+    opts = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="atk-scan-") as tmp:
+        root = Path(tmp) / "music"
+        timed(f"build {opts.files} files", lambda: build_tree(root, opts.files))
+        one = timed("scan, 1 worker", lambda: scan_paths([str(root)], True, workers=1))
+        many = timed("scan, thread pool", lambda: scan_paths([str(root)], True))
+        assert one["files"] == many["files"]
+        added = timed(
+            "daemon add (paths, recursive)",
+            lambda: asyncio.run(daemon_add(root, Path(tmp) / "rt")),
+        )
+        print(f"enqueued {added} tracks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""``status`` cost: shared status block vs. a round trip to the daemon.
+
+Starts a real daemon with a queued track and reads status repeatedly:
+
+- ``fifo``: ``send_command_fifo("status")``, a private reply FIFO per call;
+- ``socket``: one persistent connection, one request at a time;
+- ``block``: ``read_status()``, a seqlocked copy out of ``atk.status``.
+
+    python benchmarks/bench_status.py [--count 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from bench_transport import report, start_daemon
+
+
+def timed(name: str, fn, count: int) -> None:
+    lat = []
+    t0 = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        fn()
+        lat.append(time.perf_counter() - t)
+    report(name, lat, time.perf_counter() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--count", type=int, default=2000)
+    opts = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="atk-bench-") as tmp:
+        root = Path(tmp)
+        proc = start_daemon(root)
+        try:
+            from atk.cli import SocketClient, read_status, send_command_fifo
+
+            client = SocketClient(root / "rt" / "atk.sock")
+            client.request("add", {"uri": "fifo:/nonexistent?rate=22050"})
+            client.request("volume", {"level": 40})
+            for _ in range(100):
+                if (root / "rt" / "atk.status").exists():
+                    break
+                time.sleep(0.05)
+            assert read_status()["volume"] == 40
+
+            timed("fifo", lambda: send_command_fifo("status"), opts.count // 10)
+            timed("socket", lambda: client.request("status"), opts.count)
+            timed("block", read_status, opts.count)
+            client.close()
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
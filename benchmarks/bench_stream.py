@@ -0,0 +1,90 @@
+"""Large replies: one JSON line vs. a streamed response.
+
+Starts a real daemon, loads a large playlist and fetches ``queue`` while a
+second connection pings the daemon back to back. Reports how long the
+listing took, the ping latency meanwhile (how long the loop stalls) and
+the largest single line the client had to hold.
+
+    python benchmarks/bench_stream.py [--tracks 100000] [--rounds 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from bench_transport import report, start_daemon
+
+
+def fetch(name: str, client, streamed: bool, ping_client, rounds: int) -> None:
+    lat: list[float] = []
+    done = threading.Event()
+
+    def pinger() -> None:
+        while not done.is_set():
+            t = time.perf_counter()
+            ping_client.request("ping")
+            lat.append(time.perf_counter() - t)
+
+    elapsed = 0.0
+    largest = 0
+    for _ in range(rounds):
+        done.clear()
+        thread = threading.Thread(target=pinger)
+        thread.start()
+        t0 = time.perf_counter()
+        if streamed:
+            frames = client.stream("queue", timeout=60.0)
+            largest = max(largest, *(len(json.dumps(f)) for f in frames))
+        else:
+            largest = max(
+                largest, len(json.dumps(client.request("queue", timeout=60.0)))
+            )
+        elapsed += time.perf_counter() - t0
+        done.set()
+        thread.join()
+    print(
+        f"{name}: {elapsed / rounds * 1e3:.0f} ms per listing, "
+        f"largest line {largest / 1e6:.2f} MB"
+    )
+    report(f"  ping during {name}", lat, elapsed)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--tracks", type=int, default=100_000)
+    ap.add_argument("--rounds", type=int, default=5)
+    opts = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="atk-bench-") as tmp:
+        root = Path(tmp)
+        playlists = root / "data" / "atk" / "playlists"
+        playlists.mkdir(parents=True)
+        (playlists / "big.m3u").write_text(
+            "".join(
+                f"/music/artist/album/{i:06d} track.mp3\n" for i in range(opts.tracks)
+            )
+        )
+        proc = start_daemon(root)
+        try:
+            from atk.cli import SocketClient
+
+            client = SocketClient(root / "rt" / "atk.sock")
+            ping_client = SocketClient(root / "rt" / "atk.sock")
+            client.request("load", {"name": "big"}, timeout=60.0)
+
+            fetch("one line", client, False, ping_client, opts.rounds)
+            fetch("streamed", client, True, ping_client, opts.rounds)
+            client.close()
+            ping_client.close()
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
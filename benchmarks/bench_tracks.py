@@ -0,0 +1,83 @@
+"""Queue metadata: memory per entry and ``queue`` serialization time.
+
+Compares the old daemon code (URIs in the queue, ``_track_info`` building a
+``Path`` and a dict per entry on every ``queue``/``status``/``queue_updated``)
+with ``Track`` records derived once at enqueue. The synthetic library has
+albums of a few dozen artists, like a real one.
+
+    python benchmarks/bench_tracks.py [--size 100000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from atk.tracklist import TrackQueue
+
+
+def make_uris(n: int) -> list[str]:
+    return [
+        f"/music/Artist {i % 40}/Album {i % 400}/Artist {i % 40} - Song {i}.flac"
+        for i in range(n)
+    ]
+
+
+def old_track_info(uri: str) -> dict:
+    name = Path(uri).stem
+    parts = name.split(" - ", 1)
+    if len(parts) == 2:
+        return {"uri": uri, "artist": parts[0], "title": parts[1]}
+    return {"uri": uri, "title": name}
+
+
+def measure(build) -> float:
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--size", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    opts = ap.parse_args()
+    n = opts.size
+
+    # Memory includes the URI strings themselves in both cases
+    mem_list = measure(lambda: make_uris(n))
+    mem_records = measure(lambda: TrackQueue(make_uris(n)))
+    print(f"{n} entries")
+    print(f"  list[str]        {mem_list / n:7.0f} B/entry")
+    print(f"  TrackQueue       {mem_records / n:7.0f} B/entry (records + index)")
+
+    uris = make_uris(n)
+    queue = TrackQueue(uris)
+    old = best_of(
+        lambda: json.dumps({"tracks": [old_track_info(u) for u in uris]}), opts.repeat
+    )
+    new = best_of(
+        lambda: json.dumps({"tracks": [t.info() for t in queue.tracks()]}),
+        opts.repeat,
+    )
+    print(f"  queue (old)      {old:7.1f} ms")
+    print(f"  queue (records)  {new:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
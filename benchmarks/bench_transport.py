@@ -0,0 +1,169 @@
+"""Round-trip latency and throughput: FIFO pair vs. Unix socket.
+
+Starts a real daemon in a scratch runtime directory and measures ``ping``
+over each transport:
+
+- ``fifo``: one open/write/open/read cycle on atk.cmd/atk.resp per command
+  (what the CLI did before atk.sock existed);
+- ``socket``: one persistent connection, one request at a time;
+- ``socket-pipelined``: one connection with a window of outstanding
+  requests, responses matched by id;
+- ``fifo-shell``: sustained ingestion from a shell loop doing one
+  ``echo ... > atk.cmd`` per command, replies on a reply FIFO;
+- ``fifo-burst``: ``cat commands.jsonl > atk.cmd``, all lines in one open.
+
+    python benchmarks/bench_transport.py [--count 2000] [--window 32]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def start_daemon(root: Path) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        ATK_RUNTIME_DIR=str(root / "rt"),
+        XDG_STATE_HOME=str(root / "state"),
+        XDG_DATA_HOME=str(root / "data"),
+        XDG_CACHE_HOME=str(root / "cache"),
+    )
+    os.environ.update(env)  # so atk.cli resolves the same runtime dir
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "atk.daemon"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    sock = root / "rt" / "atk.sock"
+    for _ in range(100):
+        if sock.exists():
+            return proc
+        time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("daemon did not start")
+
+
+def report(name: str, latencies: list[float], elapsed: float) -> None:
+    lat = sorted(latencies)
+    p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+    print(
+        f"{name:18s} p50 {statistics.median(lat) * 1e6:8.1f} us  "
+        f"p99 {p99 * 1e6:8.1f} us  {len(lat) / elapsed:9.0f} cmd/s"
+    )
+
+
+def bench_fifo(count: int) -> None:
+    from atk.cli import send_command_fifo
+
+    lat = []
+    t0 = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        send_command_fifo("ping")
+        lat.append(time.perf_counter() - t)
+    report("fifo", lat, time.perf_counter() - t0)
+
+
+def bench_socket(path: Path, count: int) -> None:
+    from atk.cli import SocketClient
+
+    client = SocketClient(path)
+    lat = []
+    t0 = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        client.request("ping")
+        lat.append(time.perf_counter() - t)
+    report("socket", lat, time.perf_counter() - t0)
+    client.close()
+
+
+def bench_pipelined(path: Path, count: int, window: int) -> None:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(str(path))
+    rfile = sock.makefile("rb")
+    sent_at: dict[str, float] = {}
+    lat = []
+    sent = 0
+    t0 = time.perf_counter()
+    while len(lat) < count:
+        burst = []
+        while sent < count and len(sent_at) < window:
+            req_id = str(sent)
+            sent_at[req_id] = time.perf_counter()
+            burst.append(json.dumps({"id": req_id, "cmd": "ping", "args": {}}))
+            sent += 1
+        if burst:
+            sock.sendall(("\n".join(burst) + "\n").encode())
+        resp = json.loads(rfile.readline())
+        lat.append(time.perf_counter() - sent_at.pop(resp["id"]))
+    report("socket-pipelined", lat, time.perf_counter() - t0)
+    sock.close()
+
+
+def bench_ingest(root: Path, count: int, burst: bool) -> None:
+    """Commands/s from a shell writer; only throughput is meaningful."""
+    reply = root / "bench-reply"
+    os.mkfifo(reply)
+    fd = os.open(reply, os.O_RDWR)
+    cmd_pipe = root / "rt" / "atk.cmd"
+    line = json.dumps({"id": "x", "cmd": "ping", "args": {}, "reply": str(reply)})
+    if burst:
+        jsonl = root / "commands.jsonl"
+        jsonl.write_text((line + "\n") * count)
+        script = f"cat '{jsonl}' > '{cmd_pipe}'"
+    else:
+        script = (
+            f"i=0; while [ $i -lt {count} ]; do "
+            f"echo '{line}' > '{cmd_pipe}'; i=$((i+1)); done"
+        )
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(["sh", "-c", script])
+    got = 0
+    while got < count:
+        got += os.read(fd, 1 << 16).count(b"\n")
+    elapsed = time.perf_counter() - t0
+    proc.wait()
+    os.close(fd)
+    reply.unlink()
+    name = "fifo-burst" if burst else "fifo-shell"
+    rate = count / elapsed
+    print(f"{name:18s} {count} commands in {elapsed:.2f} s  {rate:9.0f} cmd/s")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--count", type=int, default=2000)
+    ap.add_argument("--window", type=int, default=32)
+    opts = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="atk-bench-") as tmp:
+        root = Path(tmp)
+        proc = start_daemon(root)
+        try:
+            path = root / "rt" / "atk.sock"
+            bench_fifo(opts.count)
+            bench_socket(path, opts.count)
+            bench_pipelined(path, opts.count, opts.window)
+            bench_ingest(root, opts.count, burst=False)
+            bench_ingest(root, opts.count, burst=True)
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Audio-thread to event-loop bridge.
+
+The audio callback must not call into asyncio (``create_task`` and friends
+are not thread-safe) and should do as little Python work as possible inside
+its deadline. ``AudioEvents`` gives it three cheap producer calls instead:
+
+- ``track_end`` and ``underrun`` bump a counter;
+- ``action`` writes a fired cue into a preallocated ring of slots.
+
+Each then rings a doorbell (an eventfd, or a non-blocking pipe where there
+is none) unless one is already pending. The loop watches the doorbell with
+``add_reader`` and delivers everything that accumulated to the daemon's
+handlers in one pass, on the loop thread. Nothing on the producer side
+allocates containers, takes a lock or touches the loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+from typing import Callable
+
+import numpy as np
+
+ACTION_SLOTS = 64
+
+_END, _UNDERRUN, _ACTIONS = range(3)
+
+
+class AudioEvents:
+    """Single-producer event slots drained on the event loop.
+
+    The producer is the audio thread (or the engine's listener thread for
+    ``RemotePlayer``); the consumer is the loop. Counters only ever grow and
+    each side keeps its own copy of what it has seen, so no lock is needed.
+    If more than ``slots`` cues fire before the loop drains, the oldest are
+    overwritten and counted in ``lost``.
+    """
+
+    def __init__(self, actions: tuple[str, ...], slots: int = ACTION_SLOTS):
+        self._actions = actions
+        self._slots = slots
+        # Written by the producer only
+        self._posted = np.zeros(3, dtype=np.uint64)
+        self._cues = np.zeros((slots, 2), dtype=np.float64)  # (action, value)
+        # Read and written by the consumer only
+        self._seen = np.zeros(3, dtype=np.uint64)
+        self.lost = 0
+        self._pending = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._on_end: Callable[[], None] | None = None
+        self._on_action: Callable[[str, float | None], None] | None = None
+        self._on_underrun: Callable[[int], None] | None = None
+        if hasattr(os, "eventfd"):
+            self._rfd = self._wfd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+        else:
+            self._rfd, self._wfd = os.pipe()
+            os.set_blocking(self._rfd, False)
+            os.set_blocking(self._wfd, False)
+
+    # --- Producer side (audio thread) ---
+
+    def track_end(self) -> None:
+        self._posted[_END] += 1
+        self._ring()
+
+    def underrun(self) -> None:
+        self._posted[_UNDERRUN] += 1
+        self._ring()
+
+    def action(self, action: str, value: float | None) -> None:
+        slot = self._cues[int(self._posted[_ACTIONS]) % self._slots]
+        slot[0] = self._actions.index(action)
+        slot[1] = math.nan if value is None else value
+        self._posted[_ACTIONS] += 1
+        self._ring()
+
+    def _ring(self) -> None:
+        if self._pending:
+            return
+        self._pending = True
+        try:
+            os.write(self._wfd, b"\x01\0\0\0\0\0\0\0")
+        except BlockingIOError:
+            pass  # a wakeup is already queued
+
+    # --- Consumer side (event loop) ---
+
+    def attach(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        on_end: Callable[[], None],
+        on_action: Callable[[str, float | None], None],
+        on_underrun: Callable[[int], None],
+    ) -> None:
+        """Deliver events to the handlers on ``loop`` from now on."""
+        self._on_end = on_end
+        self._on_action = on_action
+        self._on_underrun = on_underrun
+        self._loop = loop
+        loop.add_reader(self._rfd, self.drain)
+
+    def close(self) -> None:
+        if self._loop is not None:
+            self._loop.remove_reader(self._rfd)
+            self._loop = None
+        os.close(self._rfd)
+        if self._wfd != self._rfd:
+            os.close(self._wfd)
+
+    def drain(self) -> None:
+        """Hand everything posted since the last drain to the handlers."""
+        try:
+            os.read(self._rfd, 4096)
+        except BlockingIOError:
+            pass
+        # Clear before reading the counters: a post racing with us either
+        # is seen below or rings again
+        self._pending = False
+        posted = self._posted.copy()
+
+        first = int(self._seen[_ACTIONS])
+        last = int(posted[_ACTIONS])
+        if last - first > self._slots:
+            self.lost += last - first - self._slots
+            first = last - self._slots
+        for n in range(first, last):
+            code, value = self._cues[n % self._slots]
+            if self._on_action:
+                self._on_action(
+                    self._actions[int(code)], None if math.isnan(value) else value
+                )
+
+        underruns = int(posted[_UNDERRUN] - self._seen[_UNDERRUN])
+        if underruns and self._on_underrun:
+            self._on_underrun(underruns)
+        ends = int(posted[_END] - self._seen[_END])
+        self._seen[:] = posted
+        if ends and self._on_end:
+            self._on_end()
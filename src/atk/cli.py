@@ -2,19 +2,27 @@
 
 from __future__ import annotations
 
+import collections
+import contextlib
 import json
 import os
 import select
 import signal
+import socket
 import subprocess
 import sys
+import threading
 import time
 import uuid
 from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
 
 import click
 
+from .codec import FRAMINGS, JSON_LINES, Framing
 from .config import get_runtime_dir
+from .statusblock import StatusReader
 
 # ---------------------------------------------------------------------------
 # Pipe client
@@ -45,48 +53,301 @@ def ensure_daemon() -> None:
         start_daemon()
 
 
-def send_command(cmd: str, args: dict | None = None) -> dict:
-    """Send JSON command to daemon pipe, return response dict."""
-    ensure_daemon()
-    runtime = get_runtime_dir()
-    req_id = str(uuid.uuid4())
-    request = json.dumps({"id": req_id, "cmd": cmd, "args": args or {}})
-
-    with open(runtime / "atk.cmd", "w") as f:
-        f.write(request + "\n")
-        f.flush()
-
-    with open(runtime / "atk.resp", "r") as f:
-        ready, _, _ = select.select([f], [], [], 5.0)
-        if not ready:
-            raise TimeoutError("No response from daemon")
+class SocketClient:
+    """Persistent, multiplexed connection to the daemon's ``atk.sock``.
+
+    Safe to share between threads: each caller sends its request and then
+    waits for the response with its own id. Whichever waiter is free reads
+    the next line off the socket and hands it to its owner, so several
+    requests can be outstanding on the one connection. A streamed request
+    owns several messages (its frames), kept in order per id.
+
+    ``framing="msgpack"`` negotiates MessagePack frames instead of JSON
+    lines when the connection opens (see ``atk.codec``).
+    """
+
+    RECV_SIZE = 1 << 16
+
+    def __init__(self, path: Path, timeout: float = 5.0, framing: str = "json"):
+        self.path = path
+        self.timeout = timeout
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(str(path))
+        self._buf = bytearray()  # received bytes not yet split into messages
+        self._framing: Framing = JSON_LINES
+        self._send_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._results: dict[str, collections.deque[dict]] = {}
+        self._reading = False
+        if framing != JSON_LINES.name:
+            resp = self.request("framing", {"codec": framing})
+            if not resp.get("ok"):
+                self.close()
+                raise ValueError(resp.get("error", {}).get("message", "framing"))
+            self._framing = FRAMINGS[framing]
+
+    def request(
+        self, cmd: str, args: dict | None = None, timeout: float | None = None
+    ) -> dict:
+        req_id = self.send(cmd, args)
+        return self.wait(req_id, timeout)
+
+    def stream(self, cmd: str, args: dict | None = None, timeout: float | None = None):
+        """Generator yielding the frames of a streamed response as they
+        arrive; ``timeout`` applies to each frame."""
+        req_id = self.send(cmd, args, stream=True)
+        try:
+            while True:
+                frame = self._next(req_id, timeout)
+                yield frame
+                if not frame.get("more"):
+                    return
+        finally:
+            with self._cond:
+                self._results.pop(req_id, None)
+
+    def send(self, cmd: str, args: dict | None = None, stream: bool = False) -> str:
+        """Send a request without waiting; returns its id for ``wait``."""
+        req_id = str(uuid.uuid4())
+        request: dict[str, Any] = {"id": req_id, "cmd": cmd, "args": args or {}}
+        if stream:
+            request["stream"] = True
+        with self._cond:
+            self._results[req_id] = collections.deque()
+        with self._send_lock:
+            self._sock.sendall(self._framing.encode(request))
+        return req_id
+
+    def wait(self, req_id: str, timeout: float | None = None) -> dict:
+        resp = self._next(req_id, timeout)
+        with self._cond:
+            self._results.pop(req_id, None)
+        return resp
+
+    def _next(self, req_id: str, timeout: float | None) -> dict:
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
         while True:
-            line = f.readline().strip()
-            if not line:
+            with self._cond:
+                while True:
+                    pending = self._results.get(req_id)
+                    if pending:
+                        return pending.popleft()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._results.pop(req_id, None)
+                        raise TimeoutError("No response from daemon")
+                    if not self._reading:
+                        self._reading = True
+                        break
+                    self._cond.wait(remaining)
+            try:
+                payload = self._recv(deadline)
+            finally:
+                with self._cond:
+                    self._reading = False
+                    self._cond.notify_all()
+            if payload is None:
                 continue
+            msg = self._framing.decode(payload)
+            with self._cond:
+                if msg.get("id") in self._results:
+                    self._results[msg["id"]].append(msg)
+                    self._cond.notify_all()
+
+    def events(self):
+        """Yield event messages forever (use on a dedicated, subscribed connection)."""
+        while True:
+            try:
+                payload = self._recv(None)
+            except ConnectionError:
+                return
+            msg = self._framing.decode(payload)
+            if "event" in msg:
+                yield msg
+
+    def _recv(self, deadline: float | None) -> bytes | None:
+        """Next message off the socket, undecoded; None if ``deadline``
+        passes first.
+
+        A partial message stays buffered for the next call, so a timeout
+        never loses data. Raises ``ConnectionError`` once the daemon hangs
+        up.
+        """
+        start = 0
+        while (payload := self._framing.split(self._buf, start)) is None:
+            start = len(self._buf)
+            if deadline is None:
+                self._sock.settimeout(None)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._sock.settimeout(remaining)
+            try:
+                chunk = self._sock.recv(self.RECV_SIZE)
+            except socket.timeout:
+                return None
+            if not chunk:
+                raise ConnectionError("Daemon closed the connection")
+            self._buf += chunk
+        return payload
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+_client: SocketClient | None = None
+_client_lock = threading.Lock()
+
+
+def _socket_client() -> SocketClient | None:
+    """Shared socket connection, opened on first use; None if unavailable."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            sock_path = get_runtime_dir() / "atk.sock"
+            if not sock_path.exists():
+                return None
+            try:
+                _client = SocketClient(sock_path)
+            except OSError:
+                return None
+        return _client
+
+
+def _drop_socket_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+_status_reader: StatusReader | None = None
+
+
+def read_status() -> dict | None:
+    """``status`` straight from the daemon's shared status block.
+
+    No round trip, so prompts and status bars can poll it freely. It has
+    every ``status`` field, versions included, except the live ``levels``
+    and ``stream`` readings. Returns None when there is no live block (no
+    daemon, or one that predates it); callers then fall back to
+    ``send_command("status")``.
+    """
+    global _status_reader
+    for _ in range(2):
+        if _status_reader is None:
+            try:
+                _status_reader = StatusReader(get_runtime_dir() / "atk.status")
+            except (OSError, ValueError):
+                return None
+        try:
+            data = _status_reader.read()
+        except BlockingIOError:
+            return None
+        if data is not None:
+            return data
+        # Daemon gone or restarted: map the current file once more
+        _status_reader.close()
+        _status_reader = None
+    return None
+
+
+def send_command(
+    cmd: str, args: dict | None = None, timeout: float | None = None
+) -> dict:
+    """Send JSON command to the daemon, return response dict.
+
+    Uses the persistent socket connection when the daemon offers one and
+    falls back to the named pipes when it does not, or when the request
+    cannot be sent on it (a connection left over from a restarted daemon).
+    Once a request is sent it is never sent again: a failure waiting for
+    the response raises rather than running the command twice. ``timeout``
+    overrides the default wait for the response (long polls need more).
+    """
+    ensure_daemon()
+    client = _socket_client()
+    if client is not None:
+        try:
+            req_id = client.send(cmd, args)
+        except OSError:
+            _drop_socket_client()
+        else:
+            try:
+                return client.wait(req_id, timeout)
+            except OSError:  # includes TimeoutError
+                _drop_socket_client()
+                raise
+    return send_command_fifo(cmd, args, timeout)
+
+
+def send_command_fifo(
+    cmd: str, args: dict | None = None, timeout: float | None = None
+) -> dict:
+    """Send JSON command over atk.cmd, return the response from a private
+    reply FIFO so concurrent clients never read each other's lines."""
+    req_id = str(uuid.uuid4())
+    with _reply_fifo() as (path, lines):
+        _write_request({"id": req_id, "cmd": cmd, "args": args or {}, "reply": path})
+        for line in lines(5.0 if timeout is None else timeout):
             resp = json.loads(line)
             if resp.get("id") == req_id:
                 return resp
+    raise TimeoutError("No response from daemon")
+
 
+def stream_command(cmd: str, args: dict | None = None, timeout: float | None = None):
+    """Generator yielding the frames of a streamed response.
 
-def subscribe_to_events():
-    """Generator yielding event dicts from daemon."""
+    Each frame is ``{"id", "seq", "more", ...}``; the first carries ``ok``
+    and the scalar fields with the first chunk of each list, later ones
+    carry further chunks of those lists as ``data``, and the last has
+    ``more: false``. ``timeout`` bounds the wait for each frame.
+    """
+    ensure_daemon()
+    client = _socket_client()
+    if client is not None:
+        try:
+            yield from client.stream(cmd, args, timeout)
+            return
+        except OSError:  # includes TimeoutError; a cut stream cannot resume
+            _drop_socket_client()
+            raise
+    req_id = str(uuid.uuid4())
+    with _reply_fifo() as (path, lines):
+        request = {"id": req_id, "cmd": cmd, "args": args or {}, "reply": path}
+        _write_request({**request, "stream": True})
+        for line in lines(5.0 if timeout is None else timeout):
+            frame = json.loads(line)
+            if frame.get("id") == req_id:
+                yield frame
+                if not frame.get("more"):
+                    return
+    raise TimeoutError("No response from daemon")
+
+
+def subscribe_to_events(framing: str = "json"):
+    """Generator yielding event dicts from daemon.
+
+    ``framing`` picks the socket framing (``"msgpack"`` for high-rate
+    subscribers); the FIFO fallback is always JSON.
+    """
     ensure_daemon()
     runtime = get_runtime_dir()
+    if (runtime / "atk.sock").exists():
+        try:
+            conn = SocketClient(runtime / "atk.sock", framing=framing)
+        except OSError:
+            pass
+        else:
+            yield from _socket_events(conn)
+            return
     req_id = str(uuid.uuid4())
-    request = json.dumps({"id": req_id, "cmd": "subscribe", "args": {}})
-
-    with open(runtime / "atk.cmd", "w") as f:
-        f.write(request + "\n")
-        f.flush()
-
-    with open(runtime / "atk.resp", "r") as f:
+    with _reply_fifo() as (path, lines):
+        _write_request({"id": req_id, "cmd": "subscribe", "args": {}, "reply": path})
         while True:
-            ready, _, _ = select.select([f], [], [], 1.0)
-            if ready:
-                line = f.readline().strip()
-                if not line:
-                    continue
+            for line in lines(1.0):
                 msg = json.loads(line)
                 if "event" in msg:
                     yield msg
@@ -94,6 +355,122 @@ def subscribe_to_events():
                     raise RuntimeError(f"Subscribe failed: {msg.get('error')}")
 
 
+def queue_pages(page_size: int = 200, fields: list[str] | None = None):
+    """Generator yielding ``queue`` pages, each fetched only when wanted.
+
+    Pages are separate requests, so a queue edited mid-walk can repeat or
+    skip an entry at a page boundary; compare each page's ``version`` to
+    tell.
+    """
+    extra = {} if fields is None else {"fields": fields}
+    offset = 0
+    while True:
+        args = {"offset": offset, "limit": page_size, **extra}
+        resp = send_command("queue", args)
+        if not resp.get("ok"):
+            raise RuntimeError(resp.get("error", {}).get("message", "queue failed"))
+        data = resp["data"]
+        yield data
+        offset += len(data["tracks"])
+        if not data["tracks"] or offset >= data["total"]:
+            return
+
+
+def queue_chunks(fields: list[str] | None = None):
+    """Generator yielding the whole queue in chunks as the daemon streams it.
+
+    Each chunk is shaped like a ``queue`` page (``tracks``, ``offset``,
+    ``current_index``, ``version``), so the client never holds more than
+    one frame of the listing.
+    """
+    head: dict = {}
+    offset = 0
+    for frame in stream_command("queue", {} if fields is None else {"fields": fields}):
+        if frame.get("ok") is False:
+            raise RuntimeError(frame.get("error", {}).get("message", "queue failed"))
+        if "data" not in frame:
+            return
+        if frame["seq"] == 0:
+            head = {k: v for k, v in frame["data"].items() if k != "tracks"}
+        tracks = frame["data"].get("tracks", [])
+        yield {**head, "tracks": tracks, "offset": offset}
+        offset += len(tracks)
+
+
+def _write_request(request: dict) -> None:
+    with open(get_runtime_dir() / "atk.cmd", "w") as f:
+        f.write(json.dumps(request) + "\n")
+        f.flush()
+
+
+@contextlib.contextmanager
+def _reply_fifo():
+    """A private reply FIFO in the runtime dir: yields ``(path, lines)``
+    where ``lines(timeout)`` iterates response lines until ``timeout``
+    passes without data."""
+    path = get_runtime_dir() / f"reply-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    os.mkfifo(path, mode=0o600)
+    # O_RDWR keeps a writer attached, so reads block instead of seeing EOF
+    # between the daemon's writes.
+    fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+
+    def lines(timeout: float):
+        buf = b""
+        while True:
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                return
+            buf += os.read(fd, 65536)
+            *complete, buf = buf.split(b"\n")
+            for line in complete:
+                if line.strip():
+                    yield line.decode()
+
+    try:
+        yield str(path), lines
+    finally:
+        os.close(fd)
+        path.unlink(missing_ok=True)
+
+
+def _socket_events(conn: SocketClient):
+    """Events from a dedicated subscribed socket connection."""
+    try:
+        resp = conn.request("subscribe")
+        if not resp.get("ok"):
+            raise RuntimeError(f"Subscribe failed: {resp.get('error')}")
+        yield from conn.events()
+    finally:
+        conn.close()
+
+
+class PlaybackClock:
+    """Client-side playback position, extrapolated from clock samples.
+
+    The daemon publishes ``position_update`` (and ``status["clock"]``) as
+    ``position`` at ``time`` on the host's monotonic clock, advancing at
+    ``rate`` while ``state`` is ``playing``, and only when that stops being
+    true. ``position()`` is then exact at any frame rate without polling.
+    """
+
+    def __init__(self) -> None:
+        self.sample: dict = {"position": 0.0, "time": 0.0, "rate": 1.0}
+        self.state = "stopped"
+        self.duration = 0.0
+
+    def sync(self, data: dict) -> None:
+        self.sample = data
+        self.state = data.get("state", self.state)
+        self.duration = data.get("duration", self.duration)
+
+    def position(self, now: float | None = None) -> float:
+        pos = self.sample.get("position", 0.0)
+        if self.state == "playing":
+            now = time.monotonic() if now is None else now
+            pos += (now - self.sample.get("time", now)) * self.sample.get("rate", 1.0)
+        return min(pos, self.duration) if self.duration else pos
+
+
 # ---------------------------------------------------------------------------
 # Output formatters
 # ---------------------------------------------------------------------------
@@ -126,7 +503,8 @@ def fmt_track(track: dict | None, duration: bool = True) -> str:
 def fmt_status(data: dict) -> str:
     lines = []
     state = data.get("state", "stopped")
-    icon = {"playing": "▶", "paused": "⏸", "stopped": "⏹"}.get(state, "?")
+    icons = {"loading": "…", "playing": "▶", "paused": "⏸", "stopped": "⏹"}
+    icon = icons.get(state, "?")
     lines.append(f"{icon} {fmt_track(data.get('track'), duration=False)}")
 
     if data.get("track"):
@@ -159,12 +537,63 @@ def fmt_queue(data: dict) -> str:
         return "(empty queue)"
     cur = data.get("current_index", 0)
     lines = []
-    for i, t in enumerate(tracks):
+    for i, t in enumerate(tracks, data.get("offset", 0)):
         prefix = "▶ " if i == cur else "  "
         lines.append(f"{prefix}{i + 1}. {fmt_track(t)}")
     return "\n".join(lines)
 
 
+def fmt_infos(data: dict) -> str:
+    return "\n\n".join(
+        "\n".join(f"{k}: {v}" for k, v in t.items()) for t in data.get("tracks", [])
+    )
+
+
+def fmt_schedule(data: dict) -> str:
+    cues = data.get("scheduled", [])
+    if not cues:
+        return "(no scheduled actions)"
+    lines = []
+    for c in cues:
+        line = f"  {fmt_time(c.get('at', 0))}  {c.get('action', '?')}"
+        if c.get("value") is not None:
+            v = c["value"]
+            line += f" {v}" if c.get("action") == "gain" else f" {fmt_time(v)}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def fmt_added(data: dict) -> str:
+    line = f"Added {data.get('added', 0)} tracks (queue: {data.get('queue_length', 0)})"
+    lines = [line]
+    if count := data.get("skipped_count"):
+        lines.append(f"Skipped {count}:")
+        lines.extend(f"  {s}" for s in data.get("skipped", []))
+        if count > len(data.get("skipped", [])):
+            lines.append("  ...")
+    return "\n".join(lines)
+
+
+def fmt_batch(data: dict) -> str:
+    lines = []
+    for i, r in enumerate(data.get("results", [])):
+        if r.get("ok"):
+            lines.append(f"  [{i}] OK")
+        else:
+            lines.append(f"  [{i}] Error: {r.get('error', {}).get('message', '?')}")
+    return "\n".join(lines) or "(empty batch)"
+
+
+def fmt_stats(data: dict) -> str:
+    ev = data.get("events", {})
+    return (
+        f"Events: {ev.get('published', 0)} sent, "
+        f"{ev.get('coalesced', 0)} coalesced, {ev.get('dropped', 0)} dropped\n"
+        f"Clients: {data.get('clients', 0)} "
+        f"({data.get('subscribers', 0)} subscribed)"
+    )
+
+
 def fmt_playlists(data: dict) -> str:
     pls = data.get("playlists", [])
     if not pls:
@@ -198,11 +627,13 @@ def fmt_event(evt: dict) -> str:
     if etype == "position_update":
         pos = fmt_time(data.get("position", 0))
         dur = fmt_time(data.get("duration", 0))
-        return f"[position] {pos} / {dur}"
+        return f"[position] {pos} / {dur} {data.get('state', '')}".rstrip()
     if etype == "playback_paused":
         return f"[paused] at {fmt_time(data.get('position', 0))}"
     if etype == "error":
         return f"[error] {data.get('message', '')}"
+    if etype == "queue_updated" and "op" in data:
+        return f"[queue] {data['op']} v{data.get('version')}"
     return f"[{etype}]"
 
 
@@ -270,9 +701,33 @@ def cli(ctx, json_output: bool, tui: bool):
 
 @cli.command()
 @click.argument("file", required=False, type=click.Path())
+@click.option("--stream", help="Play raw PCM: fifo:PATH, pcm:PATH or pcm:- (stdin)")
+@click.option("--sample-rate", type=int, default=44100, show_default=True)
+@click.option("--channels", type=int, default=2, show_default=True)
+@click.option(
+    "--format",
+    "pcm_format",
+    type=click.Choice(["s16le", "s32le", "f32le"]),
+    default="s16le",
+    show_default=True,
+)
+@click.option("--prefill", type=int, default=100, help="Jitter buffer prefill (ms)")
+@click.option(
+    "--buffer", type=int, default=2000, help="Jitter buffer high-water mark (ms)"
+)
 @click.pass_context
-def play(ctx, file):
+def play(ctx, file, stream, sample_rate, channels, pcm_format, prefill, buffer):
     """Play a file or resume playback."""
+    if stream:
+        params = {
+            "rate": sample_rate,
+            "channels": channels,
+            "format": pcm_format,
+            "prefill": prefill,
+            "buffer": buffer,
+        }
+        play_stream(stream, params, ctx.obj["json"])
+        return
     args = {}
     if file:
         p = Path(file).expanduser()
@@ -280,6 +735,42 @@ def play(ctx, file):
     print_response(send_command("play", args), ctx.obj["json"])
 
 
+def _play_or_exit(args: dict, json_output: bool) -> None:
+    """Send ``play``; exit non-zero if the daemon refused it."""
+    resp = send_command("play", args)
+    print_response(resp, json_output)
+    if not resp.get("ok"):
+        sys.exit(1)
+
+
+def play_stream(spec: str, params: dict, json_output: bool) -> None:
+    """Start a PCM stream; for stdin, relay it through a private FIFO."""
+    scheme, _, path = spec.partition(":") if ":" in spec else ("pcm", "", spec)
+    if scheme not in ("fifo", "pcm"):
+        raise click.BadParameter(f"Invalid stream: {spec}", param_hint="--stream")
+    query = urlencode(params)
+    if path != "-":
+        p = Path(path).expanduser()
+        uri = f"{scheme}:{p.resolve() if p.exists() else path}?{query}"
+        _play_or_exit({"file": uri}, json_output)
+        return
+
+    ensure_daemon()
+    relay = get_runtime_dir() / f"stream-{os.getpid()}.fifo"
+    os.mkfifo(relay, mode=0o600)
+    try:
+        _play_or_exit({"file": f"fifo:{relay}?{query}"}, json_output)
+        sys.stdout.flush()
+        stdin = sys.stdin.buffer.fileno()
+        with open(relay, "wb", buffering=0) as out:
+            while data := os.read(stdin, 4096):
+                out.write(data)
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        relay.unlink(missing_ok=True)
+
+
 @cli.command()
 @click.pass_context
 def pause(ctx):
@@ -316,19 +807,73 @@ def seek(ctx, position):
     print_response(send_command("seek", {"pos": parse_seek(position)}), ctx.obj["json"])
 
 
+@cli.command()
+@click.argument("at", required=False)
+@click.argument(
+    "action",
+    required=False,
+    type=click.Choice(["pause", "seek", "loop", "stop", "gain"]),
+)
+@click.argument("value", required=False)
+@click.option("--clear", is_flag=True, help="Drop all pending cues")
+@click.pass_context
+def schedule(ctx, at, action, value, clear):
+    """Schedule a frame-accurate action (list cues when called bare).
+
+    \b
+      atk schedule 1:30 pause
+      atk schedule 2:00 seek 0:30
+      atk schedule 1:30 loop 1:00   # loop 1:00-1:30
+      atk schedule +10 gain 40
+    """
+    args: dict = {}
+    if clear:
+        args["action"] = "clear"
+    elif action:
+        if at is None:
+            raise click.UsageError("AT is required")
+        args = {"action": action, "at": parse_seek(at)}
+        if value is not None and action == "gain":
+            try:
+                args["value"] = int(value)
+            except ValueError:
+                raise click.BadParameter(
+                    f"Invalid gain: {value}", param_hint="VALUE"
+                ) from None
+        elif value is not None:
+            args["value"] = parse_seek(value)
+    elif at is not None:
+        raise click.UsageError("ACTION is required")
+    print_response(send_command("schedule", args), ctx.obj["json"], fmt_schedule)
+
+
 # ── Queue ──────────────────────────────────────────────────────────────────
 
 
 @cli.command()
-@click.argument("uri")
+@click.argument("uris", nargs=-1, required=True)
+@click.option("-r", "--recursive", is_flag=True, help="Descend into subdirectories")
+@click.option("--glob", "pattern", help="Only file names matching this pattern")
+@click.option(
+    "--sort",
+    type=click.Choice(["path", "name", "mtime", "none"]),
+    default="path",
+    show_default=True,
+)
 @click.pass_context
-def add(ctx, uri):
-    """Add file to queue."""
-    p = Path(uri).expanduser()
-    print_response(
-        send_command("add", {"uri": str(p.resolve()) if p.exists() else uri}),
-        ctx.obj["json"],
-    )
+def add(ctx, uris, recursive, pattern, sort):
+    """Add files, directories or streams to the queue."""
+    resolved = []
+    for uri in uris:
+        p = Path(uri).expanduser()
+        resolved.append(str(p.resolve()) if p.exists() else uri)
+    if len(resolved) == 1 and not (recursive or pattern or Path(resolved[0]).is_dir()):
+        print_response(send_command("add", {"uri": resolved[0]}), ctx.obj["json"])
+        return
+    args = {"paths": resolved, "recursive": recursive, "sort": sort}
+    if pattern:
+        args["glob"] = pattern
+    print_response(send_command("add", args), ctx.obj["json"], fmt_added)
 
 
 @cli.command()
@@ -358,10 +903,27 @@ def clear(ctx):
 
 
 @cli.command()
+@click.option("--page", is_flag=True, help="Page through the queue, fetched lazily")
+@click.option("--page-size", type=click.IntRange(1), default=200, show_default=True)
 @click.pass_context
-def queue(ctx):
+def queue(ctx, page, page_size):
     """Show queue contents."""
-    print_response(send_command("queue"), ctx.obj["json"], fmt_queue)
+    if not page and ctx.obj["json"]:
+        print_response(send_command("queue"), True)
+        return
+    pages = queue_pages(page_size) if page else queue_chunks()
+    try:
+        if not page:
+            for data in pages:
+                print(fmt_queue(data))
+        elif ctx.obj["json"]:
+            for data in pages:
+                click.echo(json.dumps(data))
+        else:
+            click.echo_via_pager(fmt_queue(data) + "\n" for data in pages)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 @cli.command()
@@ -379,16 +941,26 @@ def jump(ctx, index):
 @click.pass_context
 def status(ctx):
     """Show current playback status."""
-    print_response(send_command("status"), ctx.obj["json"], fmt_status)
+    # --json prints the full reply, levels and stream stats included
+    data = None if ctx.obj["json"] else read_status()
+    resp = {"ok": True, "data": data} if data else send_command("status")
+    print_response(resp, ctx.obj["json"], fmt_status)
 
 
 @cli.command()
-@click.argument("index", type=int, required=False)
+@click.argument("index", type=int, nargs=-1)
 @click.pass_context
 def info(ctx, index):
-    """Show track metadata."""
+    """Show track metadata (current track, or the tracks at INDEX...)."""
+    if len(index) > 1:
+        print_response(
+            send_command("info", {"index": list(index)}),
+            ctx.obj["json"],
+            fmt_infos,
+        )
+        return
     print_response(
-        send_command("info", {"index": index} if index is not None else {}),
+        send_command("info", {"index": index[0]} if index else {}),
         ctx.obj["json"],
     )
 
@@ -403,8 +975,9 @@ def volume(ctx, level):
 
 @cli.command()
 @click.argument("state", type=click.Choice(["on", "off"]), required=False)
+@click.option("--seed", type=int, help="Reproduce a previous shuffle order")
 @click.pass_context
-def shuffle(ctx, state):
+def shuffle(ctx, state, seed):
     """Toggle or set shuffle mode."""
     if state is None:
         resp = send_command("status")
@@ -413,7 +986,10 @@ def shuffle(ctx, state):
         )
     else:
         enabled = state == "on"
-    print_response(send_command("shuffle", {"enabled": enabled}), ctx.obj["json"])
+    args: dict = {"enabled": enabled}
+    if seed is not None:
+        args["seed"] = seed
+    print_response(send_command("shuffle", args), ctx.obj["json"])
 
 
 @cli.command()
@@ -462,6 +1038,22 @@ def load(ctx, name):
     print_response(send_command("load", {"name": name}), ctx.obj["json"])
 
 
+@cli.command()
+@click.argument("playlist", required=False)
+@click.option("-n", "--count", type=int, default=10, help="Upcoming tracks to decode")
+@click.option("--range", "index_range", help="Queue index range, e.g. 0:50")
+@click.pass_context
+def warm(ctx, playlist, count, index_range):
+    """Pre-decode upcoming tracks (or a playlist) into the PCM cache."""
+    if playlist:
+        args: dict = {"playlist": playlist}
+    elif index_range:
+        args = {"range": index_range}
+    else:
+        args = {"count": count}
+    print_response(send_command("warm", args), ctx.obj["json"])
+
+
 @cli.command()
 @click.pass_context
 def playlists(ctx):
@@ -469,6 +1061,32 @@ def playlists(ctx):
     print_response(send_command("playlists"), ctx.obj["json"], fmt_playlists)
 
 
+@cli.command()
+@click.argument("source", type=click.File("r"), default="-")
+@click.option("--stop-on-error", is_flag=True, help="Skip the rest after a failure")
+@click.pass_context
+def batch(ctx, source, stop_on_error):
+    """Run {cmd, args} lines from SOURCE (default stdin) as one atomic batch."""
+    commands = []
+    for n, line in enumerate(source, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise click.ClickException(f"line {n}: {e}") from e
+        if not isinstance(item, dict) or "cmd" not in item:
+            raise click.ClickException(f"line {n}: expected {{cmd, args}}")
+        commands.append({"cmd": item["cmd"], "args": item.get("args", {})})
+    args = {"commands": commands, "stop_on_error": stop_on_error}
+    resp = send_command("batch", args)
+    print_response(resp, ctx.obj["json"], fmt_batch)
+    results = resp.get("data", {}).get("results", [])
+    if not all(r.get("ok") for r in results) or len(results) < len(commands):
+        sys.exit(1)
+
+
 # ── Daemon ─────────────────────────────────────────────────────────────────
 
 
@@ -479,6 +1097,37 @@ def ping(ctx):
     print_response(send_command("ping"), ctx.obj["json"])
 
 
+@cli.command()
+@click.option(
+    "--on",
+    "kinds",
+    multiple=True,
+    type=click.Choice(["playback", "queue", "settings"]),
+    help="Only wake for these (repeatable); default any",
+)
+@click.option("--timeout", type=float, default=30.0, show_default=True)
+@click.pass_context
+def wait(ctx, kinds, timeout):
+    """Block until daemon state changes; exit 1 on timeout."""
+    resp = send_command("status")
+    if resp.get("ok"):
+        versions = resp["data"].get("versions", {})
+        since = {k: versions[k] for k in kinds or versions}
+        resp = send_command(
+            "wait", {"since": since, "timeout": timeout}, timeout=timeout + 5.0
+        )
+    print_response(resp, ctx.obj["json"])
+    if resp.get("ok") and not resp["data"].get("changed"):
+        sys.exit(1)
+
+
+@cli.command()
+@click.pass_context
+def stats(ctx):
+    """Show daemon event and client counters."""
+    print_response(send_command("stats"), ctx.obj["json"], fmt_stats)
+
+
 @cli.command()
 @click.pass_context
 def shutdown(ctx):
@@ -0,0 +1,368 @@
+"""Socket framings: JSON lines or length-prefixed MessagePack.
+
+A connection on ``atk.sock`` starts in JSON lines. A client that would
+rather not pay for JSON on every message sends
+``framing {"codec": "msgpack"}`` with nothing else in flight; the reply
+still comes as a JSON line, and every message after it, in both
+directions, is a MessagePack frame:
+
+    0   payload length, big-endian uint32
+    4   payload: one MessagePack object, shaped like the JSON message
+
+MessagePack comes from the compiled ``msgpack`` package when it is
+installed (``pip install atk[fast]``) and from ``packb``/``unpackb`` here
+otherwise. Both produce the same bytes for the types the protocol uses:
+maps, arrays, strings, integers, float64, booleans and nil.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import struct
+from typing import Any
+
+try:
+    import msgpack
+except ImportError:  # pure-Python fallback below
+    msgpack = None
+
+FRAME_HEADER = struct.Struct(">I")
+
+# ---------------------------------------------------------------------------
+# Pure-Python MessagePack
+# ---------------------------------------------------------------------------
+
+_B = struct.Struct(">BB").pack
+_H = struct.Struct(">BH").pack
+_I = struct.Struct(">BI").pack
+_Q = struct.Struct(">BQ").pack
+_b = struct.Struct(">Bb").pack
+_h = struct.Struct(">Bh").pack
+_i = struct.Struct(">Bi").pack
+_q = struct.Struct(">Bq").pack
+_d = struct.Struct(">Bd").pack
+
+
+def _pack_int(n: int, buf: bytearray) -> None:
+    if 0 <= n < 0x80:
+        buf.append(n)
+    elif -0x20 <= n < 0:
+        buf.append(n & 0xFF)
+    elif n >= 0:
+        if n < 0x100:
+            buf += _B(0xCC, n)
+        elif n < 0x10000:
+            buf += _H(0xCD, n)
+        elif n < 0x100000000:
+            buf += _I(0xCE, n)
+        elif n < 0x10000000000000000:
+            buf += _Q(0xCF, n)
+        else:
+            raise OverflowError(f"Integer too large for MessagePack: {n}")
+    elif n >= -0x80:
+        buf += _b(0xD0, n)
+    elif n >= -0x8000:
+        buf += _h(0xD1, n)
+    elif n >= -0x80000000:
+        buf += _i(0xD2, n)
+    elif n >= -0x8000000000000000:
+        buf += _q(0xD3, n)
+    else:
+        raise OverflowError(f"Integer too large for MessagePack: {n}")
+
+
+def _pack_header(
+    n: int, fix: int, fix_limit: int, codes: bytes, buf: bytearray
+) -> None:
+    """Length header: fix form below ``fix_limit``, else 8/16/32-bit forms.
+
+    ``codes`` holds the 8-, 16- and 32-bit type bytes; arrays and maps have
+    no 8-bit form (a zero in ``codes``).
+    """
+    if n < fix_limit:
+        buf.append(fix | n)
+    elif n < 0x100 and codes[0]:
+        buf += _B(codes[0], n)
+    elif n < 0x10000:
+        buf += _H(codes[1], n)
+    elif n < 0x100000000:
+        buf += _I(codes[2], n)
+    else:
+        raise ValueError(f"Too long for MessagePack: {n}")
+
+
+_STR = b"\xd9\xda\xdb"
+_BIN = b"\xc4\xc5\xc6"
+_ARRAY = b"\x00\xdc\xdd"
+_MAP = b"\x00\xde\xdf"
+
+
+def _pack(obj: Any, buf: bytearray) -> None:
+    t = type(obj)
+    if t is str:
+        data = obj.encode()
+        _pack_header(len(data), 0xA0, 32, _STR, buf)
+        buf += data
+    elif t is int:
+        _pack_int(obj, buf)
+    elif t is float:
+        buf += _d(0xCB, obj)
+    elif t is dict:
+        _pack_header(len(obj), 0x80, 16, _MAP, buf)
+        for key, value in obj.items():
+            _pack(key, buf)
+            _pack(value, buf)
+    elif t is list or t is tuple:
+        _pack_header(len(obj), 0x90, 16, _ARRAY, buf)
+        for item in obj:
+            _pack(item, buf)
+    elif obj is None:
+        buf.append(0xC0)
+    elif obj is True:
+        buf.append(0xC3)
+    elif obj is False:
+        buf.append(0xC2)
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        data = bytes(obj)
+        _pack_header(len(data), 0, 0, _BIN, buf)
+        buf += data
+    # Subclasses (IntEnum, str enums, numpy.float64) pack as their base
+    elif isinstance(obj, int):
+        _pack_int(int(obj), buf)
+    elif isinstance(obj, float):
+        buf += _d(0xCB, float(obj))
+    elif isinstance(obj, str):
+        _pack(str(obj), buf)
+    elif isinstance(obj, dict):
+        _pack(dict(obj), buf)
+    elif isinstance(obj, (list, tuple)):
+        _pack(list(obj), buf)
+    else:
+        raise TypeError(f"Cannot serialize {t.__name__} to MessagePack")
+
+
+def packb(obj: Any) -> bytes:
+    """``obj`` as MessagePack."""
+    buf = bytearray()
+    _pack(obj, buf)
+    return bytes(buf)
+
+
+_SIZES = {
+    # code: (struct, kind) for the fixed-width and length-prefixed types
+    0xC4: (struct.Struct(">B"), "bin"),
+    0xC5: (struct.Struct(">H"), "bin"),
+    0xC6: (struct.Struct(">I"), "bin"),
+    0xCA: (struct.Struct(">f"), "value"),
+    0xCB: (struct.Struct(">d"), "value"),
+    0xCC: (struct.Struct(">B"), "value"),
+    0xCD: (struct.Struct(">H"), "value"),
+    0xCE: (struct.Struct(">I"), "value"),
+    0xCF: (struct.Struct(">Q"), "value"),
+    0xD0: (struct.Struct(">b"), "value"),
+    0xD1: (struct.Struct(">h"), "value"),
+    0xD2: (struct.Struct(">i"), "value"),
+    0xD3: (struct.Struct(">q"), "value"),
+    0xD9: (struct.Struct(">B"), "str"),
+    0xDA: (struct.Struct(">H"), "str"),
+    0xDB: (struct.Struct(">I"), "str"),
+    0xDC: (struct.Struct(">H"), "array"),
+    0xDD: (struct.Struct(">I"), "array"),
+    0xDE: (struct.Struct(">H"), "map"),
+    0xDF: (struct.Struct(">I"), "map"),
+}
+
+
+def _take(data: bytes, pos: int, n: int) -> bytes:
+    end = pos + n
+    if end > len(data):
+        raise ValueError("Truncated MessagePack data")
+    return data[pos:end]
+
+
+def _unpack(data: bytes, pos: int) -> tuple[Any, int]:
+    code = data[pos]
+    pos += 1
+    if code < 0x80:
+        return code, pos
+    if code >= 0xE0:
+        return code - 0x100, pos
+    if 0xA0 <= code < 0xC0:
+        n = code & 0x1F
+        return _take(data, pos, n).decode(), pos + n
+    if 0x90 <= code < 0xA0:
+        return _unpack_array(data, pos, code & 0x0F)
+    if code < 0x90:
+        return _unpack_map(data, pos, code & 0x0F)
+    if code == 0xC0:
+        return None, pos
+    if code == 0xC2:
+        return False, pos
+    if code == 0xC3:
+        return True, pos
+    size = _SIZES.get(code)
+    if size is None:
+        raise ValueError(f"Unsupported MessagePack type 0x{code:02x}")
+    fmt, kind = size
+    (value,) = fmt.unpack(_take(data, pos, fmt.size))
+    pos += fmt.size
+    if kind == "value":
+        return value, pos
+    if kind == "str":
+        return _take(data, pos, value).decode(), pos + value
+    if kind == "bin":
+        return _take(data, pos, value), pos + value
+    if kind == "array":
+        return _unpack_array(data, pos, value)
+    return _unpack_map(data, pos, value)
+
+
+def _unpack_array(data: bytes, pos: int, n: int) -> tuple[list, int]:
+    items = []
+    for _ in range(n):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(data: bytes, pos: int, n: int) -> tuple[dict, int]:
+    obj = {}
+    for _ in range(n):
+        key, pos = _unpack(data, pos)
+        value, pos = _unpack(data, pos)
+        obj[key] = value
+    return obj, pos
+
+
+def unpackb(data: bytes) -> Any:
+    """The one MessagePack object in ``data``; ``ValueError`` if malformed."""
+    try:
+        obj, end = _unpack(data, 0)
+    except IndexError:
+        raise ValueError("Truncated MessagePack data") from None
+    except TypeError as e:  # an array or map as a map key
+        raise ValueError(f"Unhashable MessagePack map key: {e}") from None
+    except RecursionError:
+        raise ValueError("MessagePack data nested too deeply") from None
+    if end != len(data):
+        raise ValueError("Extra data after MessagePack object")
+    return obj
+
+
+# ---------------------------------------------------------------------------
+# Framings
+# ---------------------------------------------------------------------------
+
+
+class Framing:
+    """How messages are cut and encoded on one connection.
+
+    ``encode`` returns a whole unit for the wire (terminator or header
+    included). ``read`` and ``split`` return the next message's payload
+    from a stream or from a receive buffer; ``decode`` parses a payload and
+    raises ``ValueError`` if it is malformed.
+    """
+
+    name = ""
+    label = ""  # the format's name in error messages
+    compiled = False
+
+    def encode(self, msg: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, payload: bytes) -> Any:
+        raise NotImplementedError
+
+    async def read(self, reader: asyncio.StreamReader, limit: int) -> bytes | None:
+        """Next payload, or None once the peer hangs up."""
+        raise NotImplementedError
+
+    def split(self, buf: bytearray, start: int = 0) -> bytes | None:
+        """Remove and return the first complete payload in ``buf``, if any.
+
+        ``start`` is how much of ``buf`` is already known to hold no
+        complete message, so a long line is not searched again per chunk.
+        """
+        raise NotImplementedError
+
+
+class JsonLines(Framing):
+    """One JSON object per newline-terminated line. Blank lines read as b""."""
+
+    name = "json"
+    label = "JSON"
+    compiled = True
+
+    def encode(self, msg: Any) -> bytes:
+        return (json.dumps(msg) + "\n").encode()
+
+    def decode(self, payload: bytes) -> Any:
+        return json.loads(payload)
+
+    async def read(self, reader: asyncio.StreamReader, limit: int) -> bytes | None:
+        line = await reader.readline()  # the reader's own limit applies
+        return line.strip() if line else None
+
+    def split(self, buf: bytearray, start: int = 0) -> bytes | None:
+        end = buf.find(b"\n", start)
+        if end < 0:
+            return None
+        line = bytes(buf[:end])
+        del buf[: end + 1]
+        return line
+
+
+class MsgpackFrames(Framing):
+    """One MessagePack object per length-prefixed frame."""
+
+    name = "msgpack"
+    label = "MessagePack"
+    compiled = msgpack is not None
+
+    def __init__(self) -> None:
+        if msgpack is not None:
+            self._packb = msgpack.packb
+            self._unpackb = msgpack.unpackb
+        else:
+            self._packb = packb
+            self._unpackb = unpackb
+
+    def encode(self, msg: Any) -> bytes:
+        payload = self._packb(msg)
+        return FRAME_HEADER.pack(len(payload)) + payload
+
+    def decode(self, payload: bytes) -> Any:
+        try:
+            return self._unpackb(payload)
+        except TypeError as e:  # compiled msgpack: unhashable map key
+            raise ValueError(str(e)) from None
+
+    async def read(self, reader: asyncio.StreamReader, limit: int) -> bytes | None:
+        try:
+            header = await reader.readexactly(FRAME_HEADER.size)
+        except asyncio.IncompleteReadError:
+            return None
+        (size,) = FRAME_HEADER.unpack(header)
+        if size > limit:
+            raise ValueError(f"Frame of {size} bytes exceeds {limit}")
+        try:
+            return await reader.readexactly(size)
+        except asyncio.IncompleteReadError:
+            return None
+
+    def split(self, buf: bytearray, start: int = 0) -> bytes | None:
+        if len(buf) < FRAME_HEADER.size:
+            return None
+        (size,) = FRAME_HEADER.unpack_from(buf)
+        end = FRAME_HEADER.size + size
+        if len(buf) < end:
+            return None
+        payload = bytes(buf[FRAME_HEADER.size : end])
+        del buf[:end]
+        return payload
+
+
+JSON_LINES = JsonLines()
+MSGPACK = MsgpackFrames()
+FRAMINGS: dict[str, Framing] = {f.name: f for f in (JSON_LINES, MSGPACK)}
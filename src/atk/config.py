@@ -16,7 +16,7 @@ def get_runtime_dir() -> Path:
 
 
 def get_state_dir() -> Path:
-    """Get ATK state directory (logs)."""
+    """Get ATK state directory (logs, journaled daemon state)."""
     if xdg := os.environ.get("XDG_STATE_HOME"):
         return Path(xdg) / "atk"
     return Path.home() / ".local" / "state" / "atk"
@@ -27,3 +27,10 @@ def get_data_dir() -> Path:
     if xdg := os.environ.get("XDG_DATA_HOME"):
         return Path(xdg) / "atk"
     return Path.home() / ".local" / "share" / "atk"
+
+
+def get_cache_dir() -> Path:
+    """Get ATK cache directory (decoded PCM)."""
+    if xdg := os.environ.get("XDG_CACHE_HOME"):
+        return Path(xdg) / "atk"
+    return Path.home() / ".cache" / "atk"
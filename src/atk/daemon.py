@@ -3,20 +3,448 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import errno
+import itertools
 import json
 import logging
 import os
-import random
 import signal
+import stat
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-
-from .config import get_data_dir, get_runtime_dir, get_state_dir
-from .player import Player, is_supported, list_devices
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, NamedTuple
+
+from .bridge import AudioEvents
+from .codec import FRAMINGS, JSON_LINES, Framing
+from .config import get_cache_dir, get_data_dir, get_runtime_dir, get_state_dir
+from .decode import DecodeService
+from .engine import RemotePlayer
+from .journal import Journal
+from .player import (
+    SAMPLE_RATE,
+    SCHEDULE_ACTIONS,
+    Player,
+    is_supported,
+    list_devices,
+)
+from .protocol import (
+    COMMANDS,
+    PROTOCOL_VERSION,
+    ProtocolError,
+    compile_args,
+    error,
+    error_info,
+)
+from .scan import scan_paths
+from .statusblock import StatusBlock
+from .stream import is_stream_uri
+from .tracklist import FLAG_UNPLAYABLE, Track, TrackQueue
 
 _logger = logging.getLogger("atk")
 
 
+SOCKET_LINE_LIMIT = 16 * 1024 * 1024
+REPLY_OPEN_TIMEOUT = 2.0
+CMD_READ_SIZE = 1 << 16
+CMD_BACKLOG = 4096
+ADD_SKIPPED_LIMIT = 100
+EVENT_BACKLOG = 256
+EVENT_WINDOW = 0.02
+CLOCK_DRIFT = 0.05  # seconds off the last clock sample before clients resync
+CLOCK_CHECK_INTERVAL = 1.0
+JOURNAL_POSITION_INTERVAL = 5.0  # seconds between journaled positions while playing
+ENCODE_INLINE_LIMIT = 1000  # tracks; larger replies are encoded off the loop
+WAIT_TIMEOUT = 30.0
+WAIT_TIMEOUT_MAX = 300.0
+VERSION_KINDS = ("playback", "queue", "settings")
+PAGE_ARGS = ("offset", "limit", "around_current")
+STREAM_CHUNK = 500  # list items per streamed frame
+STREAM_WINDOW = 8  # frames queued ahead of the client before the sender waits
+
+# Commands on worker lanes, with the resources they stay ordered on. Anything
+# else is a transport control and runs as soon as it arrives.
+COMMAND_RESOURCES: dict[str, tuple[str, ...]] = {
+    "add": ("queue",),
+    "remove": ("queue",),
+    "move": ("queue",),
+    "clear": ("queue",),
+    "queue": ("queue",),
+    "jump": ("queue",),
+    "next": ("queue",),
+    "prev": ("queue",),
+    "shuffle": ("queue",),
+    "info": ("queue",),
+    "save": ("playlists", "queue"),
+    "load": ("playlists", "queue"),
+    "playlists": ("playlists",),
+    "warm": ("cache", "queue"),
+    "devices": ("device",),
+    "set-device": ("device",),
+}
+
+# Commands that can move playback; the clock is resynced after each
+PLAYBACK_COMMANDS = frozenset(
+    {
+        "play",
+        "pause",
+        "stop",
+        "next",
+        "prev",
+        "seek",
+        "rate",
+        "remove",
+        "clear",
+        "jump",
+        "load",
+    }
+)
+
+# Commands that change nothing the status block shows
+QUERY_COMMANDS = frozenset(
+    {
+        "status",
+        "info",
+        "queue",
+        "playlists",
+        "devices",
+        "ping",
+        "stats",
+        "subscribe",
+        "wait",
+    }
+)
+
+# Events where only the newest one in a window matters, keyed by topic
+LATEST_WINS = {
+    "position_update": "position",
+    "volume_changed": "volume",
+    "track_changed": "track",
+    "playback_started": "playback",
+    "playback_paused": "playback",
+    "playback_stopped": "playback",
+    "add_progress": "add_progress",
+    "stream_underrun": "stream_underrun",
+}
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+
+
+class _Client:
+    """Outbound channel for one client: its responses and, once subscribed,
+    events. Each client has its own queue and writer task, so a stalled
+    reader only ever backs up itself. Responses are always queued; events
+    are dropped once ``maxsize`` messages are waiting. Streamed responses go
+    through ``send``, which waits for the writer instead. Messages are
+    queued already encoded in the client's ``framing``."""
+
+    oneshot = False
+
+    def __init__(self, maxsize: int = 256):
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self.framing: Framing = JSON_LINES
+        self.maxsize = maxsize
+        self.subscribed = False
+        self.streaming = 0
+        self.closed = False
+        self.dropped = 0
+        self.task: asyncio.Task | None = None
+        self._written = asyncio.Event()
+
+    def respond(self, data: bytes) -> None:
+        self.queue.put_nowait(data)
+
+    async def send(self, data: bytes, window: int) -> None:
+        """Queue a stream frame once fewer than ``window`` are waiting."""
+        while not self.closed and self.queue.qsize() >= window:
+            self._written.clear()
+            await self._written.wait()
+        if self.closed:
+            raise ConnectionResetError("Client went away mid-stream")
+        self.queue.put_nowait(data)
+
+    def finish(self) -> None:
+        """Close once everything queued so far has been written."""
+        self.queue.put_nowait(None)
+
+    def offer(self, data: bytes) -> bool:
+        if self.queue.qsize() >= self.maxsize:
+            self.dropped += 1
+            return False
+        self.queue.put_nowait(data)
+        return True
+
+    async def run(self) -> None:
+        try:
+            while True:
+                items = [await self.queue.get()]
+                while not self.queue.empty():
+                    items.append(self.queue.get_nowait())
+                finished = None in items
+                if data := b"".join(item for item in items if item is not None):
+                    await self._write(data)
+                    self._written.set()
+                if finished or (
+                    self.oneshot
+                    and not self.subscribed
+                    and not self.streaming
+                    and self.queue.empty()
+                ):
+                    break
+        except OSError as e:
+            _logger.debug("Client gone: %s", e)
+        finally:
+            self.gone()
+
+    def gone(self) -> None:
+        """The writer has stopped: release senders and the channel."""
+        self.closed = True
+        self._written.set()
+        self.close()
+
+    async def _write(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class _SocketClient(_Client):
+    """A persistent connection on atk.sock."""
+
+    def __init__(self, writer: asyncio.StreamWriter, maxsize: int = 256):
+        super().__init__(maxsize)
+        self.writer = writer
+
+    async def _write(self, data: bytes) -> None:
+        self.writer.write(data)
+        await self.writer.drain()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _FifoClient(_Client):
+    """A reply FIFO named by the client in its request's ``reply`` field.
+
+    The FIFO is opened non-blocking once the client is reading. A one-shot
+    channel is closed as soon as its response is written; a subscribed one
+    stays open for events until the reader goes away.
+    """
+
+    oneshot = True
+
+    def __init__(self, path: str, maxsize: int = 256):
+        super().__init__(maxsize)
+        self.path = path
+        self._fd: int | None = None
+
+    async def run(self) -> None:
+        deadline = time.monotonic() + REPLY_OPEN_TIMEOUT
+        while self._fd is None:
+            try:
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                if e.errno != errno.ENXIO or time.monotonic() > deadline:
+                    _logger.debug("Reply FIFO %s: %s", self.path, e)
+                    self.gone()
+                    return
+                await asyncio.sleep(0.005)  # client not reading yet
+        await super().run()
+
+    async def _write(self, data: bytes) -> None:
+        fd = self._fd
+        if fd is None:
+            raise ConnectionResetError(f"Reply FIFO {self.path} is closed")
+        loop = asyncio.get_running_loop()
+        view = memoryview(data)
+        while view:
+            try:
+                view = view[os.write(fd, view) :]
+            except BlockingIOError:
+                ready = loop.create_future()
+                loop.add_writer(fd, ready.set_result, None)
+                try:
+                    await ready
+                finally:
+                    loop.remove_writer(fd)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+# ---------------------------------------------------------------------------
+# Event coalescing
+# ---------------------------------------------------------------------------
+
+
+def _fields(args: dict) -> frozenset[str] | None:
+    """The ``fields`` projection requested, or None for everything."""
+    fields = args.get("fields")
+    return None if fields is None else frozenset(fields)
+
+
+def _project(info: dict, fields: frozenset[str] | None) -> dict:
+    if fields is None:
+        return info
+    return {k: v for k, v in info.items() if k in fields}
+
+
+class _Command(NamedTuple):
+    """A registered command: its handler's name and compiled validator.
+
+    The handler is looked up on the daemon per call, so it can be replaced
+    on an instance (tests do).
+    """
+
+    handler: str | None  # None: batch and framing, handled before _run
+    validate: Callable[[dict], None]
+
+
+def _bad_message(e: ValueError, framing: Framing = JSON_LINES) -> dict:
+    return error("INVALID_MESSAGE", f"Invalid {framing.label}: {e}")
+
+
+def _frames(resp: dict, size: int) -> Iterator[dict]:
+    """Split a response into stream frames (without ``id`` and ``seq``).
+
+    The head frame carries ``ok`` and the response's scalar fields, with
+    each list field cut to its first ``size`` items; the rest of each list
+    follows ``size`` items per frame, in order. A final frame with
+    ``more: false`` ends the stream. A failed command is a single final
+    frame carrying its ``error``.
+    """
+    data = resp.get("data")
+    if not resp.get("ok") or not isinstance(data, dict):
+        yield {"more": False, **{k: v for k, v in resp.items() if k != "id"}}
+        return
+    lists = {k: v for k, v in data.items() if isinstance(v, list)}
+    head = {k: v[:size] if k in lists else v for k, v in data.items()}
+    yield {"more": True, "ok": True, "data": head}
+    for key, items in lists.items():
+        for i in range(size, len(items), size):
+            yield {"more": True, "data": {key: items[i : i + size]}}
+    yield {"more": False}
+
+
+def _merge_delta(deltas: list[dict], delta: dict) -> int:
+    """Fold ``delta`` into pending queue deltas; returns how many were merged.
+
+    A clear supersedes everything before it; adjacent inserts and repeated
+    current changes become one delta whose ``base`` is the version it
+    applies on top of.
+    """
+    last = deltas[-1]
+    op = delta["op"]
+    if op == "clear":
+        merged = len(deltas)
+        deltas[:] = [delta]
+        return merged
+    if op != last["op"]:
+        deltas.append(delta)
+        return 0
+    if op == "insert" and delta["index"] == last["index"] + len(last["tracks"]):
+        last["tracks"].extend(delta["tracks"])
+    elif op != "current_changed":
+        deltas.append(delta)
+        return 0
+    last.setdefault("base", last["version"] - 1)
+    last["version"] = delta["version"]
+    last["current_index"] = delta["current_index"]
+    return 1
+
+
+class _EventCoalescer:
+    """Holds events for ``window`` seconds and merges bursts per topic.
+
+    Within a window, a newer event of a ``LATEST_WINS`` topic replaces the
+    pending one and queue deltas are merged where possible; all other
+    events are kept, in order. A window of 0 publishes immediately.
+    """
+
+    def __init__(self, publish: Callable[[str, dict], None], window: float):
+        self.publish = publish
+        self.window = window
+        self.coalesced = 0
+        self._pending: dict[object, tuple[str, Any]] = {}
+        self._seq = itertools.count()
+        self._handle: asyncio.TimerHandle | None = None
+
+    def add(self, event: str, data: dict) -> None:
+        if self.window <= 0:
+            self.publish(event, data)
+            return
+        if event == "queue_updated":
+            pending = self._pending.get("queue")
+            if pending is None:
+                self._pending["queue"] = (event, [data])
+            else:
+                self.coalesced += _merge_delta(pending[1], data)
+        elif topic := LATEST_WINS.get(event):
+            if self._pending.pop(topic, None) is not None:
+                self.coalesced += 1
+            self._pending[topic] = (event, data)
+        else:
+            self._pending[next(self._seq)] = (event, data)
+        if self._handle is None:
+            loop = asyncio.get_running_loop()
+            self._handle = loop.call_later(self.window, self.flush)
+
+    def flush(self) -> None:
+        self._handle = None
+        pending, self._pending = self._pending, {}
+        for event, data in pending.values():
+            if event == "queue_updated":
+                for delta in data:
+                    self.publish(event, delta)
+            else:
+                self.publish(event, data)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._pending.clear()
+
+
+# ---------------------------------------------------------------------------
+# Command lanes
+# ---------------------------------------------------------------------------
+
+
+class _CommandLanes:
+    """FIFO locks per resource for worker-lane commands.
+
+    Commands sharing a resource run one at a time in arrival order; commands
+    on different resources, and transport controls, run alongside them.
+    Locks are always taken in sorted order, so commands needing several
+    resources cannot deadlock.
+    """
+
+    def __init__(self) -> None:
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @contextlib.asynccontextmanager
+    async def hold(self, resources: tuple[str, ...]) -> AsyncIterator[None]:
+        held: list[asyncio.Lock] = []
+        try:
+            for name in sorted(resources):
+                lock = self._locks.setdefault(name, asyncio.Lock())
+                await lock.acquire()
+                held.append(lock)
+            yield
+        finally:
+            for lock in reversed(held):
+                lock.release()
+
+
 # ---------------------------------------------------------------------------
 # Daemon
 # ---------------------------------------------------------------------------
@@ -25,33 +453,112 @@ _logger = logging.getLogger("atk")
 class Daemon:
     """Single-instance ATK daemon managing playback, queue, and pipe IPC."""
 
-    def __init__(self, runtime_dir: Path):
+    def __init__(
+        self,
+        runtime_dir: Path,
+        engine: str = "thread",
+        event_window: float = EVENT_WINDOW,
+        journal: Journal | None = None,
+    ):
         self.runtime_dir = runtime_dir
         self.cmd_pipe = runtime_dir / "atk.cmd"
         self.resp_pipe = runtime_dir / "atk.resp"
-        self.player = Player()
+        self.sock_path = runtime_dir / "atk.sock"
+        self.status_path = runtime_dir / "atk.status"
+        self.decoder = DecodeService(get_cache_dir() / "pcm")
+        self.player: Player | RemotePlayer
+        if engine == "process":
+            self.player = RemotePlayer(cache_dir=self.decoder.cache_dir)
+        elif engine == "thread":
+            self.player = Player(cache=self.decoder)
+        else:
+            raise ValueError(f"Unknown engine: {engine}")
+        self._commands = self._compile_commands()
 
         # Queue state
-        self.queue: list[str] = []
+        self._queue = TrackQueue()
         self.queue_pos = 0
+        # State versions: each moves when its part of the state changes, and
+        # state_version moves with any of them; ``wait`` blocks on these
+        self.queue_version = 0  # bumped by every queue_updated delta
+        self.playback_version = 0  # bumped by every clock discontinuity
+        self.settings_version = 0  # volume, shuffle, repeat, device
+        self.state_version = 0
+        self._changed = asyncio.Event()
+        self._published_pos = 0
         self.shuffle = False
-        self.shuffle_order: list[int] = []
         self.repeat = "none"  # none | queue | track
         self.volume = 80
-        self.state = "stopped"  # stopped | playing | paused
+        self.state = "stopped"  # stopped | loading | playing | paused
+        self._clock_ref: dict | None = None  # last published clock sample
+        self._status_block: StatusBlock | None = None
+        self._status_track: tuple[Track | None, float, int] = (None, 0.0, 0)
+        self._status_track_json = b""
         self.rate = 1.0
+        # State changes are journaled here, if anywhere, for a restart
+        self._journal = journal
+        self._journaled_at = 0.0  # monotonic time of the last clock record
+
+        # Track loading: decodes run on one thread, newest generation wins
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="atk-load")
+        self._load_gen = 0
+        self._load_task: asyncio.Task | None = None
+        self._load_failures = 0  # tracks in a row that failed to load
+        # Seek and cues sent while loading, applied when the track attaches
+        self._pending_seek: float | None = None
+        self._pending_cues: list[tuple[int, str, float | None]] = []
 
         # IPC state
         self._running = False
+        self._stopped = False
         self._read_task: asyncio.Task | None = None
         self._writer_task: asyncio.Task | None = None
         self._position_task: asyncio.Task | None = None
-        self._resp_queue: asyncio.Queue[str] = asyncio.Queue(maxsize=256)
+        # atk.resp: responses are always queued, events only below the backlog
+        self._resp_queue: asyncio.Queue[bytes] = asyncio.Queue()
         self._has_subscribers = False
-
-        self.player.set_end_callback(self._on_track_end)
+        self._events = _EventCoalescer(self._publish, event_window)
+        self._events_published = 0
+        self._events_dropped = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._clients: set[_Client] = set()
+        self._reply_clients: dict[str, _FifoClient] = {}
+
+        # Batches run with no other command interleaved
+        self._inflight = 0
+        self._idle = asyncio.Event()  # set whenever _inflight drops to 0
+        self._idle.set()
+        self._batching = False
+        self._batch_over = asyncio.Event()  # set while no batch runs
+        self._batch_over.set()
+        self._lanes = _CommandLanes()
+        self._slots = asyncio.Semaphore(CMD_BACKLOG)  # commands being handled
+
+        # Audio-thread events reach the loop through preallocated slots
+        self._audio = AudioEvents(SCHEDULE_ACTIONS)
+        self.player.set_end_callback(self._audio.track_end)
+        self.player.set_action_callback(self._audio.action)
+        self.player.set_underrun_callback(self._audio.underrun)
         self.player.set_volume(self.volume)
 
+    @property
+    def queue(self) -> TrackQueue:
+        return self._queue
+
+    @queue.setter
+    def queue(self, uris: list[str]) -> None:
+        self._queue = TrackQueue(uris)
+
+    @property
+    def shuffle_order(self) -> list[int]:
+        """Shuffle order as play indices; [] while shuffle is off."""
+        return self._queue.shuffle_indices()
+
+    @shuffle_order.setter
+    def shuffle_order(self, indices: list[int]) -> None:
+        self._queue.set_shuffle_order(indices)
+
     # ── Lifecycle ──────────────────────────────────────────────────────────
 
     async def start(self) -> None:
@@ -62,14 +569,47 @@ class Daemon:
             os.mkfifo(pipe, mode=0o600)
 
         self._running = True
+        self._loop = asyncio.get_running_loop()
+        self._audio.attach(
+            self._loop, self._on_track_end, self._on_scheduled_action, self._on_underrun
+        )
         self._read_task = asyncio.create_task(self._read_loop())
         self._writer_task = asyncio.create_task(self._write_loop())
         self._position_task = asyncio.create_task(self._position_loop())
+        if self.sock_path.exists():
+            self.sock_path.unlink()
+        self._server = await asyncio.start_unix_server(
+            self._handle_client, path=str(self.sock_path), limit=SOCKET_LINE_LIMIT
+        )
+        os.chmod(self.sock_path, 0o600)
+        self._status_block = StatusBlock(self.status_path)
+        self._write_status()
         _logger.info("Daemon started, pipes at %s", self.runtime_dir)
 
     async def stop(self) -> None:
         self._running = False
-        self.player.stop()
+        self._stopped = True
+        journal, self._journal = self._journal, None
+        if journal is not None:
+            await journal.close(self._saved_state())
+        self._state_changed()  # release long polls
+        self._events.close()
+        self._cancel_load()
+        self._loader.shutdown(wait=False, cancel_futures=True)
+        self.player.close()
+        self._audio.close()
+        if self._status_block is not None:
+            self._status_block.close()
+            self._status_block = None
+        self.decoder.shutdown()
+        if self._server:
+            self._server.close()
+        for client in list(self._clients):
+            if client.task:
+                client.task.cancel()
+            client.close()
+        if self._server:
+            await self._server.wait_closed()
         for task in (self._read_task, self._writer_task, self._position_task):
             if task:
                 task.cancel()
@@ -77,34 +617,91 @@ class Daemon:
                     await task
                 except asyncio.CancelledError:
                     pass
-        for pipe in (self.cmd_pipe, self.resp_pipe):
+        for pipe in (self.cmd_pipe, self.resp_pipe, self.sock_path):
             if pipe.exists():
                 pipe.unlink()
         _logger.info("Daemon stopped")
 
+    def restore(self, saved: dict) -> None:
+        """Take over a state from ``Journal.load``, with playback stopped."""
+        self._queue = TrackQueue(saved["queue"])
+        self.queue_pos = min(saved["queue_pos"], max(0, len(self._queue) - 1))
+        self._published_pos = self.queue_pos
+        self.repeat = saved["repeat"]
+        self.volume = saved["volume"]
+        self.player.set_volume(self.volume)
+        self.rate = saved["rate"]
+        self.player.set_rate(self.rate)
+        self.shuffle = saved["shuffle"]
+        if self.shuffle:
+            self._queue.shuffle_on(seed=saved["seed"], drawn=saved["drawn"])
+
+    async def resume(self, saved: dict) -> None:
+        """Load the restored current track at the saved position, paused if
+        it was paused; nothing if playback was stopped."""
+        if saved["state"] == "stopped" or not self.queue:
+            return
+        await self._play_current()
+        self._pending_seek = saved["position"] or None
+        if saved["state"] == "paused":
+            self.state = "paused"
+
     # ── Pipe I/O ───────────────────────────────────────────────────────────
 
     async def _read_loop(self) -> None:
-        loop = asyncio.get_event_loop()
-        while self._running:
+        """Start atk.cmd requests in arrival order.
+
+        The FIFO stays open for the daemon's lifetime: a non-blocking read
+        end registered with the loop, plus a write end of our own so that
+        writers coming and going never produce EOF. Every complete line in
+        each read is a request, so ``cat commands.jsonl > atk.cmd`` works.
+        Lines up to PIPE_BUF bytes from concurrent writers never interleave.
+        Requests are not awaited one by one: ``_execute`` keeps commands on
+        the same resource in order while controls go straight through.
+        """
+        loop = asyncio.get_running_loop()
+        fd = os.open(self.cmd_pipe, os.O_RDONLY | os.O_NONBLOCK)
+        keepalive = os.open(self.cmd_pipe, os.O_WRONLY | os.O_NONBLOCK)
+        lines: asyncio.Queue[bytearray] = asyncio.Queue()
+        buf = bytearray()
+        paused = False
+
+        def on_readable() -> None:
+            nonlocal buf, paused
             try:
-
-                def read_line() -> str | None:
-                    try:
-                        with open(self.cmd_pipe, "r") as f:
-                            return f.readline().strip()
-                    except OSError:
-                        return None
-
-                line = await loop.run_in_executor(None, read_line)
-                if line:
-                    resp = await self._dispatch(line)
-                    await self._resp_queue.put(json.dumps(resp))
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                _logger.error("Read loop error: %s", e)
-                await asyncio.sleep(0.1)
+                data = os.read(fd, CMD_READ_SIZE)
+            except BlockingIOError:
+                return
+            buf += data
+            *complete, rest = buf.split(b"\n")
+            buf = bytearray(rest) if len(rest) <= SOCKET_LINE_LIMIT else bytearray()
+            for line in complete:
+                if line.strip():
+                    lines.put_nowait(line)
+            if lines.qsize() >= CMD_BACKLOG:
+                loop.remove_reader(fd)  # let the pipe buffer push back
+                paused = True
+
+        loop.add_reader(fd, on_readable)
+        try:
+            while self._running:
+                line = await lines.get()
+                if paused and lines.qsize() < CMD_BACKLOG // 2:
+                    loop.add_reader(fd, on_readable)
+                    paused = False
+                await self._slots.acquire()
+                # Decoded in the handler: a bad line gets an error, not the reader
+                task = asyncio.create_task(self._handle_fifo_line(bytes(line)))
+                task.add_done_callback(self._command_done)
+        finally:
+            loop.remove_reader(fd)
+            os.close(fd)
+            os.close(keepalive)
+
+    def _command_done(self, task: asyncio.Task) -> None:
+        self._slots.release()
+        if not task.cancelled() and task.exception():
+            _logger.error("Command error: %s", task.exception())
 
     async def _write_loop(self) -> None:
         loop = asyncio.get_event_loop()
@@ -116,11 +713,10 @@ class Daemon:
             except asyncio.CancelledError:
                 break
 
-            def write(text: str) -> None:
+            def write(data: bytes) -> None:
                 try:
-                    with open(self.resp_pipe, "w") as f:
-                        f.write(text + "\n")
-                        f.flush()
+                    with open(self.resp_pipe, "wb") as f:
+                        f.write(data)
                 except OSError:
                     pass
 
@@ -129,87 +725,475 @@ class Daemon:
             except asyncio.CancelledError:
                 break
 
+    async def _handle_fifo_line(self, line: str | bytes) -> None:
+        """Run one atk.cmd request and route its response.
+
+        A request naming a ``reply`` FIFO gets the response (and, after
+        ``subscribe``, events) on that FIFO alone; otherwise it goes to the
+        shared atk.resp.
+        """
+        try:
+            msg = json.loads(line)
+        except ValueError as e:  # malformed JSON or not UTF-8
+            err = {"id": "unknown", "ok": False, "error": _bad_message(e)}
+            await self._resp_queue.put(await self._encode(err))
+            return
+        reply = msg.get("reply") if isinstance(msg, dict) else None
+        client = None
+        if reply:
+            try:
+                client = self._reply_client(str(reply))
+            except ValueError as e:
+                req_id = msg.get("id", "unknown")
+                info = error("INVALID_MESSAGE", str(e))
+                err = {"id": req_id, "ok": False, "error": info}
+                await self._resp_queue.put(await self._encode(err))
+                return
+        resp = await self._execute(msg, client)
+        if client is None:
+            # The shared atk.resp is one-shot per line: never streamed
+            await self._resp_queue.put(await self._encode(resp))
+        else:
+            await self._respond(client, msg, resp)
+
+    async def _respond(self, client: _Client, msg: dict, resp: dict) -> None:
+        """Queue ``resp`` for ``client``, as frames if ``msg`` asked to stream."""
+        if not msg.get("stream"):
+            client.respond(await self._encode(resp, client.framing))
+            return
+        # Held until the last frame is queued, with no await after it, so a
+        # one-shot FIFO stays open for the whole stream
+        client.streaming += 1
+        try:
+            for seq, frame in enumerate(_frames(resp, STREAM_CHUNK)):
+                if seq:
+                    await asyncio.sleep(0)  # one frame serialized per loop turn
+                data = client.framing.encode(
+                    {"v": PROTOCOL_VERSION, "id": resp["id"], "seq": seq, **frame}
+                )
+                await client.send(data, STREAM_WINDOW)
+        except ConnectionError as e:
+            _logger.debug("Stream to client cut short: %s", e)
+        finally:
+            client.streaming -= 1
+
+    async def _encode(self, resp: dict, framing: Framing = JSON_LINES) -> bytes:
+        """Serialize a response, in the executor when it lists many tracks."""
+        resp = {"v": PROTOCOL_VERSION, **resp}
+        data = resp.get("data")
+        tracks = data.get("tracks") if isinstance(data, dict) else None
+        if isinstance(tracks, list) and len(tracks) > ENCODE_INLINE_LIMIT:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, framing.encode, resp)
+        return framing.encode(resp)
+
+    def _reply_client(self, path: str) -> _FifoClient:
+        client = self._reply_clients.get(path)
+        if client and client.task and not client.task.done():
+            return client
+        try:
+            is_fifo = stat.S_ISFIFO(os.stat(path).st_mode)
+        except OSError:
+            is_fifo = False
+        if not is_fifo:
+            raise ValueError(f"Reply path is not a FIFO: {path}")
+        client = _FifoClient(path)
+        self._reply_clients[path] = client
+        self._clients.add(client)
+        client.task = asyncio.create_task(client.run())
+
+        def done(_: asyncio.Task) -> None:
+            self._clients.discard(client)
+            if self._reply_clients.get(path) is client:
+                del self._reply_clients[path]
+
+        client.task.add_done_callback(done)
+        return client
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one socket connection until it closes.
+
+        Requests are started in arrival order and the client need not wait
+        for a reply before sending the next one. Replies may come back out
+        of order (a ``pause`` overtakes a slow ``load``); each carries its
+        request ``id`` and is written only to this connection.
+
+        Messages are JSON lines until the client negotiates another framing
+        with ``framing``, which the reader answers itself, in order.
+        """
+        client = _SocketClient(writer)
+        self._clients.add(client)
+        client.task = asyncio.create_task(client.run())
+        pending: set[asyncio.Task] = set()
+
+        async def answer(msg: dict) -> None:
+            await self._respond(client, msg, await self._execute(msg, client))
+
+        try:
+            while self._running:
+                framing = client.framing
+                payload = await framing.read(reader, SOCKET_LINE_LIMIT)
+                if payload is None:
+                    break
+                if not payload:
+                    continue
+                try:
+                    msg = framing.decode(payload)
+                except ValueError as e:
+                    info = _bad_message(e, framing)
+                    err = {"id": "unknown", "ok": False, "error": info}
+                    client.respond(await self._encode(err, framing))
+                    continue
+                if isinstance(msg, dict) and msg.get("cmd") == "framing":
+                    client.respond(self._negotiate(client, msg, busy=bool(pending)))
+                    continue
+                await self._slots.acquire()
+                task = asyncio.create_task(answer(msg))
+                task.add_done_callback(self._command_done)
+                task.add_done_callback(pending.discard)
+                pending.add(task)
+        except (ConnectionError, ValueError) as e:
+            _logger.debug("Socket client error: %s", e)
+            client.task.cancel()
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            self._clients.discard(client)
+            client.finish()  # flush replies to a half-closed connection
+
+    def _negotiate(self, client: _Client, msg: dict, busy: bool) -> bytes:
+        """Switch ``client`` to the framing ``msg`` asks for.
+
+        The reply goes out in the old framing, queued behind everything
+        already sent in it; from then on both directions use the new one.
+        Refused while other requests are in flight, whose replies could
+        otherwise arrive in either.
+        """
+        old = client.framing
+        args = msg.get("args") or {}
+        try:
+            if not isinstance(args, dict):
+                raise ProtocolError("INVALID_MESSAGE", "args must be an object")
+            self._commands["framing"].validate(args)
+            if busy:
+                raise ProtocolError(
+                    "INVALID_MESSAGE", "framing: wait for pending replies first"
+                )
+        except ProtocolError as e:
+            resp = {"ok": False, "error": error_info(e)}
+        else:
+            client.framing = FRAMINGS[args["codec"]]
+            data = {"codec": client.framing.name, "compiled": client.framing.compiled}
+            resp = {"ok": True, "data": data}
+        req_id = msg.get("id", "unknown")
+        return old.encode({"v": PROTOCOL_VERSION, "id": req_id, **resp})
+
     async def _position_loop(self) -> None:
+        """Catch drift the commands cannot see: device clock, stalled streams."""
         while self._running:
-            await asyncio.sleep(1)
-            if self.state == "playing" and self._has_subscribers:
-                await self._emit(
-                    "position_update",
-                    {
-                        "position": self.player.get_position(),
-                        "duration": self.player.get_duration(),
-                    },
-                )
+            await asyncio.sleep(CLOCK_CHECK_INTERVAL)
+            if self.state == "playing":
+                await self._sync_clock()
+
+    def _clock(self) -> dict:
+        """Clock sample: ``position`` at ``time`` on the host's monotonic
+        clock, advancing at ``rate`` while ``state`` is playing."""
+        active = self.state in ("playing", "paused")
+        position = self.player.get_position() if active else 0.0
+        return {
+            "position": position,
+            "time": time.monotonic(),
+            "rate": self.rate,
+            "state": self.state,
+            "duration": self.player.get_duration() if active else 0.0,
+        }
+
+    async def _sync_clock(self) -> None:
+        """Publish a clock sample if playback has left the last one.
+
+        Cheap enough to call after anything that may have moved playback;
+        subscribers see ``position_update`` only on a state, rate or track
+        change, or when the position is ``CLOCK_DRIFT`` off where the last
+        sample says it should be. Each such sample also moves
+        ``playback_version``. The status block is refreshed every time.
+        """
+        clock = self._clock()
+        ref = self._clock_ref
+        if ref is not None and all(
+            ref[k] == clock[k] for k in ("state", "rate", "duration")
+        ):
+            expected = ref["position"]
+            if ref["state"] == "playing":
+                expected += (clock["time"] - ref["time"]) * ref["rate"]
+            if abs(clock["position"] - expected) <= CLOCK_DRIFT:
+                self._write_status()
+                since = clock["time"] - self._journaled_at
+                if clock["state"] == "playing" and since >= JOURNAL_POSITION_INTERVAL:
+                    self._record_clock(clock)
+                return
+        self._clock_ref = clock
+        self._record_clock(clock)
+        self.playback_version += 1
+        self._state_changed()
+        if self._any_subscribers():
+            await self._emit("position_update", clock)
+
+    def _state_changed(self) -> None:
+        """Move ``state_version``, republish it and wake every ``wait``."""
+        self.state_version += 1
+        self._write_status()
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _settings_changed(self) -> None:
+        self.settings_version += 1
+        self._state_changed()
+        self._record("settings", {"volume": self.volume, "repeat": self.repeat})
+
+    def _record(self, op: str, data: dict) -> None:
+        """Journal one state change; snapshot once the journal outgrows one."""
+        if self._journal is None:
+            return
+        self._journal.record({"op": op, **data})
+        if self._journal.due:
+            self._journal.snapshot(self._saved_state())
+
+    def _record_clock(self, clock: dict) -> None:
+        self._journaled_at = clock["time"]
+        data = {k: clock[k] for k in ("state", "position", "rate")}
+        self._record("clock", data)
+
+    def _record_shuffle(self, drawn: list[int]) -> None:
+        data = {"enabled": self.shuffle, "seed": self.queue.shuffle_seed}
+        self._record("shuffle", {**data, "drawn": drawn})
+
+    def _saved_state(self) -> dict:
+        """Everything a restart restores, shaped as ``Journal.load`` returns it."""
+        clock = self._clock()
+        return {
+            "queue": list(self._queue),
+            "queue_pos": self.queue_pos,
+            "shuffle": self.shuffle,
+            "seed": self._queue.shuffle_seed,
+            "drawn": self._queue.shuffle_drawn(),
+            "repeat": self.repeat,
+            "volume": self.volume,
+            "rate": self.rate,
+            "state": clock["state"],
+            "position": clock["position"],
+        }
+
+    def _versions(self) -> dict[str, int]:
+        return {
+            "playback": self.playback_version,
+            "queue": self.queue_version,
+            "settings": self.settings_version,
+        }
+
+    def _write_status(self) -> None:
+        """Rewrite the shared status block (a few microseconds)."""
+        if self._status_block is None:
+            return
+        current = (
+            self._queue.track(self.queue_pos)
+            if self.queue_pos < len(self._queue)
+            else None
+        )
+        key = (current, current.duration, current.flags) if current else (None, 0, 0)
+        if key != self._status_track:
+            self._status_track = key
+            info = current.info() if current else None
+            self._status_track_json = json.dumps(info).encode() if info else b""
+        clock = self._clock()
+        self._status_block.write(
+            state=self.state,
+            position=clock["position"],
+            anchor=clock["time"],
+            rate=self.rate,
+            duration=clock["duration"],
+            volume=self.volume,
+            shuffle=self.shuffle,
+            repeat=self.repeat,
+            queue_length=len(self._queue),
+            queue_position=self.queue_pos,
+            track=self._status_track_json,
+            version=self.state_version,
+            playback_version=self.playback_version,
+            queue_version=self.queue_version,
+            settings_version=self.settings_version,
+        )
 
     async def _emit(self, event: str, data: dict | None = None) -> None:
-        msg = json.dumps({"event": event, "data": data or {}})
-        try:
-            self._resp_queue.put_nowait(msg)
-        except asyncio.QueueFull:
-            pass
+        self._events.add(event, data or {})
+
+    def _publish(self, event: str, data: dict) -> None:
+        msg = {"v": PROTOCOL_VERSION, "event": event, "data": data}
+        encoded: dict[Framing, bytes] = {}  # once per framing in use
+        self._events_published += 1
+        if self._has_subscribers:
+            if self._resp_queue.qsize() < EVENT_BACKLOG:
+                encoded[JSON_LINES] = JSON_LINES.encode(msg)
+                self._resp_queue.put_nowait(encoded[JSON_LINES])
+            else:
+                self._events_dropped += 1
+        for client in self._clients:
+            if not client.subscribed:
+                continue
+            wire = encoded.get(client.framing)
+            if wire is None:
+                wire = encoded[client.framing] = client.framing.encode(msg)
+            if not client.offer(wire):
+                self._events_dropped += 1
+
+    def _any_subscribers(self) -> bool:
+        return self._has_subscribers or any(c.subscribed for c in self._clients)
 
     # ── Command dispatch ───────────────────────────────────────────────────
 
-    async def _dispatch(self, line: str) -> dict:
+    def _compile_commands(self) -> dict[str, _Command]:
+        """Compile the validator of every command in ``COMMANDS``, once."""
+        commands = {}
+        for name, spec in COMMANDS.items():
+            handler = (
+                None
+                if name in ("batch", "framing")
+                else f"_cmd_{name.replace('-', '_')}"
+            )
+            if handler is not None and not hasattr(self, handler):
+                raise TypeError(f"No handler for declared command {name!r}")
+            commands[name] = _Command(handler, compile_args(name, spec))
+        return commands
+
+    async def _dispatch(self, line: str, client: _Client | None = None) -> dict:
         try:
             msg = json.loads(line)
         except json.JSONDecodeError as e:
-            return {"id": "unknown", "ok": False, "error": {"message": str(e)}}
+            return {"id": "unknown", "ok": False, "error": _bad_message(e)}
+        return await self._execute(msg, client)
 
+    async def _execute(self, msg: dict, client: _Client | None = None) -> dict:
+        if not isinstance(msg, dict):
+            info = error("INVALID_MESSAGE", "Request must be an object")
+            return {"id": "unknown", "ok": False, "error": info}
         req_id = msg.get("id", "unknown")
-        cmd = msg.get("cmd")
-        args = msg.get("args", {})
-
-        if not cmd:
-            return {"id": req_id, "ok": False, "error": {"message": "No command"}}
-
-        handlers = {
-            "play": self._cmd_play,
-            "pause": self._cmd_pause,
-            "stop": self._cmd_stop,
-            "next": self._cmd_next,
-            "prev": self._cmd_prev,
-            "seek": self._cmd_seek,
-            "volume": self._cmd_volume,
-            "rate": self._cmd_rate,
-            "add": self._cmd_add,
-            "remove": self._cmd_remove,
-            "move": self._cmd_move,
-            "clear": self._cmd_clear,
-            "queue": self._cmd_queue,
-            "jump": self._cmd_jump,
-            "shuffle": self._cmd_shuffle,
-            "repeat": self._cmd_repeat,
-            "status": self._cmd_status,
-            "info": self._cmd_info,
-            "subscribe": self._cmd_subscribe,
-            "save": self._cmd_save,
-            "load": self._cmd_load,
-            "playlists": self._cmd_playlists,
-            "devices": self._cmd_devices,
-            "set-device": self._cmd_set_device,
-            "ping": self._cmd_ping,
-            "shutdown": self._cmd_shutdown,
-        }
-
-        handler = handlers.get(cmd)
-        if not handler:
-            return {
-                "id": req_id,
-                "ok": False,
-                "error": {"message": f"Unknown command: {cmd}"},
-            }
+        if msg.get("v", PROTOCOL_VERSION) != PROTOCOL_VERSION:
+            problem = f"Unsupported protocol version: {msg['v']}"
+        elif not msg.get("cmd") or not isinstance(msg["cmd"], str):
+            problem = "No command"
+        elif not isinstance(msg.get("args") or {}, dict):
+            problem = "args must be an object"
+        else:
+            problem = None
+        if problem:
+            info = error("INVALID_MESSAGE", problem)
+            return {"id": req_id, "ok": False, "error": info}
+        cmd: str = msg["cmd"]
+        args: dict = msg.get("args") or {}
+        if cmd == "batch":
+            return {"id": req_id, **await self._run_batch(args, client)}
+        if cmd == "framing":
+            info = error("INVALID_MESSAGE", "framing is negotiated on atk.sock only")
+            return {"id": req_id, "ok": False, "error": info}
+        if cmd == "wait":
+            # Outside the batch gate: a long poll must not hold off a batch
+            return {"id": req_id, **await self._run(cmd, args, client)}
+
+        # No await between the check and the count: a batch cannot slip in
+        while self._batching:
+            await self._batch_over.wait()
+        self._inflight += 1
+        try:
+            resources = self._resources(cmd, args)
+            if not resources:  # control lane: straight to the handler
+                return {"id": req_id, **await self._run(cmd, args, client)}
+            async with self._lanes.hold(resources):
+                return {"id": req_id, **await self._run(cmd, args, client)}
+        finally:
+            self._inflight -= 1
+            if not self._inflight:
+                self._idle.set()
+
+    async def _run(self, cmd: str, args: dict, client: _Client | None) -> dict:
+        """Run one command; returns ``{"ok", "data"}`` or ``{"ok", "error"}``."""
+        command = self._commands.get(cmd)
+        if command is None or command.handler is None:
+            message = f"Unknown command: {cmd}"
+            return {"ok": False, "error": error("UNKNOWN_COMMAND", message)}
 
         try:
-            data = await handler(args)
-            return {"id": req_id, "ok": True, "data": data}
-        except FileNotFoundError as e:
-            return {"id": req_id, "ok": False, "error": {"message": str(e)}}
-        except (IndexError, ValueError) as e:
-            return {"id": req_id, "ok": False, "error": {"message": str(e)}}
+            command.validate(args)
+            if cmd == "subscribe" and client is not None:
+                client.subscribed = True  # events go to this client only
+                data = {"subscribed": True}
+            else:
+                handler: Callable[[dict], Awaitable[dict]]
+                handler = getattr(self, command.handler)
+                data = await handler(args)
+            if cmd in PLAYBACK_COMMANDS:
+                await self._sync_clock()
+            elif cmd not in QUERY_COMMANDS:
+                self._write_status()
+            return {"ok": True, "data": data}
+        except (OSError, IndexError, ValueError) as e:
+            return {"ok": False, "error": error_info(e)}
         except Exception as e:
             _logger.exception("Error handling %s", cmd)
-            return {"id": req_id, "ok": False, "error": {"message": str(e)}}
+            return {"ok": False, "error": error_info(e)}
+
+    def _resources(self, cmd: str, args: dict) -> tuple[str, ...]:
+        """Resources ``cmd`` must stay ordered on; () for the control lane."""
+        if cmd == "play" and (args.get("file") or self.state == "stopped"):
+            return ("queue",)  # enqueues or starts the queue, not just a resume
+        return COMMAND_RESOURCES.get(cmd, ())
+
+    async def _run_batch(self, args: dict, client: _Client | None) -> dict:
+        """Run ``args["commands"]`` back to back with nothing interleaved.
+
+        Waits for in-flight commands to finish, then holds off every other
+        request until the batch is done.
+        """
+        try:
+            self._commands["batch"].validate(args)
+            commands = args["commands"]
+            if not all(
+                isinstance(c, dict)
+                and isinstance(c.get("cmd"), str)
+                and isinstance(c.get("args", {}), dict)
+                for c in commands
+            ):
+                raise ProtocolError(
+                    "INVALID_ARGS", "batch requires 'commands': a list of {cmd, args}"
+                )
+            if any(c["cmd"] == "batch" for c in commands):
+                raise ProtocolError("INVALID_ARGS", "batch cannot be nested")
+            for cmd in ("wait", "framing"):
+                if any(c["cmd"] == cmd for c in commands):
+                    raise ProtocolError("INVALID_ARGS", f"{cmd} cannot run in a batch")
+        except ProtocolError as e:
+            return {"ok": False, "error": error_info(e)}
+        stop_on_error = args.get("stop_on_error", False)
+
+        while self._batching or self._inflight:
+            if self._batching:
+                await self._batch_over.wait()
+            else:
+                self._idle.clear()
+                await self._idle.wait()
+        self._batching = True
+        self._batch_over.clear()
+        results = []
+        try:
+            for item in commands:
+                result = await self._run(item["cmd"], item.get("args", {}), client)
+                results.append(result)
+                if stop_on_error and not result["ok"]:
+                    break
+        finally:
+            self._batching = False
+            self._batch_over.set()
+        return {"ok": True, "data": {"results": results}}
 
     # ── Playback commands ──────────────────────────────────────────────────
 
@@ -217,13 +1201,15 @@ class Daemon:
         file = args.get("file")
         if file:
             if not is_supported(file):
-                raise ValueError(f"Unsupported format: {file}")
+                raise ProtocolError("INVALID_FORMAT", f"Unsupported format: {file}")
             self.queue.append(file)
             self.queue_pos = len(self.queue) - 1
             if self.shuffle:
                 self._shuffle_insert(len(self.queue) - 1)
-            await self._emit("queue_updated", {"queue": self._queue_data()})
+            await self._queue_inserted(len(self.queue) - 1)
             await self._play_current()
+        elif self.state == "paused" and self._loading():
+            self.state = "loading"  # undo a pause made while loading
         elif self.state == "paused":
             self.player.unpause()
             self.state = "playing"
@@ -239,9 +1225,13 @@ class Daemon:
             await self._emit(
                 "playback_paused", {"position": self.player.get_position()}
             )
+        elif self.state == "loading":
+            self.state = "paused"  # attach the track paused once decoded
+            await self._emit("playback_paused", {"position": 0.0})
         return {"state": self.state}
 
     async def _cmd_stop(self, args: dict) -> dict:
+        self._cancel_load()
         self.player.stop()
         self.state = "stopped"
         await self._emit("playback_stopped")
@@ -260,23 +1250,19 @@ class Daemon:
         return {"error": "Start of queue"}
 
     async def _cmd_seek(self, args: dict) -> dict:
-        pos = args.get("pos", 0)
-        current = self.player.get_position()
-        if isinstance(pos, str):
-            if pos.startswith("+"):
-                pos = current + float(pos[1:])
-            elif pos.startswith("-"):
-                pos = current - float(pos[1:])
-            else:
-                pos = float(pos)
-        pos = max(0.0, float(pos))
-        self.player.seek(pos)
+        pos = self._resolve_pos(args.get("pos", 0))
+        if self._loading():
+            self._pending_seek = pos
+        else:
+            self.player.seek(pos)
         return {"position": pos}
 
     async def _cmd_volume(self, args: dict) -> dict:
-        level = max(0, min(100, int(args.get("level", 80))))
+        level = max(0, min(100, args.get("level", 80)))
         self.volume = level
         self.player.set_volume(level)
+        self._settings_changed()
+        await self._emit("volume_changed", {"volume": self.volume})
         return {"volume": self.volume}
 
     async def _cmd_rate(self, args: dict) -> dict:
@@ -286,77 +1272,162 @@ class Daemon:
         self.player.set_rate(speed, mode)
         return {"rate": self.rate}
 
+    async def _cmd_schedule(self, args: dict) -> dict:
+        action = args.get("action")
+        if action == "clear":
+            self._pending_cues.clear()
+            self.player.clear_schedule()
+        elif action:
+            if args.get("frame") is not None:
+                frame = args["frame"]
+            else:
+                frame = int(self._resolve_pos(args.get("at", 0)) * SAMPLE_RATE)
+            value: float | None = None
+            if action in ("seek", "loop"):
+                if args.get("value") is None:
+                    raise ValueError(f"{action} requires a target position")
+                value = int(self._resolve_pos(args["value"]) * SAMPLE_RATE)
+                if action == "loop" and value >= frame:
+                    raise ValueError("Loop start must come before its end")
+            elif action == "gain":
+                if args.get("value") is None:
+                    raise ValueError("gain requires a volume level")
+                value = max(0, min(100, int(args["value"])))
+            if self._loading():
+                self._pending_cues.append((frame, action, value))
+            else:
+                self.player.schedule(frame, action, value)
+        return {"scheduled": self._schedule_data()}
+
     # ── Queue commands ─────────────────────────────────────────────────────
 
     async def _cmd_add(self, args: dict) -> dict:
+        if "paths" in args:
+            return await self._add_paths(args)
         uri = args.get("uri")
         if not uri:
             raise ValueError("URI required")
         if not is_supported(uri):
-            raise ValueError(f"Unsupported format: {uri}")
+            raise ProtocolError("INVALID_FORMAT", f"Unsupported format: {uri}")
         self.queue.append(uri)
         if self.shuffle:
             self._shuffle_insert(len(self.queue) - 1)
-        await self._emit("queue_updated", {"queue": self._queue_data()})
+        await self._queue_inserted(len(self.queue) - 1)
         return {"queue_length": len(self.queue)}
 
+    async def _add_paths(self, args: dict) -> dict:
+        """Bulk enqueue files, directories and stream URIs in one mutation."""
+        paths = args["paths"]
+        loop = asyncio.get_running_loop()
+
+        def progress(scanned: int, found: int) -> None:
+            data = {"scanned": scanned, "found": found}
+            loop.call_soon_threadsafe(
+                lambda: asyncio.ensure_future(self._emit("add_progress", data))
+            )
+
+        def scan() -> dict:
+            result = scan_paths(
+                paths,
+                recursive=args.get("recursive", False),
+                pattern=args.get("glob"),
+                sort=args.get("sort", "path"),
+                progress=progress,
+            )
+            result["tracks"] = [Track(f) for f in result["files"]]
+            return result
+
+        result = await loop.run_in_executor(None, scan)
+        files = result["files"]
+        start = len(self.queue)
+        self.queue.extend(result["tracks"])
+        if self.shuffle:
+            self.queue.shuffle_add(range(start, len(self.queue)))
+        if files:
+            await self._queue_inserted(start)
+        return {
+            "queue_length": len(self.queue),
+            "added": len(files),
+            "scanned": result["scanned"],
+            "skipped": result["skipped"][:ADD_SKIPPED_LIMIT],
+            "skipped_count": len(result["skipped"]),
+        }
+
     async def _cmd_remove(self, args: dict) -> dict:
-        idx = args.get("index")
-        if idx is None:
-            raise ValueError("Index required")
-        idx = int(idx)
+        idx = args["index"]
         if idx < 0 or idx >= len(self.queue):
             raise IndexError(f"Invalid queue index: {idx}")
 
         removed = self.queue.pop(idx)
+        was_current = idx == self.queue_pos
         if idx < self.queue_pos:
             self.queue_pos -= 1
-        elif idx == self.queue_pos and self.state == "playing":
+        await self._queue_changed("remove", {"index": idx})
+        if was_current and self.state in ("playing", "loading"):
             if self.queue_pos < len(self.queue):
                 await self._play_current()
             else:
+                self._cancel_load()
                 self.player.stop()
                 self.state = "stopped"
-
-        if self.shuffle and self.shuffle_order:
-            try:
-                self.shuffle_order.remove(idx)
-            except ValueError:
-                pass
-            self.shuffle_order = [i if i < idx else i - 1 for i in self.shuffle_order]
-
-        await self._emit("queue_updated", {"queue": self._queue_data()})
         return {"removed": removed}
 
     async def _cmd_move(self, args: dict) -> dict:
-        from_idx, to_idx = int(args.get("from", -1)), int(args.get("to", -1))
+        from_idx, to_idx = args["from"], args["to"]
         if not (0 <= from_idx < len(self.queue) and 0 <= to_idx < len(self.queue)):
             raise IndexError("Invalid index")
-        track = self.queue.pop(from_idx)
-        self.queue.insert(to_idx, track)
+        self.queue.move(from_idx, to_idx)
         if from_idx == self.queue_pos:
             self.queue_pos = to_idx
         elif from_idx < self.queue_pos <= to_idx:
             self.queue_pos -= 1
         elif to_idx <= self.queue_pos < from_idx:
             self.queue_pos += 1
-        await self._emit("queue_updated", {"queue": self._queue_data()})
+        await self._queue_changed("move", {"from": from_idx, "to": to_idx})
         return {"queue_position": self.queue_pos}
 
     async def _cmd_clear(self, args: dict) -> dict:
+        self._cancel_load()
         self.player.stop()
         self.state = "stopped"
         self.queue.clear()
         self.queue_pos = 0
-        self.shuffle_order.clear()
-        await self._emit("queue_updated", {"queue": self._queue_data()})
+        await self._queue_changed("clear")
         return {"cleared": True}
 
     async def _cmd_queue(self, args: dict) -> dict:
-        return self._queue_data()
+        if args.get("if_version") == self.queue_version:
+            return {"unchanged": True, "version": self.queue_version}
+        fields = _fields(args)
+        data: dict[str, Any] = {
+            "current_index": self.queue_pos,
+            "version": self.queue_version,
+        }
+        if any(k in args for k in PAGE_ARGS):
+            # A window costs O(log n + limit) whatever the queue length
+            offset = args.get("offset")
+            if offset is None:
+                offset = max(0, self.queue_pos - (args.get("around_current") or 0))
+            limit = args.get("limit")
+            tracks = list(itertools.islice(self._queue.tracks(offset), limit))
+            data["offset"] = offset
+            data["total"] = len(self.queue)
+        else:
+            tracks = list(self._queue.tracks())
+
+        def build() -> list[dict]:
+            return [_project(t.info(), fields) for t in tracks]
+
+        if len(tracks) > ENCODE_INLINE_LIMIT:
+            # Snapshot on the loop, build the track dicts off it
+            loop = asyncio.get_running_loop()
+            data["tracks"] = await loop.run_in_executor(None, build)
+        else:
+            data["tracks"] = build()
+        return data
 
     async def _cmd_jump(self, args: dict) -> dict:
-        idx = int(args.get("index", -1))
+        idx = args["index"]
         if idx < 0 or idx >= len(self.queue):
             raise IndexError(f"Invalid queue index: {idx}")
         self.queue_pos = idx
@@ -366,50 +1437,95 @@ class Daemon:
     # ── Mode commands ──────────────────────────────────────────────────────
 
     async def _cmd_shuffle(self, args: dict) -> dict:
-        self.shuffle = bool(args.get("enabled", False))
+        self.shuffle = args.get("enabled", False)
+        self._settings_changed()
         if self.shuffle:
-            self.shuffle_order = list(range(len(self.queue)))
-            random.shuffle(self.shuffle_order)
-            if self.queue_pos in self.shuffle_order:
-                self.shuffle_order.remove(self.queue_pos)
-                self.shuffle_order.insert(0, self.queue_pos)
-        else:
-            self.shuffle_order.clear()
+            seed = self.queue.shuffle_on(
+                first=self.queue_pos if self.queue else None, seed=args.get("seed")
+            )
+            self._record_shuffle(self.queue.shuffle_drawn())
+            return {"shuffle": True, "seed": seed}
+        self.queue.shuffle_off()
+        self._record_shuffle([])
         return {"shuffle": self.shuffle}
 
     async def _cmd_repeat(self, args: dict) -> dict:
-        mode = args.get("mode", "none")
-        if mode not in ("none", "queue", "track"):
-            raise ValueError(f"Invalid repeat mode: {mode}")
-        self.repeat = mode
+        self.repeat = args.get("mode", "none")
+        self._settings_changed()
         return {"repeat": self.repeat}
 
     # ── Status commands ────────────────────────────────────────────────────
 
     async def _cmd_status(self, args: dict) -> dict:
-        uri = self.queue[self.queue_pos] if self.queue else None
-        track = self._track_info(uri) if uri else None
-        return {
+        if args.get("if_version") == self.state_version:
+            return {"unchanged": True, "version": self.state_version}
+        fields = _fields(args)
+        current = self._queue.track(self.queue_pos) if self.queue else None
+        status = {
             "state": self.state,
-            "track": track,
-            "position": self.player.get_position() if self.state != "stopped" else 0.0,
-            "duration": self.player.get_duration() if uri else 0.0,
+            "track": current.info() if current else None,
+            "position": (
+                self.player.get_position()
+                if self.state in ("playing", "paused")
+                else 0.0
+            ),
+            "duration": self.player.get_duration() if current else 0.0,
             "volume": self.volume,
             "shuffle": self.shuffle,
             "repeat": self.repeat,
             "queue_length": len(self.queue),
             "queue_position": self.queue_pos,
             "rate": self.rate,
+            "clock": self._clock(),
+            "levels": self.player.get_levels(),
+            "version": self.state_version,
+            "versions": self._versions(),
         }
+        if stream := self.player.get_stream_stats():
+            status["stream"] = stream
+        return _project(status, fields)
 
     async def _cmd_info(self, args: dict) -> dict:
+        fields = _fields(args)
         idx = args.get("index", self.queue_pos)
         if idx is None:
             idx = self.queue_pos
-        idx = int(idx)
+        if isinstance(idx, list):
+            return {"tracks": [_project(self._track_info(i), fields) for i in idx]}
+        return _project(self._track_info(idx), fields)
+
+    def _track_info(self, idx: int) -> dict:
         if idx < 0 or idx >= len(self.queue):
             raise IndexError(f"Invalid index: {idx}")
-        return self._track_info(self.queue[idx])
+        return self._queue.track(idx).info()
+
+    async def _cmd_wait(self, args: dict) -> dict:
+        """Long poll: return once a watched version moves, or at ``timeout``.
+
+        ``since`` maps any of ``VERSION_KINDS`` to the version the client
+        last saw; only those are watched. Without ``since`` every kind is
+        watched from its current version.
+        """
+        since = args.get("since") or self._versions()
+        if not isinstance(since, dict) or not all(
+            k in VERSION_KINDS and isinstance(v, int) for k, v in since.items()
+        ):
+            raise ValueError(f"since must map {', '.join(VERSION_KINDS)} to versions")
+        timeout = min(args.get("timeout", WAIT_TIMEOUT), WAIT_TIMEOUT_MAX)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not self._stopped:
+            versions = self._versions()
+            if any(versions[k] != v for k, v in since.items()):
+                return {"changed": True, "versions": versions}
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return {"changed": False, "versions": self._versions()}
 
     async def _cmd_subscribe(self, args: dict) -> dict:
         self._has_subscribers = True
@@ -422,55 +1538,32 @@ class Daemon:
         if not name:
             raise ValueError("Name required")
         fmt = args.get("format", "json")
-        pldir = get_data_dir() / "playlists"
-        pldir.mkdir(parents=True, exist_ok=True)
-
-        if fmt == "json":
-            path = pldir / f"{name}.json"
-            path.write_text(json.dumps({"name": name, "tracks": self.queue}, indent=2))
-        elif fmt == "m3u":
-            path = pldir / f"{name}.m3u"
-            path.write_text("#EXTM3U\n" + "\n".join(self.queue) + "\n")
-        elif fmt == "txt":
-            path = pldir / f"{name}.txt"
-            path.write_text("\n".join(self.queue) + "\n")
-        else:
-            raise ValueError(f"Unsupported format: {fmt}")
-        return {"saved": str(path), "track_count": len(self.queue)}
+        uris = list(self.queue)
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(None, self._write_playlist, name, fmt, uris)
+        return {"saved": str(path), "track_count": len(uris)}
 
     async def _cmd_load(self, args: dict) -> dict:
         name = args.get("name")
         if not name:
             raise ValueError("Name required")
-        pldir = get_data_dir() / "playlists"
-        path = None
-        for ext in (".json", ".m3u", ".txt"):
-            p = pldir / f"{name}{ext}"
-            if p.exists():
-                path = p
-                break
-        if not path:
-            raise FileNotFoundError(f"Playlist not found: {name}")
-
-        if path.suffix == ".json":
-            tracks = json.loads(path.read_text()).get("tracks", [])
-        else:
-            tracks = [
-                line
-                for line in path.read_text().splitlines()
-                if line.strip() and not line.startswith("#")
-            ]
+        loop = asyncio.get_running_loop()
+        path, tracks = await loop.run_in_executor(None, self._playlist_tracks, name)
 
         await self._cmd_clear({})
-        for t in tracks:
-            if is_supported(t):
-                self.queue.append(t)
+        self.queue.extend(tracks)
         if self.shuffle:
-            self.shuffle_order = list(range(len(self.queue)))
-            random.shuffle(self.shuffle_order)
+            self.queue.shuffle_on()
+            self._record_shuffle([])
+        if self.queue:
+            await self._queue_inserted(0)
         return {"loaded": str(path), "track_count": len(self.queue)}
 
     async def _cmd_playlists(self, args: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._list_playlists)
+
+    def _list_playlists(self) -> dict:
         pldir = get_data_dir() / "playlists"
         playlists: list[dict] = []
         if pldir.exists():
@@ -493,6 +1586,25 @@ class Daemon:
                     )
         return {"playlists": playlists}
 
+    async def _cmd_warm(self, args: dict) -> dict:
+        """Pre-decode tracks into the PCM cache across the decode pool."""
+        if name := args.get("playlist"):
+            loop = asyncio.get_running_loop()
+            _, uris = await loop.run_in_executor(None, self._read_playlist, name)
+        elif rng := args.get("range"):
+            start, _, end = rng.partition(":")
+            lo = int(start) if start else 0
+            hi = int(end) if end else len(self.queue)
+            uris = self.queue[max(0, lo) : hi]
+        else:
+            count = args.get("count", 10)
+            uris = [self.queue[i] for i in self._upcoming(count)]
+        uris = [u for u in uris if is_supported(u) and not is_stream_uri(u)]
+        # A stat per track (and a utime per cached one) stays off the loop
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, self.decoder.warm, uris)
+        return {"warming": result["submitted"], "already_cached": result["cached"]}
+
     # ── Device commands ────────────────────────────────────────────────────
 
     async def _cmd_devices(self, args: dict) -> dict:
@@ -506,34 +1618,141 @@ class Daemon:
         did = args.get("device_id")
         dev_bytes: bytes | None = bytes.fromhex(did) if did else None
         self.player.set_device(dev_bytes)
+        self._settings_changed()
         return {"device_id": did}
 
     async def _cmd_ping(self, args: dict) -> dict:
         return {"pong": True}
 
+    async def _cmd_stats(self, args: dict) -> dict:
+        return {
+            "events": {
+                "published": self._events_published,
+                "coalesced": self._events.coalesced,
+                "dropped": self._events_dropped,
+            },
+            "event_window": self._events.window,
+            "clients": len(self._clients),
+            "subscribers": sum(c.subscribed for c in self._clients),
+        }
+
     async def _cmd_shutdown(self, args: dict) -> dict:
         asyncio.get_event_loop().call_soon(lambda: os.kill(os.getpid(), signal.SIGTERM))
         return {"shutting_down": True}
 
     # ── Queue helpers ──────────────────────────────────────────────────────
 
-    async def _play_current(self) -> None:
+    async def _play_current(self, retry: bool = False) -> None:
+        """Start loading the current track; it plays once decoded.
+
+        Decoding runs on the loader thread, so commands keep being answered
+        meanwhile (``status`` reports ``loading``). A ``seek`` or cue sent
+        meanwhile is held and applied as the track attaches. Every call
+        starts a new load generation, which cancels loads still queued or
+        in flight: only the newest track is attached. ``retry`` marks a
+        move past a track that failed to load.
+        """
         if not self.queue or self.queue_pos >= len(self.queue):
             return
-        uri = self.queue[self.queue_pos]
+        if self.queue_pos != self._published_pos:
+            await self._queue_changed("current_changed")
+        if not retry:
+            self._load_failures = 0
+        self._cancel_load()
+        self.state = "loading"
+        current = self._queue.track(self.queue_pos)
+        self._load_task = asyncio.create_task(self._load(self._load_gen, current))
+        self._load_task.add_done_callback(self._load_done)
+
+    async def _load(self, gen: int, current: Track) -> None:
+        uri = current.uri
+        loop = asyncio.get_running_loop()
         try:
-            self.player.load(uri)
-            self.player.play()
-            self.state = "playing"
-            track = self._track_info(uri)
-            await self._emit(
-                "track_changed", {"track": track, "queue_position": self.queue_pos}
-            )
-            await self._emit("playback_started", {"track": track})
+            samples = await loop.run_in_executor(self._loader, self._prepare, gen, uri)
+            if gen != self._load_gen:
+                return  # superseded by a newer track (or stop)
+            self.player.load(uri, samples)
         except (FileNotFoundError, ValueError) as e:
+            if gen != self._load_gen:
+                return
+            current.flags |= FLAG_UNPLAYABLE
             await self._emit("error", {"message": str(e), "track": uri})
-            if self._advance():
-                await self._play_current()
+            self._load_failures += 1
+            if self._load_failures >= len(self.queue):
+                # A full pass without one playable track: don't loop forever
+                message = "No playable track in the queue"
+                await self._emit("error", {"message": message})
+            elif self._advance():
+                await self._play_current(retry=True)
+                return
+            self.player.stop()
+            self.state = "stopped"
+            await self._sync_clock()
+            return
+        self._load_failures = 0
+        for frame, action, value in self._pending_cues:
+            self.player.schedule(frame, action, value)
+        start = self._pending_seek or 0.0
+        self._pending_seek = None
+        self._pending_cues = []
+        current.duration = self.player.get_duration()
+        current.flags &= ~FLAG_UNPLAYABLE
+        self.player.play(start)
+        track = current.info()
+        await self._emit(
+            "track_changed", {"track": track, "queue_position": self.queue_pos}
+        )
+        if self.state == "paused":  # paused while loading
+            self.player.pause()
+        else:
+            self.state = "playing"
+            await self._emit("playback_started", {"track": track})
+        await self._sync_clock()
+
+    def _prepare(self, gen: int, uri: str) -> Any:
+        """Loader thread: decode ``uri`` unless a newer load has started."""
+        if gen != self._load_gen:
+            return None
+        return self.player.prepare(uri)
+
+    def _load_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception():
+            _logger.error("Track load error: %s", task.exception())
+            if task is self._load_task:
+                self.state = "stopped"
+
+    def _cancel_load(self) -> None:
+        self._load_gen += 1
+        self._pending_seek = None
+        self._pending_cues = []
+
+    def _loading(self) -> bool:
+        return self._load_task is not None and not self._load_task.done()
+
+    def _on_scheduled_action(self, action: str, value: float | None) -> None:
+        """Mirror a cue fired in the audio thread into daemon state."""
+        if action == "pause" and self.state == "playing":
+            self.state = "paused"
+            asyncio.ensure_future(
+                self._emit("playback_paused", {"position": self.player.get_position()})
+            )
+        elif action == "stop":
+            self.state = "stopped"
+            asyncio.ensure_future(self._emit("playback_stopped"))
+        elif action == "gain" and value is not None:
+            self.volume = int(value)
+            self._settings_changed()
+        data: dict = {"action": action, "position": self.player.get_position()}
+        if value is not None:
+            data["value"] = value / SAMPLE_RATE if action in ("seek", "loop") else value
+        asyncio.ensure_future(self._emit("scheduled_action", data))
+        asyncio.ensure_future(self._sync_clock())
+
+    def _on_underrun(self, count: int) -> None:
+        stats = self.player.get_stream_stats() or {}
+        data = {"underruns": stats.get("underruns", count)}
+        asyncio.ensure_future(self._emit("stream_underrun", data))
+        asyncio.ensure_future(self._sync_clock())
 
     def _on_track_end(self) -> None:
         task = asyncio.create_task(self._handle_track_end())
@@ -552,23 +1771,25 @@ class Daemon:
         else:
             self.state = "stopped"
             await self._emit("queue_finished")
+            await self._sync_clock()
 
     def _advance(self) -> bool:
         if not self.queue:
             return False
         if self.shuffle:
             try:
-                idx = self.shuffle_order.index(self.queue_pos)
+                idx = self.queue.shuffle_index(self.queue_pos)
             except ValueError:
                 return self._advance_linear()
             nxt = idx + 1
-            if nxt >= len(self.shuffle_order):
+            if nxt >= self.queue.shuffle_len():
                 if self.repeat == "queue":
-                    random.shuffle(self.shuffle_order)
+                    self.queue.reshuffle()
+                    self._record_shuffle([])
                     nxt = 0
                 else:
                     return False
-            self.queue_pos = self.shuffle_order[nxt]
+            self.queue_pos = self.queue.shuffled(nxt)
         else:
             return self._advance_linear()
         return True
@@ -588,16 +1809,16 @@ class Daemon:
             return False
         if self.shuffle:
             try:
-                idx = self.shuffle_order.index(self.queue_pos)
+                idx = self.queue.shuffle_index(self.queue_pos)
             except ValueError:
                 return self._go_prev_linear()
             prev = idx - 1
             if prev < 0:
                 if self.repeat == "queue":
-                    prev = len(self.shuffle_order) - 1
+                    prev = self.queue.shuffle_len() - 1
                 else:
                     return False
-            self.queue_pos = self.shuffle_order[prev]
+            self.queue_pos = self.queue.shuffled(prev)
         else:
             return self._go_prev_linear()
         return True
@@ -613,30 +1834,136 @@ class Daemon:
         return True
 
     def _shuffle_insert(self, track_idx: int) -> None:
-        """Insert new track at random position after current in shuffle order."""
-        if self.shuffle_order:
-            try:
-                cur = self.shuffle_order.index(self.queue_pos)
-                pos = random.randint(cur + 1, len(self.shuffle_order))
-            except ValueError:
-                pos = len(self.shuffle_order)
+        """Add new track to the not-yet-played part of the shuffle order."""
+        self.queue.shuffle_add((track_idx,))
+
+    def _upcoming(self, count: int) -> list[int]:
+        """Queue indices of the current track and the next ``count - 1``."""
+        if not self.queue or count <= 0:
+            return []
+        try:
+            start = self.queue.shuffle_index(self.queue_pos) if self.shuffle else None
+        except ValueError:
+            start = None
+        if start is not None:
+            order = itertools.chain(
+                self.queue.shuffled_from(start),
+                itertools.islice(self.queue.shuffled_from(0), start)
+                if self.repeat == "queue"
+                else (),
+            )
         else:
-            pos = 0
-        self.shuffle_order.insert(pos, track_idx)
+            order = itertools.chain(
+                range(self.queue_pos, len(self.queue)),
+                range(self.queue_pos) if self.repeat == "queue" else (),
+            )
+        return list(itertools.islice(order, count))
 
-    def _track_info(self, uri: str) -> dict:
-        name = Path(uri).stem
-        parts = name.split(" - ", 1)
-        if len(parts) == 2:
-            return {"uri": uri, "artist": parts[0], "title": parts[1]}
-        return {"uri": uri, "title": name}
+    def _write_playlist(self, name: str, fmt: str, uris: list[str]) -> Path:
+        pldir = get_data_dir() / "playlists"
+        pldir.mkdir(parents=True, exist_ok=True)
+        path = pldir / f"{name}.{fmt}"
+        if fmt == "json":
+            path.write_text(json.dumps({"name": name, "tracks": uris}, indent=2))
+        elif fmt == "m3u":
+            path.write_text("#EXTM3U\n" + "\n".join(uris) + "\n")
+        else:
+            path.write_text("\n".join(uris) + "\n")
+        return path
+
+    def _read_playlist(self, name: str) -> tuple[Path, list[str]]:
+        pldir = get_data_dir() / "playlists"
+        path = None
+        for ext in (".json", ".m3u", ".txt"):
+            p = pldir / f"{name}{ext}"
+            if p.exists():
+                path = p
+                break
+        if not path:
+            raise FileNotFoundError(f"Playlist not found: {name}")
+
+        if path.suffix == ".json":
+            tracks = json.loads(path.read_text()).get("tracks", [])
+        else:
+            tracks = [
+                line
+                for line in path.read_text().splitlines()
+                if line.strip() and not line.startswith("#")
+            ]
+        return path, tracks
+
+    def _playlist_tracks(self, name: str) -> tuple[Path, list[Track]]:
+        """Read a playlist into queue records (runs in the executor)."""
+        path, uris = self._read_playlist(name)
+        return path, [Track(u) for u in uris if is_supported(u)]
+
+    def _resolve_pos(self, pos: float | str) -> float:
+        """Resolve an absolute or relative ("+5", "-10") position in seconds."""
+        if isinstance(pos, str):
+            if self._loading():
+                current = self._pending_seek or 0.0
+            else:
+                current = self.player.get_position()
+            if pos.startswith("+"):
+                pos = current + float(pos[1:])
+            elif pos.startswith("-"):
+                pos = current - float(pos[1:])
+            else:
+                pos = float(pos)
+        return max(0.0, float(pos))
+
+    def _schedule_data(self) -> list[dict]:
+        if self._loading():
+            pending = sorted(self._pending_cues, key=lambda cue: cue[0])
+        else:
+            pending = self.player.get_schedule()
+        cues = []
+        for frame, action, value in pending:
+            cue: dict = {"frame": frame, "at": frame / SAMPLE_RATE, "action": action}
+            if value is not None:
+                cue["value"] = (
+                    value / SAMPLE_RATE if action in ("seek", "loop") else value
+                )
+            cues.append(cue)
+        return cues
 
     def _queue_data(self) -> dict:
         return {
-            "tracks": [self._track_info(u) for u in self.queue],
+            "tracks": [t.info() for t in self._queue.tracks()],
             "current_index": self.queue_pos,
+            "version": self.queue_version,
         }
 
+    async def _queue_changed(self, op: str, data: dict | None = None) -> None:
+        """Publish one queue delta as ``queue_updated``.
+
+        Every delta bumps ``queue_version`` and carries the resulting
+        ``current_index``; a client that sees a version gap resyncs with
+        ``queue``.
+        """
+        self.queue_version += 1
+        self._state_changed()
+        self._published_pos = self.queue_pos
+        if op != "insert":  # journaled by _queue_inserted, with the URIs
+            self._record(op, {**(data or {}), "current": self.queue_pos})
+        if not self._any_subscribers():
+            # Nobody to tell; a later subscriber starts from ``queue``
+            return
+        delta = {"op": op, "version": self.queue_version, **(data or {})}
+        delta["current_index"] = self.queue_pos
+        await self._emit("queue_updated", delta)
+
+    async def _queue_inserted(self, start: int) -> None:
+        """Publish the tracks from ``start`` to the end as one insert."""
+        if self._journal is not None:
+            data = {"index": start, "uris": self._queue[start:]}
+            self._record("insert", {**data, "current": self.queue_pos})
+        if not self._any_subscribers():
+            await self._queue_changed("insert")
+            return
+        tracks = [t.info() for t in self._queue.tracks(start)]
+        await self._queue_changed("insert", {"index": start, "tracks": tracks})
+
 
 # ---------------------------------------------------------------------------
 # Daemon runner + entry point
@@ -667,8 +1994,25 @@ class _Runner:
         for sig in (signal.SIGTERM, signal.SIGINT):
             loop.add_signal_handler(sig, self._shutdown.set)
 
-        self.daemon = Daemon(self.runtime_dir)
+        journal = Journal(self.state_dir)
+        t0 = time.perf_counter()
+        saved = await loop.run_in_executor(None, journal.load)
+        self.daemon = Daemon(
+            self.runtime_dir,
+            engine=os.environ.get("ATK_ENGINE", "thread"),
+            event_window=float(os.environ.get("ATK_EVENT_WINDOW", EVENT_WINDOW)),
+            journal=journal,
+        )
+        if saved is not None:
+            self.daemon.restore(saved)
+            _logger.info(
+                "Restored %d queued tracks in %.1f ms",
+                len(saved["queue"]),
+                (time.perf_counter() - t0) * 1000,
+            )
         await self.daemon.start()
+        if saved is not None and os.environ.get("ATK_RESUME") == "1":
+            await self.daemon.resume(saved)
         await self._shutdown.wait()
         await self.daemon.stop()
 
@@ -702,6 +2046,7 @@ class _Runner:
                 pid_file,
                 self.runtime_dir / "atk.cmd",
                 self.runtime_dir / "atk.resp",
+                self.runtime_dir / "atk.sock",
             ):
                 if f.exists():
                     f.unlink()
@@ -710,7 +2055,16 @@ class _Runner:
 
 def main() -> None:
     """Entry point for atk-daemon."""
+    # Opt-in: a shorter GIL switch interval lets the loop answer sooner
+    # while worker threads are busy, at a cost to every thread's throughput
+    # (benchmarks/bench_lanes.py measures both)
+    if interval := os.environ.get("ATK_SWITCH_INTERVAL"):
+        sys.setswitchinterval(float(interval))
     try:
         asyncio.run(_Runner().run())
     except KeyboardInterrupt:
         pass
+
+
+if __name__ == "__main__":
+    main()
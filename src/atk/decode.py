@@ -0,0 +1,213 @@
+"""Parallel decode service backed by an on-disk PCM cache.
+
+Tracks are decoded in a ``ProcessPoolExecutor`` (off the daemon's
+interpreter) straight to raw float32 files under ``get_cache_dir()/pcm``.
+``lookup`` memory-maps a cached track, so loading a warmed track costs a
+``stat`` and an ``mmap`` rather than a full decode. The cache is bounded
+and evicted least-recently-used first, never touching the tracks of the
+latest ``warm`` request.
+"""
+
+from __future__ import annotations
+
+import collections
+import functools
+import hashlib
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .player import CHANNELS, SAMPLE_RATE
+
+DEFAULT_CACHE_MB = 4096
+
+
+def _decode_to_cache(path: str, dest: str) -> int:
+    """Worker: decode ``path`` into ``dest`` atomically; return frame count."""
+    import miniaudio
+
+    decoded = miniaudio.decode_file(
+        path,
+        output_format=miniaudio.SampleFormat.FLOAT32,
+        nchannels=CHANNELS,
+        sample_rate=SAMPLE_RATE,
+    )
+    samples = np.asarray(decoded.samples, dtype=np.float32)
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    samples.tofile(tmp)
+    os.replace(tmp, dest)
+    return len(samples) // CHANNELS
+
+
+class DecodeService:
+    """Decode pool plus PCM cache lookups."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int | None = None,
+        workers: int | None = None,
+    ):
+        self.cache_dir = cache_dir
+        if max_bytes is None:
+            mb = int(os.environ.get("ATK_PCM_CACHE_MB", DEFAULT_CACHE_MB))
+            max_bytes = mb * 1024 * 1024
+        self.max_bytes = max_bytes
+        self._workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # Cache files in access order, oldest first; files not used since
+        # startup rank below all of these, by mtime (bumped on each access)
+        self._used: collections.OrderedDict[str, None] = collections.OrderedDict()
+        self._warm_set: frozenset[str] = frozenset()
+
+    def cache_path(self, uri: str) -> Path | None:
+        """Cache file for ``uri``, keyed on path, size and mtime."""
+        try:
+            path = Path(uri).expanduser().resolve()
+            st = path.stat()
+        except OSError:
+            return None
+        key = f"{path}|{st.st_size}|{st.st_mtime_ns}|{SAMPLE_RATE}|{CHANNELS}"
+        return self.cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.f32"
+
+    def lookup(self, uri: str, wait: bool = True) -> NDArray[np.float32] | None:
+        """Memory-map the cached PCM for ``uri`` (waiting on an in-flight decode)."""
+        dest = self.cache_path(uri)
+        if dest is None:
+            return None
+        fut = self._pending.get(str(dest))
+        if fut is not None and wait:
+            try:
+                fut.result()
+            except Exception:
+                return None
+        try:
+            if dest.stat().st_size == 0:
+                return np.zeros(0, dtype=np.float32)
+            samples = np.memmap(dest, dtype=np.float32, mode="r")
+            self._touch(dest)
+            return samples
+        except OSError:
+            return None
+
+    def warm(self, uris: list[str]) -> dict:
+        """Queue background decodes for uncached ``uris``.
+
+        ``uris`` become the warm set, which eviction leaves alone until the
+        next ``warm``.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        dests = [(uri, dest) for uri in uris if (dest := self.cache_path(uri))]
+        self._warm_set = frozenset(str(dest) for _, dest in dests)
+        submitted = cached = 0
+        for uri, dest in dests:
+            key = str(dest)
+            with self._lock:
+                fut = None
+                if key not in self._pending and not dest.exists():
+                    fut = self._executor().submit(
+                        _decode_to_cache, str(Path(uri).expanduser().resolve()), key
+                    )
+                    self._pending[key] = fut
+            if fut is None:
+                cached += 1
+                self._touch(dest)
+                continue
+            fut.add_done_callback(functools.partial(self._done, key))
+            submitted += 1
+        return {"submitted": submitted, "cached": cached}
+
+    def ensure(self, uri: str) -> None:
+        """Decode ``uri`` into the cache in the calling thread unless present.
+
+        Waits for a pending ``warm`` of the same track instead of decoding
+        it twice. Decode errors propagate.
+        """
+        dest = self.cache_path(uri)
+        if dest is None:
+            return
+        fut = self._pending.get(str(dest))
+        if fut is not None:
+            fut.result()
+            return
+        if dest.exists():
+            self._touch(dest)
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        _decode_to_cache(str(Path(uri).expanduser().resolve()), str(dest))
+        self._touch(dest)
+        self._evict()
+
+    def stats(self) -> dict:
+        files = list(self.cache_dir.glob("*.f32")) if self.cache_dir.exists() else []
+        return {
+            "cached_tracks": len(files),
+            "cache_bytes": sum(f.stat().st_size for f in files),
+            "pending": len(self._pending),
+            "max_bytes": self.max_bytes,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # --- Internal ---
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers, mp_context=mp.get_context("spawn")
+            )
+        return self._pool
+
+    def _done(self, key: str, fut: Future) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+        self._evict()
+
+    def _touch(self, dest: Path) -> None:
+        """Record an access to ``dest`` (and persist it as the file's mtime)."""
+        key = str(dest)
+        with self._lock:
+            self._used[key] = None
+            self._used.move_to_end(key)
+        try:
+            os.utime(dest)
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """Delete least-recently-used files until the cache fits ``max_bytes``.
+
+        Files in the warm set or still decoding are never deleted, even if
+        that leaves the cache over budget.
+        """
+        try:
+            files = {str(f): f.stat() for f in self.cache_dir.glob("*.f32")}
+        except OSError:
+            return
+        total = sum(st.st_size for st in files.values())
+        if total <= self.max_bytes:
+            return
+        with self._lock:
+            keep = self._warm_set | self._pending.keys()
+            used = [k for k in self._used if k in files]
+        seen = set(used)
+        unseen = sorted(files.keys() - seen, key=lambda k: files[k].st_mtime)
+        for key in (*unseen, *used):
+            if total <= self.max_bytes:
+                break
+            if key in keep:
+                continue
+            Path(key).unlink(missing_ok=True)
+            with self._lock:
+                self._used.pop(key, None)
+            total -= files[key].st_size
@@ -0,0 +1,411 @@
+"""Out-of-process audio engine: a Player in a child process over shared memory.
+
+The child owns the miniaudio device, the decoded PCM and all DSP, so the
+audio callback never contends for the daemon's GIL. The daemon drives it
+through ``RemotePlayer``, a drop-in for ``Player``:
+
+- commands and replies travel through lock-free single-producer /
+  single-consumer rings in ``multiprocessing.shared_memory``, with a
+  one-byte pipe "doorbell" only to wake a sleeping reader;
+- position and transport state are published by the child into a shared
+  status block, so getters never round-trip;
+- track-end, underrun and scheduled-cue events come back on a third ring and are
+  delivered to the callbacks from a listener thread, matching the
+  audio-thread contract of ``Player``.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import pickle
+import struct
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Callable, cast
+
+import numpy as np
+
+RING_SIZE = 1 << 16
+RPC_TIMEOUT = 60.0
+STATUS_INTERVAL = 0.01
+
+# Status block layout (float64 slots)
+_ST_SEQ, _ST_POS, _ST_DUR, _ST_PLAYING, _ST_PAUSED, _ST_ALIVE = range(6)
+_ST_LEVELS = slice(6, 8)  # per-channel peaks
+_ST_SLOTS = 8
+
+
+class ShmRing:
+    """Single-producer/single-consumer message ring in shared memory.
+
+    The header holds two monotonically increasing byte counters: ``head``
+    (written only by the producer) and ``tail`` (written only by the
+    consumer). Messages are length-prefixed and may wrap around the end of
+    the buffer. No locks are taken on either side.
+    """
+
+    _HEADER = 16
+    _LEN = struct.Struct("<I")
+
+    def __init__(self, name: str | None = None, size: int = RING_SIZE):
+        if name is None:
+            self.shm = SharedMemory(create=True, size=self._HEADER + size)
+        else:
+            self.shm = SharedMemory(name=name)
+        buf = self.shm.buf
+        if buf is None:  # only once closed
+            raise ValueError(f"Shared memory {self.shm.name} is closed")
+        if name is None:
+            buf[: self._HEADER] = bytes(self._HEADER)
+        self.name = self.shm.name
+        self.size = self.shm.size - self._HEADER
+        self._ctr = np.ndarray((2,), dtype=np.uint64, buffer=buf)
+        self._data = buf[self._HEADER :]
+
+    def put(self, payload: bytes) -> bool:
+        """Append one message; False if the ring is full."""
+        msg = self._LEN.pack(len(payload)) + payload
+        head, tail = int(self._ctr[0]), int(self._ctr[1])
+        if len(msg) > self.size - (head - tail):
+            return False
+        self._copy_in(head % self.size, msg)
+        self._ctr[0] = head + len(msg)  # publish after the payload is in place
+        return True
+
+    def get(self) -> bytes | None:
+        """Pop the oldest message, or None when empty."""
+        head, tail = int(self._ctr[0]), int(self._ctr[1])
+        if head == tail:
+            return None
+        (n,) = self._LEN.unpack(self._copy_out(tail % self.size, self._LEN.size))
+        payload = self._copy_out((tail + self._LEN.size) % self.size, n)
+        self._ctr[1] = tail + self._LEN.size + n
+        return payload
+
+    def close(self) -> None:
+        del self._ctr
+        self._data.release()
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.shm.unlink()
+
+    def _copy_in(self, off: int, data: bytes) -> None:
+        first = min(len(data), self.size - off)
+        self._data[off : off + first] = data[:first]
+        if first < len(data):
+            self._data[: len(data) - first] = data[first:]
+
+    def _copy_out(self, off: int, n: int) -> bytes:
+        first = min(n, self.size - off)
+        out = bytes(self._data[off : off + first])
+        if first < n:
+            out += bytes(self._data[: n - first])
+        return out
+
+
+class _Channel:
+    """A ring plus a doorbell pipe used only to wake a blocked reader."""
+
+    def __init__(self, ring: ShmRing, bell_r: Any, bell_w: Any):
+        self.ring = ring
+        self._bell_r = bell_r
+        self._bell_w = bell_w
+
+    def send(self, msg: tuple) -> None:
+        data = pickle.dumps(msg, protocol=pickle.HIGHEST_PROTOCOL)
+        while not self.ring.put(data):
+            time.sleep(0.001)
+        self._bell_w.send_bytes(b"\0")
+
+    def recv(self, timeout: float | None) -> tuple | None:
+        data = self.ring.get()
+        try:
+            if data is None:
+                if not self._bell_r.poll(timeout):
+                    return None
+                data = self.ring.get()
+            while self._bell_r.poll(0):
+                self._bell_r.recv_bytes()
+        except EOFError:  # other side exited; drain what is left
+            if timeout:
+                time.sleep(min(timeout, 0.01))
+        if data is None:
+            data = self.ring.get()
+        return pickle.loads(data) if data is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Child process
+# ---------------------------------------------------------------------------
+
+
+def _engine_main(
+    names: tuple[str, str, str, str],
+    bells: tuple,
+    device_id: bytes | None,
+    cache_dir: Path | None,
+) -> None:
+    """Child entry point: run a Player and serve commands until ``quit``."""
+    from .decode import DecodeService
+    from .player import Player
+
+    cmd_name, reply_name, event_name, status_name = names
+    cmd = _Channel(ShmRing(cmd_name), bells[0], None)
+    reply = _Channel(ShmRing(reply_name), None, bells[1])
+    events = _Channel(ShmRing(event_name), None, bells[2])
+    status_shm = SharedMemory(name=status_name)
+    status = np.ndarray((_ST_SLOTS,), dtype=np.float64, buffer=status_shm.buf)
+
+    player = Player(device_id, DecodeService(cache_dir) if cache_dir else None)
+    player.set_end_callback(lambda: events.send(("end",)))
+    player.set_action_callback(lambda a, v: events.send(("action", a, v)))
+    player.set_underrun_callback(lambda: events.send(("underrun",)))
+
+    def publish(status: np.ndarray) -> None:
+        status[_ST_POS] = player.get_position()
+        status[_ST_DUR] = player.get_duration()
+        status[_ST_PLAYING] = player.is_playing()
+        status[_ST_PAUSED] = player.is_paused()
+        status[_ST_LEVELS] = player.get_levels()
+        status[_ST_SEQ] += 1
+
+    status[_ST_ALIVE] = 1
+    try:
+        while True:
+            msg = cmd.recv(STATUS_INTERVAL)
+            if msg is None:
+                publish(status)
+                continue
+            seq, method, args = msg
+            if method == "quit":
+                break
+            try:
+                result = getattr(player, method)(*args)
+                publish(status)
+                reply.send((seq, True, result))
+            except Exception as e:
+                publish(status)
+                reply.send((seq, False, e))
+    finally:
+        player.stop()
+        status[_ST_ALIVE] = 0
+        reply.send((-1, True, None))
+        del status
+        status_shm.close()
+        for ch in (cmd, reply, events):
+            ch.ring.close()
+
+
+# ---------------------------------------------------------------------------
+# Daemon-side proxy
+# ---------------------------------------------------------------------------
+
+
+class RemotePlayer:
+    """``Player`` interface backed by an engine child process."""
+
+    def __init__(
+        self,
+        device_id: bytes | None = None,
+        cache_dir: Path | None = None,
+        mp_context: str = "spawn",
+    ):
+        # typeshed declares Process per start method, not on BaseContext
+        ctx = cast(
+            "mp.context.SpawnContext | mp.context.ForkContext"
+            " | mp.context.ForkServerContext",
+            mp.get_context(mp_context),
+        )
+        self._rings = [ShmRing() for _ in range(3)]
+        self._status_shm = SharedMemory(create=True, size=_ST_SLOTS * 8)
+        self._status = np.ndarray(
+            (_ST_SLOTS,), dtype=np.float64, buffer=self._status_shm.buf
+        )
+        self._status[:] = 0
+        pipes = [ctx.Pipe(duplex=False) for _ in range(3)]  # (reader, writer)
+        self._cmd = _Channel(self._rings[0], None, pipes[0][1])
+        self._reply = _Channel(self._rings[1], pipes[1][0], None)
+        self._events = _Channel(self._rings[2], pipes[2][0], None)
+
+        self._rpc_lock = threading.Lock()
+        self._seq = 0
+        self._end_callback: Callable[[], None] | None = None
+        self._action_callback: Callable[[str, float | None], None] | None = None
+        self._underrun_callback: Callable[[], None] | None = None
+        self._volume = 100
+        self._rate = 1.0
+        self._current_uri: str | None = None
+        self._closed = False
+        self._cache = None
+        if cache_dir:
+            from .decode import DecodeService
+
+            self._cache = DecodeService(cache_dir)
+
+        names = (*(r.name for r in self._rings), self._status_shm.name)
+        bells = (pipes[0][0], pipes[1][1], pipes[2][1])
+        self._proc = ctx.Process(
+            target=_engine_main,
+            args=(names, bells, device_id, cache_dir),
+            name="atk-engine",
+            daemon=True,
+        )
+        self._proc.start()
+        self._listener = threading.Thread(
+            target=self._listen, name="atk-engine-events", daemon=True
+        )
+        self._listener.start()
+
+    # --- Player interface ---
+
+    def set_device(self, device_id: bytes | None) -> None:
+        self._call("set_device", device_id)
+
+    def set_end_callback(self, cb: Callable[[], None] | None) -> None:
+        self._end_callback = cb
+
+    def set_action_callback(
+        self, cb: Callable[[str, float | None], None] | None
+    ) -> None:
+        self._action_callback = cb
+
+    def set_underrun_callback(self, cb: Callable[[], None] | None) -> None:
+        self._underrun_callback = cb
+
+    def prepare(self, uri: str) -> None:
+        """Decode ``uri`` into the shared PCM cache (from any thread), so the
+        engine's own ``load`` is a cache hit."""
+        from .player import resolve_track
+        from .stream import is_stream_uri
+
+        if is_stream_uri(uri):
+            return None
+        resolve_track(uri)
+        if self._cache is not None:
+            self._cache.ensure(uri)
+        return None
+
+    def load(self, uri: str, samples: None = None) -> None:
+        self._current_uri = uri
+        self._call("load", uri)
+
+    def play(self, start_pos: float = 0.0) -> None:
+        self._call("play", start_pos)
+
+    def pause(self) -> None:
+        self._call("pause")
+
+    def unpause(self) -> None:
+        self._call("unpause")
+
+    def stop(self) -> None:
+        self._call("stop")
+
+    def close(self) -> None:
+        """Stop the engine child and release shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._proc.is_alive():
+            self._cmd.send((0, "quit", ()))
+            self._proc.join(timeout=2.0)
+        if self._proc.is_alive():
+            self._proc.kill()
+        self._listener.join(timeout=1.0)
+        del self._status
+        self._status_shm.close()
+        self._status_shm.unlink()
+        for ring in self._rings:
+            ring.close()
+            ring.unlink()
+
+    def is_playing(self) -> bool:
+        return bool(self._status[_ST_PLAYING])
+
+    def is_paused(self) -> bool:
+        return bool(self._status[_ST_PAUSED])
+
+    def get_position(self) -> float:
+        return float(self._status[_ST_POS])
+
+    def get_duration(self) -> float:
+        return float(self._status[_ST_DUR])
+
+    def get_levels(self) -> list[float]:
+        return self._status[_ST_LEVELS].tolist()
+
+    def get_stream_stats(self) -> dict | None:
+        return self._call("get_stream_stats")
+
+    def seek(self, position: float) -> None:
+        self._call("seek", position)
+
+    def set_volume(self, level: int) -> None:
+        self._volume = max(0, min(100, level))
+        self._call("set_volume", level)
+
+    def get_volume(self) -> int:
+        return self._volume
+
+    def set_rate(self, speed: float, mode: str | None = None) -> None:
+        self._rate = max(0.25, min(4.0, speed))
+        self._call("set_rate", speed, mode)
+
+    def get_rate(self) -> float:
+        return self._rate
+
+    def schedule(self, frame: int, action: str, value: float | None = None) -> None:
+        self._call("schedule", frame, action, value)
+
+    def clear_schedule(self) -> None:
+        self._call("clear_schedule")
+
+    def get_schedule(self) -> list[tuple[int, str, float | None]]:
+        return self._call("get_schedule")
+
+    @property
+    def current_uri(self) -> str | None:
+        return self._current_uri
+
+    # --- Internal ---
+
+    def _call(self, method: str, *args: Any) -> Any:
+        if self._closed:
+            raise RuntimeError("Audio engine is closed")
+        with self._rpc_lock:
+            self._seq += 1
+            seq = self._seq
+            self._cmd.send((seq, method, args))
+            deadline = time.monotonic() + RPC_TIMEOUT
+            while True:
+                msg = self._reply.recv(max(0.0, deadline - time.monotonic()))
+                if msg is None:
+                    if not self._proc.is_alive() or time.monotonic() >= deadline:
+                        raise RuntimeError(f"Audio engine not responding ({method})")
+                    continue
+                rseq, ok, result = msg
+                if rseq == -1:
+                    raise RuntimeError("Audio engine exited")
+                if rseq != seq:
+                    continue
+                if not ok:
+                    raise result
+                return result
+
+    def _listen(self) -> None:
+        while not self._closed:
+            try:
+                msg = self._events.recv(0.2)
+            except (EOFError, OSError):
+                return
+            if msg is None:
+                continue
+            if msg[0] == "end" and self._end_callback:
+                self._end_callback()
+            elif msg[0] == "action" and self._action_callback:
+                self._action_callback(msg[1], msg[2])
+            elif msg[0] == "underrun" and self._underrun_callback:
+                self._underrun_callback()
@@ -0,0 +1,274 @@
+"""Crash-safe daemon state: an append-only journal over periodic snapshots.
+
+Two files in ``get_state_dir()``:
+
+    state.json     snapshot: the whole state as of record ``seq``
+    journal.jsonl  one JSON record per state change since then
+
+The daemon calls ``record`` on the loop, which only numbers the record and
+queues it. At most ``FLUSH_INTERVAL`` later the queued records are encoded,
+appended and fsync'd in one batch on the journal's own thread, so a crash
+loses at most that much. After ``SNAPSHOT_EVERY`` records, or once the
+journal holds more URIs than the snapshot (``due``), the daemon hands over
+its whole state: it is written to a temporary file, fsync'd, renamed over
+``state.json``, and the journal is truncated, which keeps replay a small
+part of a restart whatever the queue length. Records that reach disk
+around a crash between the rename and the truncation carry a ``seq`` the
+snapshot already covers and are skipped. A torn last line is cut off when
+the journal is next loaded.
+
+A state, as snapshotted and as ``load`` returns it:
+
+    queue, queue_pos        URIs in play order, current index
+    shuffle, seed, drawn    shuffle on/off, its seed, play indices visited
+    repeat, volume, rate    settings
+    state, position         playback state and position in the current track
+
+Records are the daemon's changes to those: queue ops (``insert`` with
+URIs, ``remove``, ``move``, ``clear``, ``current_changed``; each with the
+resulting ``current``), ``shuffle`` (turned on, off or reshuffled),
+``settings`` and ``clock`` (a playback state or position sample).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+_logger = logging.getLogger("atk")
+
+SNAPSHOT_NAME = "state.json"
+JOURNAL_NAME = "journal.jsonl"
+FLUSH_INTERVAL = 0.5  # seconds of changes a crash can lose
+SNAPSHOT_EVERY = 1000  # records; also the fewest journaled URIs that force one
+
+
+def empty_state() -> dict:
+    return {
+        "seq": 0,
+        "queue": [],
+        "queue_pos": 0,
+        "shuffle": False,
+        "seed": None,
+        "drawn": [],
+        "repeat": "none",
+        "volume": 80,
+        "rate": 1.0,
+        "state": "stopped",
+        "position": 0.0,
+    }
+
+
+def replay(state: dict, records: Iterable[dict]) -> dict:
+    """``state`` with ``records`` applied in order; ``state`` is used up.
+
+    Tracks are followed by id (their position among every URI seen), so
+    each record costs O(1) plus a list move, and the drawn part of the
+    shuffle needs no renumbering as tracks are removed or moved.
+    """
+    pool: list[str] = state["queue"]  # every URI seen; ids index into it
+    ids = list(range(len(pool)))  # queue order
+    drawn = dict.fromkeys(ids[i] for i in state["drawn"] if 0 <= i < len(ids))
+    for rec in records:
+        op = rec["op"]
+        if op == "insert":
+            i = rec["index"]
+            ids[i:i] = range(len(pool), len(pool) + len(rec["uris"]))
+            pool.extend(rec["uris"])
+        elif op == "remove":
+            drawn.pop(ids.pop(rec["index"]), None)
+        elif op == "move":
+            ids.insert(rec["to"], ids.pop(rec["from"]))
+        elif op == "clear":
+            ids.clear()
+            drawn.clear()
+        elif op == "current_changed":
+            # A track played while shuffled is part of the drawn order
+            if state["shuffle"] and 0 <= rec["current"] < len(ids):
+                drawn.setdefault(ids[rec["current"]])
+            state["position"] = 0.0
+        elif op == "shuffle":
+            state["shuffle"] = rec["enabled"]
+            state["seed"] = rec["seed"]
+            drawn = dict.fromkeys(ids[i] for i in rec["drawn"] if 0 <= i < len(ids))
+        elif op == "settings":
+            state["volume"] = rec["volume"]
+            state["repeat"] = rec["repeat"]
+        elif op == "clock":
+            state["state"] = rec["state"]
+            state["position"] = rec["position"]
+            state["rate"] = rec["rate"]
+        if "current" in rec:
+            state["queue_pos"] = rec["current"]
+        state["seq"] = rec["seq"]
+    state["queue"] = [pool[h] for h in ids]
+    if drawn:
+        where = {h: i for i, h in enumerate(ids)}
+        state["drawn"] = [where[h] for h in drawn]
+    else:
+        state["drawn"] = []
+    return state
+
+
+class Journal:
+    """Journal and snapshot files for one daemon; see the module docstring."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.snapshot_path = directory / SNAPSHOT_NAME
+        self.journal_path = directory / JOURNAL_NAME
+        self.seq = 0  # last record numbered
+        self._pending: list[dict] = []
+        self._records = 0  # journaled since the snapshot
+        self._uris = 0  # in those records
+        self._base = 0  # tracks in the snapshot
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._file: BinaryIO | None = None  # touched on the writer thread only
+        # One thread keeps appends and snapshots in submission order
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="atk-journal"
+        )
+
+    def load(self) -> dict | None:
+        """The state the files describe, or None if there is none (blocking).
+
+        Cuts a torn last line off the journal so new records follow whole
+        ones. Later records continue from the last ``seq`` found.
+        """
+        try:
+            state = json.loads(self.snapshot_path.read_bytes())
+        except FileNotFoundError:
+            state = None
+        except (OSError, ValueError) as e:
+            _logger.warning("Ignoring unreadable state snapshot: %s", e)
+            return None
+        state = {**empty_state(), **(state or {})}
+        base = state["seq"]
+        records = []
+        try:
+            with open(self.journal_path, "r+b") as f:
+                good = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        rec = json.loads(line)
+                    except ValueError:
+                        _logger.warning("Dropping torn journal tail at byte %d", good)
+                        f.truncate(good)
+                        break
+                    good += len(line)
+                    if rec["seq"] > base:
+                        records.append(rec)
+        except FileNotFoundError:
+            pass
+        if state["seq"] == 0 and not records:
+            return None
+        replay(state, records)
+        self.seq = state["seq"]
+        self._records = len(records)
+        self._uris = sum(len(rec.get("uris", ())) for rec in records)
+        self._base = len(state["queue"])
+        return state
+
+    def record(self, rec: dict) -> None:
+        """Number ``rec`` and queue it for the next batch (on the loop)."""
+        self.seq += 1
+        rec["seq"] = self.seq
+        self._pending.append(rec)
+        self._records += 1
+        if "uris" in rec:
+            self._uris += len(rec["uris"])
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(FLUSH_INTERVAL, self._flush)
+
+    @property
+    def due(self) -> bool:
+        """Whether a snapshot should replace the journal now."""
+        if self._records >= SNAPSHOT_EVERY:
+            return True
+        return self._uris > max(SNAPSHOT_EVERY, self._base)
+
+    def snapshot(self, state: dict) -> None:
+        """Replace the files with ``state``, taken after the last record.
+
+        ``state`` is handed over: the caller must not change it.
+        """
+        state["seq"] = self.seq
+        self._pending = []  # the snapshot covers them
+        self._records = self._uris = 0
+        self._base = len(state["queue"])
+        self._writer.submit(self._write_snapshot, state)
+
+    async def flush(self) -> None:
+        """Write queued records now and wait until everything is on disk."""
+        self._flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._writer, lambda: None)
+
+    async def close(self, state: dict | None = None) -> None:
+        """Snapshot ``state`` (if given), finish writing and close."""
+        if state is not None:
+            self.snapshot(state)
+        await self.flush()
+        self._writer.submit(self._close_file)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._writer.shutdown)
+
+    # --- Internal ---
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._writer.submit(self._append, batch)
+
+    def _open(self) -> BinaryIO:
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.journal_path, "ab")
+        return self._file
+
+    def _append(self, batch: list[dict]) -> None:
+        """Writer thread: append and fsync one batch of records."""
+        data = "".join(json.dumps(rec, separators=(",", ":")) + "\n" for rec in batch)
+        try:
+            f = self._open()
+            f.write(data.encode())
+            f.flush()
+            os.fsync(f.fileno())
+        except OSError as e:
+            _logger.warning("Journal write failed: %s", e)
+
+    def _write_snapshot(self, state: dict) -> None:
+        """Writer thread: atomically replace the snapshot, then empty the journal."""
+        tmp = self.snapshot_path.with_name(f"{SNAPSHOT_NAME}.{os.getpid()}.tmp")
+        try:
+            f = self._open()
+            with open(tmp, "wb") as out:
+                out.write(json.dumps(state, separators=(",", ":")).encode())
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, self.snapshot_path)
+            dirfd = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(dirfd)  # make the rename itself durable
+            finally:
+                os.close(dirfd)
+            f.truncate(0)
+            os.fsync(f.fileno())
+        except OSError as e:
+            _logger.warning("State snapshot failed: %s", e)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -2,18 +2,25 @@
 
 from __future__ import annotations
 
+import heapq
 import threading
 from collections.abc import Generator
 from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
 import miniaudio
 import numpy as np
 from numpy.typing import NDArray
 
+from .stream import StreamSource, is_stream_uri
+
+if TYPE_CHECKING:
+    from .decode import DecodeService
+
 SUPPORTED_EXTENSIONS = {".mp3", ".ogg", ".flac", ".wav", ".opus", ".m4a", ".aac"}
 SAMPLE_RATE = 44100
 CHANNELS = 2
+SCHEDULE_ACTIONS = ("pause", "seek", "loop", "stop", "gain")
 
 
 def list_devices() -> list[dict]:
@@ -46,24 +53,46 @@ def _bytes_to_device_id(device_bytes: bytes):
 
 
 def is_supported(uri: str) -> bool:
-    """Check if URI is a supported audio format."""
-    return Path(uri).suffix.lower() in SUPPORTED_EXTENSIONS
+    """Check if URI is a supported audio format or a PCM stream."""
+    return is_stream_uri(uri) or Path(uri).suffix.lower() in SUPPORTED_EXTENSIONS
+
+
+def resolve_track(uri: str) -> Path:
+    """Absolute path of a playable file URI, or FileNotFoundError/ValueError."""
+    path = Path(uri).expanduser().resolve()
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+    if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported format: {path.suffix}")
+    return path
 
 
 class Player:
     """Audio player with rate control (time-stretch or tape-style)."""
 
-    def __init__(self, device_id: bytes | None = None):
+    def __init__(
+        self, device_id: bytes | None = None, cache: DecodeService | None = None
+    ):
         self._device: miniaudio.PlaybackDevice | None = None
         self._device_id = device_id
+        self._cache = cache
         self._samples: NDArray[np.float32] | None = None
+        self._stream: StreamSource | None = None
         self._total_frames = 0
         self._position = 0
         self._active = False
         self._playing = False
         self._current_uri: str | None = None
         self._end_callback: Callable[[], None] | None = None
+        self._action_callback: Callable[[str, float | None], None] | None = None
+        self._underrun_callback: Callable[[], None] | None = None
+        # Per-channel peaks of the last chunk, written in place by the generator
+        self._peak_hi = np.zeros(CHANNELS, dtype=np.float32)
+        self._peak_lo = np.zeros(CHANNELS, dtype=np.float32)
         self._lock = threading.Lock()
+        # Min-heap of (frame, seq, action, value) cues applied by the generator
+        self._schedule: list[tuple[int, int, str, float | None]] = []
+        self._schedule_seq = 0
         self._volume = 100
         self._rate = 1.0
         self._rate_mode = "stretch"  # "stretch" (WSOLA) or "tape" (resample)
@@ -74,29 +103,62 @@ class Player:
     def set_end_callback(self, cb: Callable[[], None] | None) -> None:
         self._end_callback = cb
 
-    def load(self, uri: str) -> None:
-        """Load and decode audio file into memory."""
+    def set_action_callback(
+        self, cb: Callable[[str, float | None], None] | None
+    ) -> None:
+        """Set callback fired (from the audio thread) when a scheduled cue runs."""
+        self._action_callback = cb
+
+    def set_underrun_callback(self, cb: Callable[[], None] | None) -> None:
+        """Set callback fired (from the audio thread) when a stream runs dry."""
+        self._underrun_callback = cb
+
+    def prepare(self, uri: str) -> NDArray[np.float32] | None:
+        """Decode ``uri`` without touching playback state.
+
+        Safe to call from a worker thread; hand the result to ``load``.
+        Streams are opened by ``load`` itself, so they prepare to None.
+        """
+        if is_stream_uri(uri):
+            return None
+        path = resolve_track(uri)
+        samples = self._cache.lookup(str(path)) if self._cache is not None else None
+        if samples is None:
+            decoded = miniaudio.decode_file(
+                str(path),
+                output_format=miniaudio.SampleFormat.FLOAT32,
+                nchannels=CHANNELS,
+                sample_rate=SAMPLE_RATE,
+            )
+            samples = np.array(decoded.samples, dtype=np.float32)
+        return samples
+
+    def load(self, uri: str, samples: NDArray[np.float32] | None = None) -> None:
+        """Load a file (decoding it unless ``samples`` come from ``prepare``),
+        or attach a PCM stream."""
+        if samples is None and not is_stream_uri(uri):
+            samples = self.prepare(uri)
         self._current_uri = uri
         self._stop_device()
+        self._close_stream()
+
+        if samples is None:  # only streams prepare to None
+            stream = StreamSource(uri, SAMPLE_RATE, CHANNELS)
+            stream.open()
+            self._stream = stream
+            self._samples = None
+            self._total_frames = 0
+            self._position = 0
+            self.clear_schedule()
+            return
 
-        path = Path(uri).expanduser().resolve()
-        if not path.exists():
-            raise FileNotFoundError(f"File not found: {path}")
-        if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            raise ValueError(f"Unsupported format: {path.suffix}")
-
-        decoded = miniaudio.decode_file(
-            str(path),
-            output_format=miniaudio.SampleFormat.FLOAT32,
-            nchannels=CHANNELS,
-            sample_rate=SAMPLE_RATE,
-        )
-        self._samples = np.array(decoded.samples, dtype=np.float32)
-        self._total_frames = len(self._samples) // CHANNELS
+        self._samples = samples
+        self._total_frames = len(samples) // CHANNELS
         self._position = 0
+        self.clear_schedule()
 
     def play(self, start_pos: float = 0.0) -> None:
-        if self._samples is None:
+        if self._samples is None and self._stream is None:
             return
         with self._lock:
             self._position = max(
@@ -111,7 +173,7 @@ class Player:
             self._playing = False
 
     def unpause(self) -> None:
-        if self._samples is None:
+        if self._samples is None and self._stream is None:
             return
         with self._lock:
             self._playing = True
@@ -124,8 +186,13 @@ class Player:
             self._playing = False
             self._active = False
         self._stop_device()
+        self._close_stream()
         self._position = 0
 
+    def close(self) -> None:
+        """Release the device and any stream (engine shutdown)."""
+        self.stop()
+
     def is_playing(self) -> bool:
         return self._playing
 
@@ -138,6 +205,14 @@ class Player:
     def get_duration(self) -> float:
         return self._total_frames / SAMPLE_RATE
 
+    def get_stream_stats(self) -> dict | None:
+        """Jitter-buffer/latency metrics when playing a stream, else None."""
+        return self._stream.stats() if self._stream is not None else None
+
+    def get_levels(self) -> list[float]:
+        """Peak level per channel (0.0-1.0) of the audio last played."""
+        return np.maximum(self._peak_hi, -self._peak_lo).tolist()
+
     def seek(self, position: float) -> None:
         if self._samples is None:
             return
@@ -161,6 +236,30 @@ class Player:
     def get_rate(self) -> float:
         return self._rate
 
+    def schedule(self, frame: int, action: str, value: float | None = None) -> None:
+        """Queue an action to run when playback reaches a source frame.
+
+        ``value`` is the target frame for ``seek``/``loop`` (a loop cue seeks
+        back to it and re-arms itself) and the volume level for ``gain``.
+        Cues belong to the loaded track and are dropped on the next load.
+        """
+        if action not in SCHEDULE_ACTIONS:
+            raise ValueError(f"Unknown scheduled action: {action}")
+        with self._lock:
+            heapq.heappush(
+                self._schedule, (max(0, frame), self._schedule_seq, action, value)
+            )
+            self._schedule_seq += 1
+
+    def clear_schedule(self) -> None:
+        with self._lock:
+            self._schedule.clear()
+
+    def get_schedule(self) -> list[tuple[int, str, float | None]]:
+        """Pending cues as (frame, action, value), in firing order."""
+        with self._lock:
+            return [(f, a, v) for f, _, a, v in sorted(self._schedule)]
+
     @property
     def current_uri(self) -> str | None:
         return self._current_uri
@@ -185,6 +284,16 @@ class Player:
             self._device.close()
             self._device = None
 
+    def _close_stream(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def _at_end(self) -> bool:
+        if self._stream is not None:
+            return self._stream.finished
+        return self._position >= self._total_frames
+
     def _audio_generator(self) -> Generator[bytes, int, None]:
         """Generate processed audio chunks for playback."""
         required_frames = yield b""
@@ -194,11 +303,13 @@ class Player:
                 playing = self._playing
 
             if not playing:
+                self._peak_hi[:] = 0
+                self._peak_lo[:] = 0
                 silence = np.zeros(required_frames * CHANNELS, dtype=np.float32)
                 required_frames = yield silence.tobytes()
                 continue
 
-            if self._samples is None:
+            if self._samples is None and self._stream is None:
                 break
 
             # Read source frames (more when speeding up, fewer when slowing)
@@ -207,9 +318,9 @@ class Player:
                 if self._rate != 1.0
                 else required_frames
             )
-            chunk = self._read_chunk(source_frames)
+            chunk = self._read_scheduled(source_frames)
 
-            if len(chunk) == 0:
+            if len(chunk) == 0 and self._at_end():
                 with self._lock:
                     self._active = False
                     self._playing = False
@@ -217,12 +328,16 @@ class Player:
                     self._end_callback()
                 break
 
-            # Apply rate change
-            if self._rate != 1.0:
+            # Apply rate change (a cue that paused mid-chunk shortens the output)
+            if self._rate != 1.0 and len(chunk):
+                read = len(chunk) // CHANNELS
+                target = (
+                    required_frames if read >= source_frames else int(read / self._rate)
+                )
                 if self._rate_mode == "tape":
-                    chunk = self._tape_resample(chunk, required_frames)
+                    chunk = self._tape_resample(chunk, target)
                 else:
-                    chunk = self._time_stretch(chunk, required_frames)
+                    chunk = self._time_stretch(chunk, target)
 
             # Apply volume and clip
             chunk = np.clip(chunk * (self._volume / 100.0), -1.0, 1.0)
@@ -233,11 +348,83 @@ class Player:
                 chunk = np.pad(chunk, (0, expected - len(chunk)))
             elif len(chunk) > expected:
                 chunk = chunk[:expected]
+            frames = chunk.reshape(-1, CHANNELS)
+            frames.max(axis=0, out=self._peak_hi)
+            frames.min(axis=0, out=self._peak_lo)
 
             required_frames = yield chunk.astype(np.float32).tobytes()
 
+    def _read_scheduled(self, frames: int) -> NDArray[np.float32]:
+        """Read source frames, splitting the chunk at any scheduled cue.
+
+        The heap top is checked once per split, so each callback costs
+        O(log n) per cue fired and O(1) otherwise. Cues a seek has jumped
+        past are discarded.
+        """
+        if not self._schedule:
+            return self._read_chunk(frames)
+        parts: list[NDArray[np.float32]] = []
+        remaining = frames
+        while remaining > 0 and self._playing:
+            with self._lock:
+                while self._schedule and self._schedule[0][0] < self._position:
+                    heapq.heappop(self._schedule)
+                until = (
+                    self._schedule[0][0] - self._position
+                    if self._schedule
+                    else remaining
+                )
+            if until >= remaining:
+                parts.append(self._read_chunk(remaining))
+                break
+            if until > 0:
+                part = self._read_chunk(until)
+                parts.append(part)
+                remaining -= until
+                if len(part) < until * CHANNELS:
+                    break
+            self._fire_due()
+        if not parts:
+            return np.array([], dtype=np.float32)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _fire_due(self) -> None:
+        """Apply every cue scheduled at the current frame."""
+        with self._lock:
+            while self._schedule and self._schedule[0][0] <= self._position:
+                frame, _, action, value = heapq.heappop(self._schedule)
+                if self._action_callback:
+                    self._action_callback(action, value)
+                if action == "pause":
+                    self._playing = False
+                elif action == "stop":
+                    self._playing = False
+                    self._active = False
+                    self._position = 0
+                elif action == "gain" and value is not None:
+                    self._volume = max(0, min(100, int(value)))
+                elif (
+                    action in ("seek", "loop")
+                    and value is not None
+                    and self._stream is None
+                ):
+                    self._position = max(0, min(int(value), self._total_frames - 1))
+                    if action == "loop" and self._position < frame:
+                        heapq.heappush(
+                            self._schedule, (frame, self._schedule_seq, action, value)
+                        )
+                        self._schedule_seq += 1
+                    break  # position moved; later cues are re-checked from there
+
     def _read_chunk(self, frames: int) -> NDArray[np.float32]:
         """Read next chunk of raw interleaved samples."""
+        if self._stream is not None:
+            underruns = self._stream.underruns
+            chunk = self._stream.read(frames)
+            self._position += len(chunk) // CHANNELS
+            if self._stream.underruns != underruns and self._underrun_callback:
+                self._underrun_callback()
+            return chunk
         if self._samples is None:
             return np.array([], dtype=np.float32)
         with self._lock:
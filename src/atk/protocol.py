@@ -0,0 +1,230 @@
+"""Wire protocol: command declarations and typed errors.
+
+Every command the daemon serves is declared in ``COMMANDS`` with the
+arguments it accepts. ``compile_args`` turns a declaration into a
+validator once, at startup; the daemon runs it before the handler, so
+handlers see arguments of the declared types and never coerce them.
+
+Failures carry an error ``code`` and ``category`` from
+``schema/atk-protocol-v1.json``. ``ProtocolError`` names a code
+explicitly; ``error_info`` also maps the builtin exceptions handlers raise
+(``IndexError`` for a bad queue index, ``OSError`` for files and so on).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, NamedTuple
+
+PROTOCOL_VERSION = 1
+
+ERROR_CATEGORIES = {
+    "FILE_NOT_FOUND": "io",
+    "PERMISSION_DENIED": "io",
+    "READ_ERROR": "io",
+    "SESSION_NOT_FOUND": "session",
+    "SESSION_EXISTS": "session",
+    "INVALID_FORMAT": "playback",
+    "DECODE_ERROR": "playback",
+    "STREAM_ERROR": "playback",
+    "INVALID_MESSAGE": "protocol",
+    "UNKNOWN_COMMAND": "protocol",
+    "INVALID_ARGS": "protocol",
+    "QUEUE_EMPTY": "queue",
+    "INVALID_INDEX": "queue",
+    "INTERNAL_ERROR": "internal",
+}
+
+
+class ProtocolError(ValueError):
+    """A request the daemon refuses, with the schema error ``code`` to report."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def error(code: str, message: str) -> dict:
+    """An ``error_info`` object."""
+    return {"code": code, "category": ERROR_CATEGORIES[code], "message": message}
+
+
+def error_info(exc: BaseException) -> dict:
+    """The ``error_info`` object reporting ``exc``."""
+    if isinstance(exc, ProtocolError):
+        code = exc.code
+    elif isinstance(exc, FileNotFoundError):
+        code = "FILE_NOT_FOUND"
+    elif isinstance(exc, PermissionError):
+        code = "PERMISSION_DENIED"
+    elif isinstance(exc, OSError):
+        code = "READ_ERROR"
+    elif isinstance(exc, IndexError):
+        code = "INVALID_INDEX"
+    elif isinstance(exc, (ValueError, TypeError)):
+        code = "INVALID_ARGS"
+    else:
+        code = "INTERNAL_ERROR"
+    return error(code, str(exc))
+
+
+# ---------------------------------------------------------------------------
+# Argument declarations
+# ---------------------------------------------------------------------------
+
+
+class Arg(NamedTuple):
+    """One argument: its JSON type(s), ``|``-separated, and constraints.
+
+    ``null`` counts as leaving an argument out.
+    """
+
+    type: str
+    required: bool = False
+    choices: tuple[str, ...] | None = None
+    minimum: float | None = None
+
+
+def _is_int(v: Any) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+TYPES: dict[str, Callable[[Any], bool]] = {
+    "integer": _is_int,
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "integers": lambda v: isinstance(v, list) and all(_is_int(i) for i in v),
+    "strings": lambda v: isinstance(v, list) and all(isinstance(s, str) for s in v),
+}
+
+POSITION = Arg("number|string")  # seconds, "1:30", "+5" or "-10"
+COUNT = Arg("integer", minimum=0)
+FIELDS = Arg("strings")
+
+COMMANDS: dict[str, dict[str, Arg]] = {
+    # Playback
+    "play": {"file": Arg("string")},
+    "pause": {},
+    "stop": {},
+    "next": {},
+    "prev": {},
+    "seek": {"pos": POSITION},
+    "volume": {"level": Arg("integer")},
+    "rate": {
+        "speed": Arg("number"),
+        "mode": Arg("string", choices=("stretch", "tape")),
+    },
+    "schedule": {
+        "action": Arg(
+            "string", choices=("pause", "seek", "loop", "stop", "gain", "clear")
+        ),
+        "at": POSITION,
+        "frame": COUNT,
+        "value": POSITION,
+    },
+    # Queue
+    "add": {
+        "uri": Arg("string"),
+        "paths": Arg("strings"),
+        "recursive": Arg("boolean"),
+        "glob": Arg("string"),
+        "sort": Arg("string", choices=("path", "name", "mtime", "none")),
+    },
+    "remove": {"index": Arg("integer", required=True)},
+    "move": {
+        "from": Arg("integer", required=True),
+        "to": Arg("integer", required=True),
+    },
+    "clear": {},
+    "queue": {
+        "if_version": Arg("integer"),
+        "offset": COUNT,
+        "limit": COUNT,
+        "around_current": COUNT,
+        "fields": FIELDS,
+    },
+    "jump": {"index": Arg("integer", required=True)},
+    # Modes
+    "shuffle": {"enabled": Arg("boolean"), "seed": Arg("integer")},
+    "repeat": {"mode": Arg("string", choices=("none", "queue", "track"))},
+    # Status
+    "status": {"if_version": Arg("integer"), "fields": FIELDS},
+    "info": {"index": Arg("integer|integers"), "fields": FIELDS},
+    "subscribe": {},
+    "wait": {"since": Arg("object"), "timeout": Arg("number", minimum=0)},
+    # Playlists and cache
+    "save": {
+        "name": Arg("string", required=True),
+        "format": Arg("string", choices=("json", "m3u", "txt")),
+    },
+    "load": {"name": Arg("string", required=True)},
+    "playlists": {},
+    "warm": {"playlist": Arg("string"), "range": Arg("string"), "count": COUNT},
+    # Devices and daemon
+    "devices": {},
+    "set-device": {"device_id": Arg("string")},
+    "ping": {},
+    "stats": {},
+    "framing": {"codec": Arg("string", required=True, choices=("json", "msgpack"))},
+    "shutdown": {},
+    "batch": {
+        "commands": Arg("array", required=True),
+        "stop_on_error": Arg("boolean"),
+    },
+}
+
+
+def _invalid(cmd: str, message: str) -> ProtocolError:
+    return ProtocolError("INVALID_ARGS", f"{cmd}: {message}")
+
+
+def _compile_arg(cmd: str, name: str, arg: Arg) -> Callable[[Any], None]:
+    tests = tuple(TYPES[t] for t in arg.type.split("|"))
+    is_type = tests[0] if len(tests) == 1 else lambda v: any(t(v) for t in tests)
+    expected = arg.type.replace("|", " or ")
+    choices = frozenset(arg.choices) if arg.choices else None
+    allowed = ", ".join(arg.choices or ())
+    minimum = arg.minimum
+
+    def check(value: Any) -> None:
+        if not is_type(value):
+            raise _invalid(cmd, f"{name} must be {expected}")
+        if choices is not None and value not in choices:
+            raise _invalid(cmd, f"{name} must be one of {allowed}")
+        if minimum is not None and value < minimum:
+            raise _invalid(cmd, f"{name} must be at least {minimum}")
+
+    return check
+
+
+def compile_args(cmd: str, spec: dict[str, Arg]) -> Callable[[dict], None]:
+    """Validator for ``cmd``'s arguments; raises ``ProtocolError``.
+
+    Arguments given as ``null`` are removed from ``args``, so handlers see
+    them as left out and apply their defaults.
+    """
+    checks = {name: _compile_arg(cmd, name, arg) for name, arg in spec.items()}
+    required = tuple(name for name, arg in spec.items() if arg.required)
+
+    def validate(args: dict) -> None:
+        nulls: list[str] | None = None
+        for name, value in args.items():
+            check = checks.get(name)
+            if check is None:
+                raise _invalid(cmd, f"unknown argument {name!r}")
+            if value is not None:
+                check(value)
+            elif nulls is None:
+                nulls = [name]
+            else:
+                nulls.append(name)
+        if nulls:
+            for name in nulls:
+                del args[name]
+        for name in required:
+            if args.get(name) is None:
+                raise _invalid(cmd, f"{name} required")
+
+    return validate
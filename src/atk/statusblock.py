@@ -0,0 +1,241 @@
+"""Shared status record: ``status`` without a round trip.
+
+The daemon keeps a fixed-layout record in ``atk.status`` in the runtime
+directory and rewrites it in place whenever playback, mode or queue state
+changes. Clients map the file read-only and copy a snapshot out of it:
+
+    0   magic "ATKS", layout, seq        header
+    16  state/playback/queue/settings    body (``_BODY``)
+        versions, pid, state, shuffle,
+        repeat, volume, rate, position,
+        anchor, duration, queue length,
+        queue index, track offset/len
+    128 current track info as JSON       up to ``SIZE`` bytes
+
+``position`` is a clock sample taken at ``anchor`` on the host's monotonic
+clock; readers extrapolate it while playing, as with ``position_update``.
+The versions are the daemon's own, so a snapshot's ``version`` works as
+``if_version`` for ``status`` and its ``versions`` as ``since`` for
+``wait``. Meter ``levels`` and ``stream`` buffer stats change with every
+audio block and are left to the ``status`` command.
+
+Consistency is a seqlock: the writer makes ``seq`` odd, updates the record
+and makes it even again; a reader retries while ``seq`` is odd or changed
+under it. Neither side takes a lock. CPython stores through a map in
+program order and x86-64 keeps them in order; weakly ordered CPUs have no
+fence reachable from Python, so there the retry is best effort.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+MAGIC = b"ATKS"
+LAYOUT = 2
+SIZE = 4096
+TRACK_OFFSET = 128
+READ_RETRIES = 100
+
+STATES = ("stopped", "loading", "playing", "paused")
+REPEATS = ("none", "queue", "track")
+
+_HEADER = struct.Struct("<4sIQ")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+_BODY = struct.Struct("<QQQQiBBBBddddqqII")
+_BODY_OFFSET = _HEADER.size
+
+
+class _Body(NamedTuple):
+    version: int
+    playback_version: int
+    queue_version: int
+    settings_version: int
+    pid: int
+    state: int
+    shuffle: int
+    repeat: int
+    volume: int
+    rate: float
+    position: float
+    anchor: float
+    duration: float
+    queue_length: int
+    queue_position: int
+    track_offset: int
+    track_length: int
+
+
+class StatusBlock:
+    """Writer side, owned by the daemon."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        # Built beside the target and renamed into place, so a reader never
+        # maps a half-sized file
+        tmp = path.with_name(f".{path.name}.{os.getpid()}")
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.ftruncate(fd, SIZE)
+            self._map = mmap.mmap(fd, SIZE)
+        finally:
+            os.close(fd)
+        _HEADER.pack_into(self._map, 0, MAGIC, LAYOUT, 0)
+        os.replace(tmp, path)
+        self._seq = 0
+        self._track = b""
+
+    def write(
+        self,
+        *,
+        state: str,
+        position: float,
+        anchor: float,
+        rate: float,
+        duration: float,
+        volume: int,
+        shuffle: bool,
+        repeat: str,
+        queue_length: int,
+        queue_position: int,
+        track: bytes,
+        version: int = 0,
+        playback_version: int = 0,
+        queue_version: int = 0,
+        settings_version: int = 0,
+        pid: int | None = None,
+    ) -> None:
+        if len(track) > SIZE - TRACK_OFFSET:
+            track = b""
+        # Packed before seq goes odd: a bad field must not leave it odd
+        body = _BODY.pack(
+            version,
+            playback_version,
+            queue_version,
+            settings_version,
+            os.getpid() if pid is None else pid,
+            STATES.index(state),
+            shuffle,
+            REPEATS.index(repeat),
+            volume,
+            rate,
+            position,
+            anchor,
+            duration,
+            queue_length,
+            queue_position,
+            TRACK_OFFSET,
+            len(track),
+        )
+        self._seq += 1  # odd: readers back off
+        _SEQ.pack_into(self._map, _SEQ_OFFSET, self._seq)
+        self._map[_BODY_OFFSET : _BODY_OFFSET + _BODY.size] = body
+        if track != self._track:
+            self._map[TRACK_OFFSET : TRACK_OFFSET + len(track)] = track
+            self._track = track
+        self._seq += 1
+        _SEQ.pack_into(self._map, _SEQ_OFFSET, self._seq)
+
+    def close(self) -> None:
+        """Mark the record dead (pid 0) for mapped readers and remove it."""
+        self.write(
+            state="stopped",
+            position=0.0,
+            anchor=0.0,
+            rate=1.0,
+            duration=0.0,
+            volume=0,
+            shuffle=False,
+            repeat="none",
+            queue_length=0,
+            queue_position=0,
+            track=b"",
+            pid=0,
+        )
+        self._map.close()
+        self.path.unlink(missing_ok=True)
+
+
+class StatusReader:
+    """Reader side: maps ``path`` once, then each ``read`` is a memory copy."""
+
+    def __init__(self, path: Path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            self._map = mmap.mmap(fd, SIZE, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        magic, layout, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or layout != LAYOUT:
+            self._map.close()
+            raise ValueError(f"Not an atk status block: {path}")
+
+    def close(self) -> None:
+        self._map.close()
+
+    def snapshot(self) -> tuple[_Body, bytes]:
+        """Consistent copy of the body fields and the track JSON."""
+        buf = self._map
+        for _ in range(READ_RETRIES):
+            (seq,) = _SEQ.unpack_from(buf, _SEQ_OFFSET)
+            if seq & 1:
+                continue
+            body = _Body._make(_BODY.unpack_from(buf, _BODY_OFFSET))
+            track = buf[body.track_offset : body.track_offset + body.track_length]
+            if _SEQ.unpack_from(buf, _SEQ_OFFSET)[0] == seq:
+                return body, track
+        raise BlockingIOError("Status block is being rewritten")
+
+    def read(self, now: float | None = None) -> dict | None:
+        """``status``-shaped dict, or None once the daemon has gone."""
+        body, track = self.snapshot()
+        if body.pid == 0 or not _alive(body.pid):
+            return None
+        state = STATES[body.state]
+        position, duration = body.position, body.duration
+        if state == "playing":
+            now = time.monotonic() if now is None else now
+            position += (now - body.anchor) * body.rate
+            if duration:
+                position = min(position, duration)
+        return {
+            "state": state,
+            "track": json.loads(track) if track else None,
+            "position": position,
+            "duration": duration,
+            "volume": body.volume,
+            "shuffle": bool(body.shuffle),
+            "repeat": REPEATS[body.repeat],
+            "queue_length": body.queue_length,
+            "queue_position": body.queue_position,
+            "rate": body.rate,
+            "clock": {
+                "position": body.position,
+                "time": body.anchor,
+                "rate": body.rate,
+                "state": state,
+                "duration": duration,
+            },
+            "version": body.version,
+            "versions": {
+                "playback": body.playback_version,
+                "queue": body.queue_version,
+                "settings": body.settings_version,
+            },
+        }
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
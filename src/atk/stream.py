@@ -0,0 +1,260 @@
+"""Streaming raw PCM sources (FIFO or file) fed through a jitter buffer."""
+
+from __future__ import annotations
+
+import collections
+import os
+import stat
+import threading
+import time
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from numpy.typing import NDArray
+
+STREAM_SCHEMES = ("fifo", "pcm")
+PCM_FORMATS: dict[str, tuple[type, float]] = {
+    "s16le": (np.int16, 32768.0),
+    "s32le": (np.int32, 2147483648.0),
+    "f32le": (np.float32, 1.0),
+}
+READ_BLOCK_FRAMES = 1024
+BUFFER_MS = 2000  # default high-water mark of the jitter buffer
+
+
+def is_stream_uri(uri: str) -> bool:
+    """True for ``fifo:PATH`` / ``pcm:PATH`` stream URIs."""
+    scheme, sep, _ = uri.partition(":")
+    return bool(sep) and scheme in STREAM_SCHEMES
+
+
+def parse_stream_uri(uri: str) -> dict:
+    """Split ``fifo:/path?rate=22050&channels=1&format=s16le&prefill=100``.
+
+    ``buffer`` (ms) caps how far the jitter buffer may run ahead of playback.
+    """
+    parts = urlsplit(uri)
+    if parts.scheme not in STREAM_SCHEMES or not parts.path:
+        raise ValueError(f"Invalid stream URI: {uri}")
+    if parts.path == "-":
+        raise ValueError("pcm:- must be relayed by the client (atk play --stream)")
+    q = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+    fmt = q.get("format", "s16le")
+    if fmt not in PCM_FORMATS:
+        raise ValueError(f"Unsupported PCM format: {fmt}")
+    rate = int(q.get("rate", 44100))
+    channels = int(q.get("channels", 2))
+    buffer_ms = int(q.get("buffer", BUFFER_MS))
+    if rate <= 0 or channels <= 0 or buffer_ms <= 0:
+        raise ValueError(f"Invalid stream parameters: {uri}")
+    return {
+        "path": parts.path,
+        "rate": rate,
+        "channels": channels,
+        "format": fmt,
+        "prefill_ms": int(q.get("prefill", 100)),
+        "buffer_ms": buffer_ms,
+    }
+
+
+class StreamSource:
+    """Raw PCM read on a background thread into a jitter buffer.
+
+    Incoming audio is converted to float32 at the output rate/channel count
+    as it arrives, so the audio thread only pops ready frames. Playback
+    holds off until ``prefill_ms`` is buffered, and re-buffers after an
+    underrun instead of stuttering frame by frame. Once ``buffer_ms`` is
+    buffered the reader stops reading until playback catches up, so a fast
+    writer is held back by the pipe instead of filling memory.
+    """
+
+    def __init__(self, uri: str, sample_rate: int, channels: int):
+        spec = parse_stream_uri(uri)
+        self.uri = uri
+        self.path = spec["path"]
+        self.in_rate = spec["rate"]
+        self.in_channels = spec["channels"]
+        self.format = spec["format"]
+        self.out_rate = sample_rate
+        self.out_channels = channels
+        self.prefill_frames = spec["prefill_ms"] * sample_rate // 1000
+        self.max_frames = max(
+            spec["buffer_ms"] * sample_rate // 1000, self.prefill_frames
+        )
+
+        self._lock = threading.Lock()
+        self._space = threading.Condition(self._lock)
+        self._chunks: collections.deque[NDArray[np.float32]] = collections.deque()
+        self._offset = 0  # frames already consumed from _chunks[0]
+        self._buffered = 0
+        self._buffering = True
+        self._eof = False
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+        # Resampler carry-over between blocks
+        self._tail: NDArray[np.float32] | None = None
+        self._phase = 0.0
+
+        # Metrics
+        self.underruns = 0
+        self.frames_in = 0
+        self.frames_out = 0
+        self._opened_at = 0.0
+        self._first_data_at: float | None = None
+        self._first_out_at: float | None = None
+
+    def open(self) -> None:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Stream not found: {self.path}")
+        self._opened_at = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._reader, name="atk-stream", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._space.notify()
+
+    @property
+    def finished(self) -> bool:
+        """True once the writer has hung up and the buffer is drained."""
+        return self._eof and self._buffered == 0
+
+    def read(self, frames: int) -> NDArray[np.float32]:
+        """Pop up to ``frames`` interleaved frames; short on underrun or EOF."""
+        with self._lock:
+            if self._buffering:
+                if self._eof or self._buffered >= self.prefill_frames:
+                    self._buffering = False
+                else:
+                    return np.array([], dtype=np.float32)
+            take = min(frames, self._buffered)
+            if take < frames and not self._eof:
+                self.underruns += 1
+                self._buffering = True
+            out = self._pop(take)
+            if take:
+                self._space.notify()
+        if take and self._first_out_at is None:
+            self._first_out_at = time.monotonic()
+        self.frames_out += take
+        return out
+
+    def stats(self) -> dict:
+        """Jitter-buffer and latency metrics."""
+        startup = (
+            (self._first_out_at - self._opened_at) * 1000
+            if self._first_out_at is not None
+            else None
+        )
+        return {
+            "uri": self.uri,
+            "buffered_ms": round(self._buffered * 1000 / self.out_rate, 1),
+            "prefill_ms": round(self.prefill_frames * 1000 / self.out_rate, 1),
+            "max_buffered_ms": round(self.max_frames * 1000 / self.out_rate, 1),
+            "startup_latency_ms": round(startup, 1) if startup is not None else None,
+            "underruns": self.underruns,
+            "buffering": self._buffering and not self._eof,
+            "received": round(self.frames_in / self.out_rate, 3),
+            "played": round(self.frames_out / self.out_rate, 3),
+            "eof": self._eof,
+        }
+
+    # --- Internal ---
+
+    def _pop(self, frames: int) -> NDArray[np.float32]:
+        ch = self.out_channels
+        parts = []
+        need = frames
+        while need > 0:
+            head = self._chunks[0]
+            avail = len(head) // ch - self._offset
+            n = min(avail, need)
+            parts.append(head[self._offset * ch : (self._offset + n) * ch])
+            need -= n
+            if n == avail:
+                self._chunks.popleft()
+                self._offset = 0
+            else:
+                self._offset += n
+        self._buffered -= frames
+        if not parts:
+            return np.array([], dtype=np.float32)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _reader(self) -> None:
+        dtype, scale = PCM_FORMATS[self.format]
+        frame_bytes = np.dtype(dtype).itemsize * self.in_channels
+        block = READ_BLOCK_FRAMES * frame_bytes
+        is_fifo = stat.S_ISFIFO(os.stat(self.path).st_mode)
+        fd = os.open(self.path, os.O_RDONLY | (os.O_NONBLOCK if is_fifo else 0))
+        pending = b""
+        connected = False
+        try:
+            while self._wait_for_space():
+                try:
+                    data = os.read(fd, block)
+                except BlockingIOError:
+                    time.sleep(0.002)
+                    continue
+                if not data:
+                    if is_fifo and not connected:
+                        time.sleep(0.005)  # no writer yet
+                        continue
+                    break
+                connected = True
+                if self._first_data_at is None:
+                    self._first_data_at = time.monotonic()
+                pending += data
+                usable = len(pending) - len(pending) % frame_bytes
+                if usable:
+                    raw: NDArray[Any] = np.frombuffer(pending[:usable], dtype=dtype)
+                    pending = pending[usable:]
+                    self._push(raw.astype(np.float32) / scale)
+        finally:
+            os.close(fd)
+            with self._lock:
+                self._eof = True
+
+    def _wait_for_space(self) -> bool:
+        """Block while the buffer is at its high-water mark; False once closed."""
+        with self._space:
+            while self._buffered >= self.max_frames and not self._closed:
+                self._space.wait()
+            return not self._closed
+
+    def _push(self, samples: NDArray[np.float32]) -> None:
+        audio = samples.reshape(-1, self.in_channels)
+        if self.in_channels == 1 and self.out_channels > 1:
+            audio = np.repeat(audio, self.out_channels, axis=1)
+        elif self.in_channels > self.out_channels:
+            audio = audio[:, : self.out_channels]
+        audio = self._resample(audio)
+        if not len(audio):
+            return
+        with self._lock:
+            self._chunks.append(audio.astype(np.float32).ravel())
+            self._buffered += len(audio)
+        self.frames_in += len(audio)
+
+    def _resample(self, audio: NDArray[np.float32]) -> NDArray[np.float32]:
+        """Linear resample to the output rate, continuous across blocks."""
+        if self.in_rate == self.out_rate:
+            return audio
+        src = audio if self._tail is None else np.concatenate([self._tail, audio])
+        step = self.in_rate / self.out_rate
+        positions = np.arange(self._phase, len(src) - 1, step)
+        self._tail = src[-1:]
+        if not len(positions):
+            self._phase -= len(src) - 1
+            return np.empty((0, src.shape[1]), dtype=np.float32)
+        self._phase = positions[-1] + step - (len(src) - 1)
+        idx = np.arange(len(src))
+        out = np.empty((len(positions), src.shape[1]), dtype=np.float32)
+        for c in range(src.shape[1]):
+            out[:, c] = np.interp(positions, idx, src[:, c])
+        return out
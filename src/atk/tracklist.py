@@ -0,0 +1,548 @@
+"""Indexed play queue: O(log n) positional access for very large queues.
+
+``IndexedList`` is a counted B-tree of height two: values live in blocks
+of a few hundred, and a Fenwick tree over the block sizes turns a queue
+position into (block, offset) and back in O(log n). Each value maps to its
+block, so finding a value's position costs one short ``list.index`` in C
+plus the Fenwick prefix sum.
+
+``TrackQueue`` keeps every queued URI under a stable handle, with the play
+order as an ``IndexedList`` of handles and, while shuffle is on, a
+``LazyShuffle`` of the same handles. Removing or moving a track touches one
+entry in each order and never renumbers the rest.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from typing import Iterable, Iterator, overload
+
+from .stream import is_stream_uri
+
+BLOCK_SIZE = 512
+
+FLAG_STREAM = 1
+FLAG_UNPLAYABLE = 2
+
+
+class Track:
+    """Compact record for one queued URI, derived once at enqueue.
+
+    Artist names are interned, so a library of albums by a few artists
+    stores each name once. ``info()`` builds the protocol's track dict
+    without touching the path again.
+    """
+
+    __slots__ = ("uri", "artist", "title", "duration", "flags")
+
+    def __init__(self, uri: str):
+        self.uri = uri
+        self.duration = 0.0
+        if is_stream_uri(uri):
+            self.artist = None
+            self.title = uri.split("?", 1)[0]
+            self.flags = FLAG_STREAM
+            return
+        # Path(uri).stem without building a Path
+        name = uri.rsplit("/", 1)[-1]
+        dot = name.rfind(".")
+        if dot > 0:
+            name = name[:dot]
+        artist, sep, title = name.partition(" - ")
+        self.artist = sys.intern(artist) if sep else None
+        self.title = title if sep else name
+        self.flags = 0
+
+    def info(self) -> dict:
+        info: dict = {"uri": self.uri}
+        if self.artist is not None:
+            info["artist"] = self.artist
+        info["title"] = self.title
+        if self.flags & FLAG_STREAM:
+            info["stream"] = True
+        if self.flags & FLAG_UNPLAYABLE:
+            info["unplayable"] = True
+        if self.duration:
+            info["duration"] = self.duration
+        return info
+
+
+class IndexedList:
+    """Sequence of unique ints with O(log n) index, insert, pop and lookup."""
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._blocks: list[list[int]] = []
+        self._where: dict[int, list[int]] = {}  # value -> its block
+        self._block_no: dict[int, int] = {}  # id(block) -> block index
+        self._tree: list[int] = [0]  # Fenwick tree over block sizes, 1-based
+        self._len = 0
+        self.extend(values)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._where
+
+    def __iter__(self) -> Iterator[int]:
+        for block in self._blocks:
+            yield from block
+
+    def __getitem__(self, i: int) -> int:
+        b, k = self._locate(self._norm(i))
+        return self._blocks[b][k]
+
+    def index(self, value: int) -> int:
+        block = self._where.get(value)
+        if block is None:
+            raise ValueError(f"{value} is not in list")
+        return self._prefix(self._block_no[id(block)]) + block.index(value)
+
+    def iter_from(self, i: int) -> Iterator[int]:
+        """Values from position ``i`` to the end."""
+        if i >= self._len:
+            return
+        b, k = self._locate(i)
+        yield from self._blocks[b][k:]
+        for block in self._blocks[b + 1 :]:
+            yield from block
+
+    def insert(self, i: int, value: int) -> None:
+        if value in self._where:
+            raise ValueError(f"{value} is already in list")
+        i = max(0, min(i, self._len))
+        if not self._blocks:
+            self._blocks.append([])
+            self._rebuild()
+        if i == self._len:
+            b, k = len(self._blocks) - 1, len(self._blocks[-1])
+        else:
+            b, k = self._locate(i)
+        block = self._blocks[b]
+        block.insert(k, value)
+        self._where[value] = block
+        self._len += 1
+        if len(block) > 2 * BLOCK_SIZE:
+            half = block[BLOCK_SIZE:]
+            del block[BLOCK_SIZE:]
+            self._blocks.insert(b + 1, half)
+            for v in half:
+                self._where[v] = half
+            self._rebuild()
+        else:
+            self._add(b, 1)
+
+    def append(self, value: int) -> None:
+        self.insert(self._len, value)
+
+    def extend(self, values: Iterable[int]) -> None:
+        values = list(values)
+        where = self._where
+        if len(set(values)) != len(values) or any(v in where for v in values):
+            raise ValueError("values already in list")
+        i = 0
+        if self._blocks and len(self._blocks[-1]) < BLOCK_SIZE:
+            block = self._blocks[-1]
+            i = BLOCK_SIZE - len(block)
+            block.extend(values[:i])
+            where.update(dict.fromkeys(values[:i], block))
+        for j in range(i, len(values), BLOCK_SIZE):
+            block = values[j : j + BLOCK_SIZE]
+            self._blocks.append(block)
+            where.update(dict.fromkeys(block, block))
+        self._len += len(values)
+        self._rebuild()
+
+    def pop(self, i: int = -1) -> int:
+        b, k = self._locate(self._norm(i))
+        block = self._blocks[b]
+        value = block.pop(k)
+        del self._where[value]
+        self._len -= 1
+        if block:
+            self._add(b, -1)
+        else:
+            del self._blocks[b]
+            self._rebuild()
+        return value
+
+    def remove(self, value: int) -> None:
+        self.pop(self.index(value))
+
+    def clear(self) -> None:
+        self._blocks.clear()
+        self._where.clear()
+        self._len = 0
+        self._rebuild()
+
+    # --- Internal ---
+
+    def _norm(self, i: int) -> int:
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("list index out of range")
+        return i
+
+    def _rebuild(self) -> None:
+        n = len(self._blocks)
+        self._block_no = {id(b): j for j, b in enumerate(self._blocks)}
+        tree = [0] * (n + 1)
+        for j, block in enumerate(self._blocks, 1):
+            tree[j] += len(block)
+            parent = j + (j & -j)
+            if parent <= n:
+                tree[parent] += tree[j]
+        self._tree = tree
+
+    def _add(self, b: int, delta: int) -> None:
+        j = b + 1
+        while j < len(self._tree):
+            self._tree[j] += delta
+            j += j & -j
+
+    def _prefix(self, b: int) -> int:
+        """Number of values in blocks before block ``b``."""
+        total, j = 0, b
+        while j:
+            total += self._tree[j]
+            j -= j & -j
+        return total
+
+    def _locate(self, i: int) -> tuple[int, int]:
+        """(block, offset) of position ``i``; 0 <= i < len."""
+        pos, step = 0, 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= i:
+                pos = nxt
+                i -= self._tree[nxt]
+            step >>= 1
+        return pos, i
+
+
+class LazyShuffle:
+    """Shuffle order drawn on demand by incremental Fisher–Yates.
+
+    Only the part of the permutation that has been visited is stored
+    (``_drawn``). The rest is a virtual array of the undrawn handles: the
+    slots ``0 .. size-1`` hold their own number unless a swap moved
+    something else there, and only the swaps are recorded. Each draw picks
+    a random slot and fills it with the last one, which costs O(1).
+    Creating the shuffle is O(number of removed handles), not O(n).
+    Handles can be added to or taken out of the undrawn pool in O(1). The
+    same seed always gives the same order. ``drawn`` starts the order with
+    handles already visited (a restored shuffle).
+    """
+
+    def __init__(
+        self,
+        end: int = 0,
+        holes: Iterable[int] = (),
+        seed: int | None = None,
+        drawn: Iterable[int] = (),
+    ):
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self._rng = random.Random(self.seed)
+        self._drawn = IndexedList()
+        self._size = end  # undrawn slots; handles 0 .. end-1 to start with
+        self._at: dict[int, int] = {}  # slot -> handle, where not identity
+        self._slot: dict[int, int] = {}  # handle -> slot, where not identity
+        for h in sorted(holes, reverse=True):
+            if h < end:
+                self._take(self._slot.get(h, h))
+        for h in drawn:
+            if self._in_pool(h):
+                self._take(self._slot.get(h, h))
+                self._drawn.append(h)
+
+    def __len__(self) -> int:
+        return len(self._drawn) + self._size
+
+    def __contains__(self, h: int) -> bool:
+        return h in self._drawn or self._in_pool(h)
+
+    def __getitem__(self, k: int) -> int:
+        """Handle at shuffle position ``k``, drawing up to it if needed."""
+        if k < 0:
+            k += len(self)
+        while len(self._drawn) <= k and self._size:
+            self._drawn.append(self._take(self._rng.randrange(self._size)))
+        return self._drawn[k]
+
+    def index(self, h: int) -> int:
+        """Shuffle position of ``h``. An undrawn handle is drawn now and goes
+        next, so jumping to a track continues the shuffle from there."""
+        if h in self._drawn:
+            return self._drawn.index(h)
+        if not self._in_pool(h):
+            raise ValueError(f"{h} is not in shuffle order")
+        self._take(self._slot.get(h, h))
+        self._drawn.append(h)
+        return len(self._drawn) - 1
+
+    @property
+    def drawn(self) -> Iterator[int]:
+        """Handles drawn so far, in shuffle order."""
+        return iter(self._drawn)
+
+    def iter_from(self, k: int) -> Iterator[int]:
+        while k < len(self):
+            yield self[k]
+            k += 1
+
+    def add(self, h: int) -> None:
+        """Put a new handle among the undrawn ones (a random later slot)."""
+        s = self._size
+        self._size += 1
+        if h != s:
+            self._at[s] = h
+            self._slot[h] = s
+
+    def insert(self, k: int, h: int) -> None:
+        """Place ``h`` at an explicit position in the drawn order."""
+        self._drawn.insert(k, h)
+
+    def discard(self, h: int) -> None:
+        if h in self._drawn:
+            self._drawn.remove(h)
+        elif self._in_pool(h):
+            self._take(self._slot.get(h, h))
+
+    def reshuffled(self, end: int, holes: Iterable[int]) -> LazyShuffle:
+        """A fresh permutation whose seed follows from this one's."""
+        return LazyShuffle(end, holes, self._rng.randrange(1 << 32))
+
+    def renumbered(self, new: dict[int, int]) -> LazyShuffle:
+        """This shuffle with every handle ``h`` renamed to ``new[h]``.
+
+        The drawn order is kept; the undrawn pool holds the same handles and
+        goes on drawing from this shuffle's generator.
+        """
+        pool = {new[self._at.get(s, s)] for s in range(self._size)}
+        holes = (h for h in range(len(new)) if h not in pool)
+        out = LazyShuffle(len(new), holes, self.seed)
+        out._rng = self._rng
+        out._drawn = IndexedList(new[h] for h in self._drawn)
+        return out
+
+    # --- Internal ---
+
+    def _in_pool(self, h: int) -> bool:
+        s = self._slot.get(h, h)
+        return s < self._size and self._at.get(s, s) == h
+
+    def _take(self, s: int) -> int:
+        """Remove and return the handle in slot ``s`` (swap with the last)."""
+        h = self._at.pop(s, s)
+        self._slot.pop(h, None)
+        last = self._size - 1
+        self._size = last
+        if s != last:
+            moved = self._at.pop(last, last)
+            if moved == s:
+                self._slot.pop(moved, None)
+            else:
+                self._at[s] = moved
+                self._slot[moved] = s
+        return h
+
+
+class TrackQueue:
+    """The play queue: tracks in play order plus an optional shuffle order.
+
+    Behaves like a ``list[str]`` of URIs for reading and the usual
+    mutations; ``track(i)``/``tracks()`` give the ``Track`` records, and
+    shuffle helpers speak in play-order indices.
+
+    Tracks are kept under integer handles, allocated in order. Handles of
+    removed tracks are remembered until they outnumber the queued ones
+    (and ``COMPACT_MIN``); then the live handles are renumbered densely.
+    """
+
+    COMPACT_MIN = 1024
+
+    def __init__(self, uris: Iterable[str] = ()):
+        self._tracks: dict[int, Track] = {}
+        self._next = 0
+        self._order = IndexedList()
+        self._shuffled: LazyShuffle | None = None
+        self._removed: set[int] = set()  # handles below _next no longer queued
+        self.extend(uris)
+
+    # --- list interface ---
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self) -> Iterator[str]:
+        tracks = self._tracks
+        return (tracks[h].uri for h in self._order)
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+    @overload
+    def __getitem__(self, i: slice) -> list[str]: ...
+    def __getitem__(self, i: int | slice) -> str | list[str]:
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(start, stop, step)]
+            it = self._order.iter_from(start)
+            return [self._tracks[next(it)].uri for _ in range(max(0, stop - start))]
+        return self._tracks[self._order[i]].uri
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (TrackQueue, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TrackQueue({len(self)} tracks)"
+
+    def track(self, i: int) -> Track:
+        return self._tracks[self._order[i]]
+
+    def tracks(self, start: int = 0) -> Iterator[Track]:
+        tracks = self._tracks
+        return (tracks[h] for h in self._order.iter_from(start))
+
+    def append(self, uri: str) -> None:
+        self._order.append(self._new(uri))
+
+    def extend(self, items: Iterable[str | Track]) -> None:
+        """Append URIs, or ``Track`` records already built (e.g. off the loop)."""
+        tracks = [t if isinstance(t, Track) else Track(t) for t in items]
+        handles = range(self._next, self._next + len(tracks))
+        self._next += len(tracks)
+        self._tracks.update(zip(handles, tracks))
+        self._order.extend(handles)
+
+    def insert(self, i: int, uri: str) -> None:
+        self._order.insert(i, self._new(uri))
+
+    def pop(self, i: int = -1) -> str:
+        h = self._order.pop(i)
+        if self._shuffled is not None:
+            self._shuffled.discard(h)
+        self._removed.add(h)
+        uri = self._tracks.pop(h).uri
+        if len(self._removed) > max(self.COMPACT_MIN, len(self._tracks)):
+            self._compact()
+        return uri
+
+    def move(self, src: int, dst: int) -> None:
+        """Move the track at ``src`` to ``dst``; shuffle order is unaffected."""
+        self._order.insert(dst, self._order.pop(src))
+
+    def clear(self) -> None:
+        self._tracks.clear()
+        self._order.clear()
+        self._removed.clear()
+        self._next = 0
+        if self._shuffled is not None:
+            self._shuffled = self._shuffled.reshuffled(0, ())
+
+    # --- shuffle order ---
+
+    def shuffle_on(
+        self,
+        first: int | None = None,
+        seed: int | None = None,
+        drawn: Iterable[int] = (),
+    ) -> int:
+        """Shuffle every track, with play index ``first`` (if any) up front.
+
+        Nothing is materialized: the order is drawn as it is played.
+        Returns the seed, which reproduces the same order for the same queue.
+        ``drawn`` (play indices, as from ``shuffle_drawn``) restores the
+        visited part of an earlier shuffle; the rest is drawn afresh.
+        """
+        n = len(self)
+        handles = [self._order[i] for i in drawn if 0 <= i < n]
+        self._shuffled = LazyShuffle(self._next, self._removed, seed, handles)
+        if first is not None and 0 <= first < len(self):
+            self._shuffled.index(self._order[first])
+        return self._shuffled.seed
+
+    def shuffle_off(self) -> None:
+        self._shuffled = None
+
+    @property
+    def shuffle_seed(self) -> int | None:
+        return self._shuffled.seed if self._shuffled is not None else None
+
+    def reshuffle(self) -> None:
+        if self._shuffled is not None:
+            self._shuffled = self._shuffled.reshuffled(self._next, self._removed)
+
+    def shuffle_len(self) -> int:
+        return len(self._shuffled) if self._shuffled is not None else 0
+
+    def shuffle_index(self, i: int) -> int:
+        """Position of play index ``i`` in the shuffle order (ValueError if absent)."""
+        if self._shuffled is None or not 0 <= i < len(self):
+            raise ValueError(f"{i} is not in shuffle order")
+        return self._shuffled.index(self._order[i])
+
+    def shuffled(self, k: int) -> int:
+        """Play index of the ``k``-th track in shuffle order."""
+        if self._shuffled is None:
+            raise IndexError("shuffle is off")
+        return self._order.index(self._shuffled[k])
+
+    def shuffled_from(self, k: int) -> Iterator[int]:
+        """Play indices in shuffle order starting at shuffle position ``k``."""
+        if self._shuffled is not None:
+            for h in self._shuffled.iter_from(k):
+                yield self._order.index(h)
+
+    def shuffle_add(self, indices: Iterable[int]) -> None:
+        """Add play indices to the not-yet-played part of the shuffle."""
+        if self._shuffled is None:
+            self._shuffled = LazyShuffle()
+        for i in indices:
+            self._shuffled.add(self._order[i])
+
+    def shuffle_insert(self, k: int, i: int) -> None:
+        """Place play index ``i`` at shuffle position ``k``."""
+        if self._shuffled is None:
+            self._shuffled = LazyShuffle()
+        self._shuffled.insert(k, self._order[i])
+
+    def shuffle_drawn(self) -> list[int]:
+        """Play indices of the shuffle order drawn so far (nothing is drawn)."""
+        if self._shuffled is None:
+            return []
+        return [self._order.index(h) for h in self._shuffled.drawn]
+
+    def shuffle_indices(self) -> list[int]:
+        """The whole shuffle order as play indices (draws all of it)."""
+        return list(self.shuffled_from(0))
+
+    def set_shuffle_order(self, indices: Iterable[int]) -> None:
+        """Replace the shuffle order; indices outside the queue are ignored."""
+        n = len(self)
+        self._shuffled = LazyShuffle()
+        for k, i in enumerate(i for i in indices if 0 <= i < n):
+            self._shuffled.insert(k, self._order[i])
+
+    # --- Internal ---
+
+    def _compact(self) -> None:
+        """Renumber live handles 0..n-1, keeping their order; drops tombstones."""
+        # _tracks is in handle order: handles are allocated increasing
+        new = {h: i for i, h in enumerate(self._tracks)}
+        self._tracks = {new[h]: t for h, t in self._tracks.items()}
+        self._order = IndexedList(new[h] for h in self._order)
+        if self._shuffled is not None:
+            self._shuffled = self._shuffled.renumbered(new)
+        self._removed = set()
+        self._next = len(new)
+
+    def _new(self, uri: str) -> int:
+        h = self._next
+        self._next += 1
+        self._tracks[h] = Track(uri)
+        return h
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import threading
+import time
 from pathlib import Path
 
 from textual.app import App, ComposeResult
@@ -11,6 +13,7 @@ from textual.binding import Binding
 from textual.containers import Container, Vertical
 from textual.widgets import DirectoryTree, Static
 
+from ..cli import PlaybackClock
 from ..config import get_runtime_dir
 from .widgets import (
     HelpBar,
@@ -22,6 +25,8 @@ from .widgets import (
 
 _logger = logging.getLogger("atk.tui")
 
+PROGRESS_INTERVAL = 0.1  # seconds between locally extrapolated redraws
+
 
 class FilePicker(Static):
     """Simple file picker widget."""
@@ -102,10 +107,12 @@ class ATKApp(App):
     def __init__(self):
         super().__init__()
         self._runtime_dir = get_runtime_dir()
-        self._event_task: asyncio.Task | None = None
-        self._status_task: asyncio.Task | None = None
+        self._event_thread: threading.Thread | None = None
         self._retry_count = 0
         self._max_retries = 5
+        self._queue_version: int | None = None
+        self._queue_fetching = False
+        self._clock = PlaybackClock()
 
     def compose(self) -> ComposeResult:
         yield StatusBar(id="status-bar")
@@ -128,17 +135,12 @@ class ATKApp(App):
             return
 
         await self._fetch_status()
-        self._event_task = asyncio.create_task(self._listen_events())
-        self._status_task = asyncio.create_task(self._periodic_status())
-
-    async def on_unmount(self) -> None:
-        for task in (self._event_task, self._status_task):
-            if task:
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
+        # The subscription blocks, so it is read on its own thread
+        self._event_thread = threading.Thread(
+            target=self._listen_events, name="atk-tui-events", daemon=True
+        )
+        self._event_thread.start()
+        self.set_interval(PROGRESS_INTERVAL, self._tick)
 
     async def _fetch_status(self) -> None:
         try:
@@ -147,11 +149,31 @@ class ATKApp(App):
             resp = await asyncio.to_thread(send_command, "status")
             if resp.get("ok") and resp.get("data"):
                 self._update_from_status(resp["data"])
-            qresp = await asyncio.to_thread(send_command, "queue")
-            if qresp.get("ok") and qresp.get("data"):
-                self._update_queue(qresp["data"])
         except Exception as e:
             _logger.warning("Failed to fetch status: %s", e)
+        await self._fetch_queue()
+
+    async def _fetch_queue(self) -> None:
+        """Fetch just the window the preview shows, if the queue moved."""
+        if self._queue_fetching:
+            return
+        self._queue_fetching = True
+        try:
+            from ..cli import send_command
+
+            args = {
+                "if_version": self._queue_version,
+                "around_current": 0,
+                "limit": QueuePreview.ROWS,
+                "fields": ["uri", "artist", "title"],
+            }
+            resp = await asyncio.to_thread(send_command, "queue", args)
+            if resp.get("ok") and not resp.get("data", {}).get("unchanged"):
+                self._show_queue(resp["data"])
+        except Exception as e:
+            _logger.warning("Failed to fetch queue: %s", e)
+        finally:
+            self._queue_fetching = False
 
     def _update_from_status(self, data: dict) -> None:
         try:
@@ -174,30 +196,42 @@ class ATKApp(App):
                 np_.artist = ""
                 np_.album = ""
 
-            prog = self.query_one("#progress", ProgressDisplay)
-            prog.position = data.get("position", 0.0)
-            prog.duration = data.get("duration", 0.0)
+            if "clock" in data:
+                self._clock.sync(data["clock"])
+            self._tick()
         except Exception as e:
             _logger.warning("Error updating status: %s", e)
 
-    def _update_queue(self, data: dict) -> None:
+    def _tick(self) -> None:
+        """Redraw progress from the local clock; no daemon round trip."""
+        prog = self.query_one("#progress", ProgressDisplay)
+        prog.position = self._clock.position()
+        prog.duration = self._clock.duration
+
+    def _show_queue(self, data: dict) -> None:
+        self._queue_version = data.get("version")
         try:
             qp = self.query_one("#queue-preview", QueuePreview)
-            qp.update_queue(data.get("tracks", []), data.get("current_index", 0))
+            qp.update_queue(
+                data.get("tracks", []),
+                data.get("current_index", 0),
+                data.get("offset", 0),
+                data.get("total"),
+            )
         except Exception as e:
             _logger.warning("Error updating queue: %s", e)
 
-    async def _listen_events(self) -> None:
+    def _listen_events(self) -> None:
         from ..cli import subscribe_to_events
 
-        while self._retry_count < self._max_retries:
+        while self._retry_count < self._max_retries and self.is_running:
             try:
                 for evt in subscribe_to_events():
-                    self._handle_event(evt)
+                    self.call_from_thread(self._handle_event, evt)
                     self._retry_count = 0
-            except asyncio.CancelledError:
-                break
             except Exception as e:
+                if not self.is_running:
+                    break
                 self._retry_count += 1
                 _logger.warning(
                     "Event loop error (retry %d/%d): %s",
@@ -206,9 +240,11 @@ class ATKApp(App):
                     e,
                 )
                 if self._retry_count >= self._max_retries:
-                    self.notify("Lost connection to daemon", severity="warning")
+                    self.call_from_thread(
+                        self.notify, "Lost connection to daemon", severity="warning"
+                    )
                     break
-                await asyncio.sleep(min(2**self._retry_count, 10))
+                time.sleep(min(2**self._retry_count, 10))
 
     def _handle_event(self, evt: dict) -> None:
         try:
@@ -225,9 +261,9 @@ class ATKApp(App):
                 np_.album = track.get("album", "")
 
             elif etype == "position_update":
-                prog = self.query_one("#progress", ProgressDisplay)
-                prog.position = data.get("position", 0.0)
-                prog.duration = data.get("duration", 0.0)
+                self._clock.sync(data)
+                self.query_one("#status-bar", StatusBar).state = self._clock.state
+                self._tick()
 
             elif etype == "playback_started":
                 self.query_one("#status-bar", StatusBar).state = "playing"
@@ -238,8 +274,12 @@ class ATKApp(App):
             elif etype == "playback_stopped":
                 self.query_one("#status-bar", StatusBar).state = "stopped"
 
+            elif etype == "volume_changed":
+                self.query_one("#status-bar", StatusBar).volume = data.get("volume", 80)
+
             elif etype == "queue_updated":
-                self._update_queue(data.get("queue", {}))
+                if data.get("version") != self._queue_version:
+                    asyncio.create_task(self._fetch_queue())
 
             elif etype == "error":
                 self.notify(
@@ -248,16 +288,6 @@ class ATKApp(App):
         except Exception as e:
             _logger.warning("Error handling event: %s", e)
 
-    async def _periodic_status(self) -> None:
-        while True:
-            await asyncio.sleep(5)
-            try:
-                await self._fetch_status()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                _logger.warning("Periodic status error: %s", e)
-
     def _send_command(self, cmd: str, args: dict | None = None) -> None:
         async def do_send():
             try:
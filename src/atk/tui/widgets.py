@@ -123,6 +123,8 @@ class ProgressDisplay(Static):
 class QueuePreview(Static):
     """Widget displaying upcoming tracks in queue."""
 
+    ROWS = 5
+
     DEFAULT_CSS = """
     QueuePreview {
         height: auto;
@@ -150,17 +152,29 @@ class QueuePreview(Static):
         yield Static("Up Next:", classes="header")
         yield Vertical(id="queue-list")
 
-    def update_queue(self, tracks: list[dict], current_index: int) -> None:
-        """Update the queue display."""
+    def update_queue(
+        self,
+        tracks: list[dict],
+        current_index: int,
+        offset: int = 0,
+        total: int | None = None,
+    ) -> None:
+        """Update the queue display.
+
+        ``tracks`` is a window of the queue starting at index ``offset``;
+        ``total`` is the queue length (the window's end when omitted).
+        """
         queue_list = self.query_one("#queue-list", Vertical)
         queue_list.remove_children()
+        if total is None:
+            total = offset + len(tracks)
 
-        # Show up to 5 upcoming tracks
-        start = current_index
-        end = min(start + 5, len(tracks))
+        # Show up to ROWS upcoming tracks
+        start = max(current_index, offset)
+        end = min(start + self.ROWS, offset + len(tracks))
 
         for i in range(start, end):
-            track = tracks[i]
+            track = tracks[i - offset]
             prefix = "▶ " if i == current_index else "  "
 
             # Format track name
@@ -171,8 +185,8 @@ class QueuePreview(Static):
             classes = "queue-item current" if i == current_index else "queue-item"
             queue_list.mount(Static(f"{prefix}{i + 1}. {text}", classes=classes))
 
-        if len(tracks) > end:
-            remaining = len(tracks) - end
+        if total > end:
+            remaining = total - end
             queue_list.mount(
                 Static(f"  ... and {remaining} more", classes="queue-item")
             )
@@ -224,7 +238,8 @@ class StatusBar(Static):
             yield Static(id="indicators", classes="indicators")
 
     def watch_state(self, value: str) -> None:
-        icon = {"playing": "▶", "paused": "⏸", "stopped": "⏹"}.get(value, "?")
+        icons = {"loading": "…", "playing": "▶", "paused": "⏸", "stopped": "⏹"}
+        icon = icons.get(value, "?")
         self.query_one("#state-icon", Static).update(icon)
 
     def watch_session_name(self, value: str) -> None:
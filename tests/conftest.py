@@ -115,6 +115,26 @@ def sample_queue(sample_audio_file: Path) -> list[str]:
     return [str(sample_audio_file)] * 3
 
 
+@pytest.fixture
+async def served(mock_miniaudio, tmp_path):
+    """A daemon serving only its socket (no FIFO threads)."""
+    from atk.daemon import Daemon
+
+    daemon = Daemon(tmp_path / "rt", event_window=0)
+    daemon.runtime_dir.mkdir()
+    daemon._running = True
+    server = await asyncio.start_unix_server(
+        daemon._handle_client, path=str(daemon.sock_path)
+    )
+    yield daemon
+    daemon._running = False
+    server.close()
+    for client in list(daemon._clients):
+        client.task.cancel()
+        client.close()
+    await server.wait_closed()
+
+
 @pytest.fixture
 def event_loop():
     """Create event loop for async tests."""
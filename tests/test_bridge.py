@@ -0,0 +1,77 @@
+"""Tests for the audio-thread event bridge."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from atk.bridge import AudioEvents
+
+ACTIONS = ("pause", "seek", "gain")
+
+
+@pytest.fixture
+def bridge():
+    b = AudioEvents(ACTIONS, slots=4)
+    yield b
+    b.close()
+
+
+def attach(bridge, loop):
+    got: list = []
+    bridge.attach(
+        loop,
+        lambda: got.append(("end",)),
+        lambda a, v: got.append(("action", a, v)),
+        lambda n: got.append(("underrun", n)),
+    )
+    return got
+
+
+class TestAudioEvents:
+    @pytest.mark.asyncio
+    async def test_delivers_on_loop_thread(self, bridge):
+        threads = []
+        bridge.attach(
+            asyncio.get_running_loop(),
+            lambda: threads.append(threading.get_ident()),
+            lambda a, v: None,
+            lambda n: None,
+        )
+        producer = threading.Thread(target=bridge.track_end)
+        producer.start()
+        producer.join()
+        for _ in range(50):
+            if threads:
+                break
+            await asyncio.sleep(0.01)
+        assert threads == [threading.get_ident()]
+
+    @pytest.mark.asyncio
+    async def test_burst_drains_in_order(self, bridge):
+        got = attach(bridge, asyncio.get_running_loop())
+        bridge.action("seek", 44100.0)
+        bridge.action("pause", None)
+        bridge.underrun()
+        bridge.underrun()
+        bridge.track_end()
+        bridge.drain()
+        assert got == [
+            ("action", "seek", 44100.0),
+            ("action", "pause", None),
+            ("underrun", 2),
+            ("end",),
+        ]
+        bridge.drain()
+        assert len(got) == 4
+
+    @pytest.mark.asyncio
+    async def test_overflow_keeps_newest(self, bridge):
+        got = attach(bridge, asyncio.get_running_loop())
+        for level in range(6):
+            bridge.action("gain", float(level))
+        bridge.drain()
+        assert [v for _, _, v in got] == [2.0, 3.0, 4.0, 5.0]
+        assert bridge.lost == 2
@@ -9,11 +9,13 @@ import pytest
 from click.testing import CliRunner
 
 from atk.cli import (
+    PlaybackClock,
     cli,
     fmt_devices,
     fmt_event,
     fmt_playlists,
     fmt_queue,
+    fmt_schedule,
     fmt_status,
     fmt_time,
     fmt_track,
@@ -122,6 +124,21 @@ class TestFormatters:
         assert "Track 2" in result
         assert "\u25b6" in result
 
+    def test_schedule_empty(self):
+        assert fmt_schedule({"scheduled": []}) == "(no scheduled actions)"
+
+    def test_schedule_with_cues(self):
+        result = fmt_schedule(
+            {
+                "scheduled": [
+                    {"at": 90, "action": "loop", "value": 60},
+                    {"at": 120, "action": "gain", "value": 40},
+                ]
+            }
+        )
+        assert "1:30  loop 1:00" in result
+        assert "gain 40" in result
+
     def test_playlists_empty(self):
         assert fmt_playlists({"playlists": []}) == "(no saved playlists)"
 
@@ -187,6 +204,20 @@ class TestFormatters:
         assert "boom" in result
 
 
+class TestPlaybackClock:
+    def test_extrapolates_while_playing(self):
+        clock = PlaybackClock()
+        sample = {"position": 10.0, "time": 100.0, "rate": 1.5, "duration": 60.0}
+        clock.sync({**sample, "state": "playing"})
+        assert clock.position(now=102.0) == pytest.approx(13.0)
+        assert clock.position(now=200.0) == 60.0  # clamped to the track
+        clock.sync({**sample, "state": "paused"})
+        assert clock.position(now=150.0) == 10.0
+
+    def test_starts_stopped(self):
+        assert PlaybackClock().position() == 0.0
+
+
 class TestParseSeek:
     def test_absolute_seconds(self):
         assert parse_seek("30") == 30.0
@@ -211,7 +242,9 @@ class TestParseSeek:
 class TestCLICommands:
     @pytest.fixture
     def runner(self):
-        return CliRunner()
+        # No shared status block: status goes through send_command
+        with patch("atk.cli.read_status", return_value=None):
+            yield CliRunner()
 
     def _ok(self, data=None):
         return {"id": "1", "ok": True, "data": data or {}}
@@ -236,6 +269,31 @@ class TestCLICommands:
             args = mock.call_args[0]
             assert args[0] == "play"
 
+    def test_play_stream(self, runner, tmp_path):
+        fifo = tmp_path / "tts.fifo"
+        with patch(
+            "atk.cli.send_command", return_value=self._ok({"state": "playing"})
+        ) as mock:
+            result = runner.invoke(
+                cli,
+                ["play", "--stream", f"fifo:{fifo}", "--sample-rate", "22050"],
+            )
+            assert result.exit_code == 0
+            uri = mock.call_args[0][1]["file"]
+            assert uri.startswith(f"fifo:{fifo}?")
+            assert "rate=22050" in uri
+
+    def test_play_stream_stdin_refused(self, runner, tmp_path):
+        with (
+            patch("atk.cli.ensure_daemon"),
+            patch("atk.cli.get_runtime_dir", return_value=tmp_path),
+            patch("atk.cli.send_command", return_value=self._err("No device")),
+        ):
+            result = runner.invoke(cli, ["--json", "play", "--stream", "pcm:-"])
+        assert result.exit_code == 1
+        assert json.loads(result.output)["ok"] is False
+        assert not list(tmp_path.iterdir())  # relay FIFO removed
+
     def test_pause(self, runner):
         with patch("atk.cli.send_command", return_value=self._ok({"state": "paused"})):
             result = runner.invoke(cli, ["pause"])
@@ -284,11 +342,54 @@ class TestCLICommands:
             assert result.exit_code == 0
             mock.assert_called_once_with("volume", {"level": 50})
 
+    def test_schedule(self, runner):
+        with patch(
+            "atk.cli.send_command", return_value=self._ok({"scheduled": []})
+        ) as mock:
+            result = runner.invoke(cli, ["schedule", "1:30", "loop", "1:00"])
+            assert result.exit_code == 0
+            mock.assert_called_once_with(
+                "schedule", {"action": "loop", "at": 90.0, "value": 60.0}
+            )
+
+    def test_schedule_bad_gain(self, runner):
+        with patch("atk.cli.send_command") as mock:
+            result = runner.invoke(cli, ["schedule", "+10", "gain", "loud"])
+            assert result.exit_code == 2
+            assert "Invalid gain: loud" in result.output
+            mock.assert_not_called()
+
+    def test_schedule_clear(self, runner):
+        with patch(
+            "atk.cli.send_command", return_value=self._ok({"scheduled": []})
+        ) as mock:
+            result = runner.invoke(cli, ["schedule", "--clear"])
+            assert result.exit_code == 0
+            mock.assert_called_once_with("schedule", {"action": "clear"})
+
     def test_add(self, runner):
         with patch("atk.cli.send_command", return_value=self._ok({"queue_length": 1})):
             result = runner.invoke(cli, ["add", "/path/to/file.mp3"])
             assert result.exit_code == 0
 
+    def test_add_directory(self, runner, tmp_path):
+        data = {"added": 2, "queue_length": 2, "skipped_count": 0}
+        with patch("atk.cli.send_command", return_value=self._ok(data)) as mock:
+            result = runner.invoke(
+                cli, ["add", "-r", "--glob", "*.flac", str(tmp_path), "x.mp3"]
+            )
+            assert result.exit_code == 0
+            assert "Added 2 tracks" in result.output
+            mock.assert_called_once_with(
+                "add",
+                {
+                    "paths": [str(tmp_path.resolve()), "x.mp3"],
+                    "recursive": True,
+                    "sort": "path",
+                    "glob": "*.flac",
+                },
+            )
+
     def test_remove(self, runner):
         with patch(
             "atk.cli.send_command", return_value=self._ok({"removed": "track"})
@@ -303,12 +404,60 @@ class TestCLICommands:
             assert result.exit_code == 0
 
     def test_queue(self, runner):
+        frames = [
+            {"id": "1", "seq": 0, "more": True, "ok": True, "data": {"tracks": []}},
+            {"id": "1", "seq": 1, "more": False},
+        ]
+        with patch("atk.cli.stream_command", return_value=iter(frames)):
+            result = runner.invoke(cli, ["queue"])
+            assert result.exit_code == 0
+            assert "(empty queue)" in result.output
+
+    def test_queue_streamed_in_chunks(self, runner):
+        head = {"current_index": 2, "version": 4, "tracks": [{"uri": "a.mp3"}]}
+        frames = [
+            {"id": "1", "seq": 0, "more": True, "ok": True, "data": head},
+            {"id": "1", "seq": 1, "more": True, "data": {"tracks": [{"uri": "b.mp3"}]}},
+            {"id": "1", "seq": 2, "more": True, "data": {"tracks": [{"uri": "c.mp3"}]}},
+            {"id": "1", "seq": 3, "more": False},
+        ]
+        with patch("atk.cli.stream_command", return_value=iter(frames)):
+            result = runner.invoke(cli, ["queue"])
+            assert result.exit_code == 0
+            assert "  2. b.mp3" in result.output
+            assert "▶ 3. c.mp3" in result.output
+
+    def test_queue_json_is_one_reply(self, runner):
         with patch(
             "atk.cli.send_command",
             return_value=self._ok({"tracks": [], "current_index": 0}),
-        ):
-            result = runner.invoke(cli, ["queue"])
+        ) as mock:
+            result = runner.invoke(cli, ["--json", "queue"])
+            assert result.exit_code == 0
+            mock.assert_called_once_with("queue")
+
+    def test_queue_page(self, runner):
+        pages = [
+            self._ok({"tracks": [{"uri": "a.mp3"}, {"uri": "b.mp3"}], "offset": 0}),
+            self._ok({"tracks": [{"uri": "c.mp3"}], "offset": 2}),
+        ]
+        for page in pages:
+            page["data"].update(total=3, current_index=2, version=1)
+        with patch("atk.cli.send_command", side_effect=pages) as mock:
+            result = runner.invoke(cli, ["queue", "--page", "--page-size", "2"])
+            assert result.exit_code == 0
+            assert "▶ 3. c.mp3" in result.output
+            assert [c.args[1]["offset"] for c in mock.call_args_list] == [0, 2]
+
+    def test_info_indices(self, runner):
+        with patch(
+            "atk.cli.send_command",
+            return_value=self._ok({"tracks": [{"uri": "a.mp3"}, {"uri": "b.mp3"}]}),
+        ) as mock:
+            result = runner.invoke(cli, ["info", "0", "1"])
             assert result.exit_code == 0
+            mock.assert_called_once_with("info", {"index": [0, 1]})
+            assert "uri: b.mp3" in result.output
 
     def test_jump(self, runner):
         with patch(
@@ -335,6 +484,36 @@ class TestCLICommands:
             result = runner.invoke(cli, ["status"])
             assert result.exit_code == 0
 
+    def test_status_from_block(self, runner):
+        data = {"state": "paused", "track": {"title": "Song"}, "volume": 30}
+        with (
+            patch("atk.cli.read_status", return_value=data),
+            patch("atk.cli.send_command") as mock,
+        ):
+            result = runner.invoke(cli, ["status"])
+        assert "Song" in result.output and "30%" in result.output
+        mock.assert_not_called()
+
+    def test_status_json_asks_daemon(self, runner):
+        data = {"state": "paused", "levels": [0.1, 0.2], "version": 3}
+        with (
+            patch("atk.cli.read_status", return_value={"state": "paused"}),
+            patch("atk.cli.send_command", return_value=self._ok(data)) as mock,
+        ):
+            result = runner.invoke(cli, ["--json", "status"])
+        mock.assert_called_once_with("status")
+        assert json.loads(result.output)["data"]["levels"] == [0.1, 0.2]
+
+    def test_wait(self, runner):
+        status = self._ok({"versions": {"playback": 4, "queue": 2, "settings": 1}})
+        changed = self._ok({"changed": False, "versions": {}})
+        with patch("atk.cli.send_command", side_effect=[status, changed]) as mock:
+            result = runner.invoke(cli, ["wait", "--on", "queue", "--timeout", "2"])
+        assert result.exit_code == 1  # timed out
+        mock.assert_called_with(
+            "wait", {"since": {"queue": 2}, "timeout": 2.0}, timeout=7.0
+        )
+
     def test_shuffle_on(self, runner):
         with patch(
             "atk.cli.send_command", return_value=self._ok({"shuffle": True})
@@ -415,6 +594,54 @@ class TestCLICommands:
             assert result.exit_code == 0
             mock.assert_called_once_with("load", {"name": "myplaylist"})
 
+    def test_warm(self, runner):
+        with patch(
+            "atk.cli.send_command", return_value=self._ok({"warming": 20})
+        ) as mock:
+            result = runner.invoke(cli, ["warm", "-n", "20"])
+            assert result.exit_code == 0
+            mock.assert_called_once_with("warm", {"count": 20})
+
+    def test_warm_playlist(self, runner):
+        with patch(
+            "atk.cli.send_command", return_value=self._ok({"warming": 200})
+        ) as mock:
+            result = runner.invoke(cli, ["warm", "favorites"])
+            assert result.exit_code == 0
+            mock.assert_called_once_with("warm", {"playlist": "favorites"})
+
+    def test_batch_from_stdin(self, runner):
+        lines = (
+            '{"cmd": "clear"}\n\n# comment\n{"cmd": "add", "args": {"uri": "a.mp3"}}\n'
+        )
+        results = {"results": [{"ok": True, "data": {}}] * 2}
+        with patch("atk.cli.send_command", return_value=self._ok(results)) as mock:
+            result = runner.invoke(cli, ["batch"], input=lines)
+            assert result.exit_code == 0
+            mock.assert_called_once_with(
+                "batch",
+                {
+                    "commands": [
+                        {"cmd": "clear", "args": {}},
+                        {"cmd": "add", "args": {"uri": "a.mp3"}},
+                    ],
+                    "stop_on_error": False,
+                },
+            )
+
+    def test_batch_failure_exit_code(self, runner):
+        results = {"results": [{"ok": False, "error": {"message": "nope"}}]}
+        with patch("atk.cli.send_command", return_value=self._ok(results)):
+            result = runner.invoke(cli, ["batch"], input='{"cmd": "next"}\n')
+            assert result.exit_code == 1
+            assert "nope" in result.output
+
+    def test_batch_bad_line(self, runner):
+        with patch("atk.cli.send_command") as mock:
+            result = runner.invoke(cli, ["batch"], input="not json\n")
+            assert result.exit_code != 0
+            mock.assert_not_called()
+
     def test_playlists(self, runner):
         with patch("atk.cli.send_command", return_value=self._ok({"playlists": []})):
             result = runner.invoke(cli, ["playlists"])
@@ -0,0 +1,117 @@
+"""Tests for the socket framings and the pure-Python MessagePack codec."""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+
+import pytest
+
+from atk.codec import FRAME_HEADER, JSON_LINES, MSGPACK, packb, unpackb
+
+VALUES = [
+    None,
+    True,
+    False,
+    0,
+    127,
+    128,
+    255,
+    256,
+    65536,
+    2**32,
+    2**64 - 1,
+    -1,
+    -32,
+    -33,
+    -129,
+    -32769,
+    -(2**31) - 1,
+    -(2**63),
+    0.25,
+    -1e300,
+    "",
+    "a" * 31,
+    "a" * 32,
+    "é" * 200,
+    "x" * 70000,
+    b"\x00" * 300,
+    [],
+    [1] * 15,
+    [1] * 16,
+    list(range(70000)),
+    {},
+    {str(i): i for i in range(15)},
+    {str(i): i for i in range(16)},
+    {"event": "queue_updated", "data": {"tracks": [{"uri": "/m/a.mp3"}]}},
+]
+
+
+class Level(enum.IntEnum):
+    HIGH = 3
+
+
+class TestMessagePack:
+    @pytest.mark.parametrize("value", VALUES, ids=lambda v: repr(v)[:20])
+    def test_round_trip(self, value):
+        assert unpackb(packb(value)) == value
+
+    @pytest.mark.parametrize("value", VALUES, ids=lambda v: repr(v)[:20])
+    def test_same_bytes_as_compiled(self, value):
+        msgpack = pytest.importorskip("msgpack")
+        assert packb(value) == msgpack.packb(value)
+        assert msgpack.unpackb(packb(value), strict_map_key=False) == value
+
+    def test_tuples_and_subclasses(self):
+        assert unpackb(packb((1, "a"))) == [1, "a"]
+        assert unpackb(packb({"level": Level.HIGH})) == {"level": 3}
+
+    def test_unsupported_types(self):
+        with pytest.raises(TypeError):
+            packb({1, 2})
+        with pytest.raises(OverflowError):
+            packb(2**64)
+
+    @pytest.mark.parametrize(
+        "data",
+        [b"", b"\x92\x01", b"\xd9\x05ab", b"\xc1", b"\x01\x02", b"\x81\x91\x01\x02"],
+    )
+    def test_malformed(self, data):
+        with pytest.raises(ValueError):
+            unpackb(data)
+
+
+class TestFramings:
+    @pytest.mark.parametrize("framing", [JSON_LINES, MSGPACK], ids=lambda f: f.name)
+    def test_split_waits_for_whole_messages(self, framing):
+        msgs = [{"id": "a", "ok": True}, {"event": "x", "data": {"n": 1}}]
+        wire = b"".join(framing.encode(m) for m in msgs)
+        buf = bytearray()
+        out = []
+        for i in range(len(wire)):  # one byte at a time
+            buf.append(wire[i])
+            while (payload := framing.split(buf)) is not None:
+                out.append(framing.decode(payload))
+        assert out == msgs
+        assert not buf
+
+    def test_frame_header(self):
+        wire = MSGPACK.encode({"id": "a"})
+        (size,) = FRAME_HEADER.unpack_from(wire)
+        assert size == len(wire) - FRAME_HEADER.size
+        assert MSGPACK.decode(wire[FRAME_HEADER.size :]) == {"id": "a"}
+
+    @pytest.mark.asyncio
+    async def test_read_from_stream(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(MSGPACK.encode({"id": "a"}) + MSGPACK.encode([1])[:3])
+        reader.feed_eof()
+        assert MSGPACK.decode(await MSGPACK.read(reader, 1 << 20)) == {"id": "a"}
+        assert await MSGPACK.read(reader, 1 << 20) is None  # cut short: hangup
+
+    @pytest.mark.asyncio
+    async def test_oversized_frame_refused(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(FRAME_HEADER.pack(1 << 30))
+        with pytest.raises(ValueError):
+            await MSGPACK.read(reader, 1 << 20)
@@ -2,15 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
 import pytest
 
-from atk.daemon import Daemon
+from atk.daemon import EVENT_BACKLOG, Daemon
 
 
 @pytest.fixture
 def daemon(mock_miniaudio, tmp_path):
-    """Create a Daemon instance for testing."""
-    return Daemon(tmp_path / "runtime")
+    """Create a Daemon instance for testing (events sent immediately)."""
+    return Daemon(tmp_path / "runtime", event_window=0)
 
 
 class TestDaemonBasic:
@@ -33,6 +39,47 @@ class TestDaemonQueue:
         assert result["queue_length"] == 1
         assert len(daemon.queue) == 1
 
+    @pytest.mark.asyncio
+    async def test_add_paths_recursive(self, daemon, tmp_path):
+        for rel in ("lib/b.mp3", "lib/a/1.flac", "lib/a/notes.txt"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_bytes(b"")
+        events = []
+
+        async def emit(event, data=None):
+            events.append(event)
+
+        daemon._emit = emit
+        daemon._has_subscribers = True
+        result = await daemon._cmd_add(
+            {
+                "paths": [str(tmp_path / "lib"), str(tmp_path / "gone.mp3")],
+                "recursive": True,
+            }
+        )
+        assert result["added"] == 2
+        assert result["skipped_count"] == 1
+        assert daemon.queue == [
+            str(tmp_path / "lib/a/1.flac"),
+            str(tmp_path / "lib/b.mp3"),
+        ]
+        assert events == ["queue_updated"]
+
+    @pytest.mark.asyncio
+    async def test_add_paths_rejects_non_list(self, daemon):
+        resp = await daemon._execute({"cmd": "add", "args": {"paths": "/music"}})
+        assert resp["error"]["code"] == "INVALID_ARGS"
+
+    def test_shuffle_add_keeps_upcoming_order(self, daemon):
+        daemon.queue = [f"{i}.mp3" for i in range(10)]
+        daemon.shuffle_order = [3, 0, 2, 1]
+        daemon.queue_pos = 0
+        daemon.queue.shuffle_add(range(4, 10))
+        order = daemon.shuffle_order
+        assert order[:2] == [3, 0]
+        assert sorted(order) == list(range(10))
+        assert [i for i in order[2:] if i < 4] == [2, 1]
+
     @pytest.mark.asyncio
     async def test_remove(self, daemon, sample_audio_file):
         await daemon._cmd_add({"uri": str(sample_audio_file)})
@@ -70,12 +117,44 @@ class TestDaemonQueue:
         assert "current_index" in result
         assert len(result["tracks"]) == 1
 
+    @pytest.mark.asyncio
+    async def test_queue_page(self, daemon):
+        daemon.queue = [f"/m/{i}.mp3" for i in range(10)]
+        result = await daemon._cmd_queue({"offset": 8, "limit": 5})
+        assert [t["uri"] for t in result["tracks"]] == ["/m/8.mp3", "/m/9.mp3"]
+        assert result["offset"] == 8
+        assert result["total"] == 10
+
+    @pytest.mark.asyncio
+    async def test_queue_around_current(self, daemon):
+        daemon.queue = [f"/m/{i}.mp3" for i in range(10)]
+        daemon.queue_pos = 4
+        result = await daemon._cmd_queue(
+            {"around_current": 1, "limit": 3, "fields": ["uri"]}
+        )
+        assert result["offset"] == 3
+        assert result["tracks"] == [{"uri": f"/m/{i}.mp3"} for i in (3, 4, 5)]
+
+    @pytest.mark.asyncio
+    async def test_queue_page_rejects_negative(self, daemon):
+        resp = await daemon._execute({"cmd": "queue", "args": {"offset": -1}})
+        assert resp["error"]["code"] == "INVALID_ARGS"
+
+    @pytest.mark.asyncio
+    async def test_info_indices(self, daemon):
+        daemon.queue = [f"/m/{i}.mp3" for i in range(3)]
+        result = await daemon._cmd_info({"index": [2, 0], "fields": ["uri"]})
+        assert result == {"tracks": [{"uri": "/m/2.mp3"}, {"uri": "/m/0.mp3"}]}
+        with pytest.raises(IndexError):
+            await daemon._cmd_info({"index": [0, 3]})
+
 
 class TestDaemonPlayback:
     @pytest.mark.asyncio
     async def test_play_file(self, daemon, sample_audio_file):
         result = await daemon._cmd_play({"file": str(sample_audio_file)})
-        assert result["state"] == "playing"
+        assert result["state"] == "loading"
+        await daemon._load_task
         assert daemon.state == "playing"
         assert len(daemon.queue) == 1
 
@@ -89,6 +168,7 @@ class TestDaemonPlayback:
     @pytest.mark.asyncio
     async def test_resume(self, daemon, sample_audio_file):
         await daemon._cmd_play({"file": str(sample_audio_file)})
+        await daemon._load_task
         await daemon._cmd_pause({})
         result = await daemon._cmd_play({})
         assert result["state"] == "playing"
@@ -108,6 +188,7 @@ class TestDaemonPlayback:
     @pytest.mark.asyncio
     async def test_seek_relative_forward(self, daemon, sample_audio_file):
         await daemon._cmd_play({"file": str(sample_audio_file)})
+        await daemon._load_task
         daemon.player.seek(20.0)
         result = await daemon._cmd_seek({"pos": "+10"})
         assert result["position"] == pytest.approx(30.0, abs=1.0)
@@ -115,11 +196,120 @@ class TestDaemonPlayback:
     @pytest.mark.asyncio
     async def test_seek_relative_backward(self, daemon, sample_audio_file):
         await daemon._cmd_play({"file": str(sample_audio_file)})
+        await daemon._load_task
         daemon.player.seek(30.0)
         result = await daemon._cmd_seek({"pos": "-10"})
         assert result["position"] == pytest.approx(20.0, abs=1.0)
 
 
+class TestDaemonLoading:
+    @pytest.fixture
+    def slow_decode(self, daemon, tmp_path):
+        files = []
+        for i in range(6):
+            f = tmp_path / f"{i}.mp3"
+            f.write_bytes(b"\0" * 64)
+            files.append(str(f))
+        daemon.queue = files
+        decoded, attached = [], []
+        prepare, load = daemon.player.prepare, daemon.player.load
+
+        def slow_prepare(uri):
+            decoded.append(uri)
+            time.sleep(0.05)
+            return prepare(uri)
+
+        def record_load(uri, samples=None):
+            attached.append(uri)
+            load(uri, samples)
+
+        daemon.player.prepare = slow_prepare
+        daemon.player.load = record_load
+        return files, decoded, attached
+
+    @pytest.mark.asyncio
+    async def test_skip_storm_keeps_commands_fast(self, daemon, slow_decode):
+        files, decoded, attached = slow_decode
+        latencies = []
+        for i in range(5):
+            await daemon._execute({"id": f"n{i}", "cmd": "next"})
+            for cmd, args in (("pause", {}), ("volume", {"level": 50 + i})):
+                t0 = time.perf_counter()
+                resp = await daemon._execute({"id": "x", "cmd": cmd, "args": args})
+                latencies.append(time.perf_counter() - t0)
+                assert resp["ok"]
+            status = await daemon._execute({"id": "s", "cmd": "status"})
+            assert status["data"]["state"] in ("loading", "paused")
+            await daemon._execute({"id": "p", "cmd": "play"})
+            await asyncio.sleep(0.005)
+        assert daemon.state == "loading"
+        await daemon._load_task
+        assert daemon.state == "playing"
+        # Superseded loads are skipped; only the newest track is attached
+        assert len(decoded) < 5
+        assert decoded[-1] == files[5]
+        assert attached == [files[5]]
+        assert max(latencies) < 0.02
+
+    @pytest.mark.asyncio
+    async def test_pause_while_loading(self, daemon, slow_decode):
+        files, _, attached = slow_decode
+        await daemon._cmd_jump({"index": 2})
+        assert (await daemon._cmd_pause({}))["state"] == "paused"
+        await daemon._load_task
+        assert attached == [files[2]]
+        assert daemon.state == "paused"
+        assert not daemon.player.is_playing()
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_load(self, daemon, slow_decode):
+        _, _, attached = slow_decode
+        await daemon._cmd_jump({"index": 2})
+        await daemon._cmd_stop({})
+        await daemon._load_task
+        assert attached == []
+        assert daemon.state == "stopped"
+
+    @pytest.mark.asyncio
+    async def test_seek_and_cues_while_loading(self, daemon, slow_decode):
+        await daemon._cmd_jump({"index": 2})
+        assert (await daemon._cmd_seek({"pos": 30}))["position"] == 30
+        resp = await daemon._cmd_schedule({"action": "pause", "at": 40})
+        assert [c["at"] for c in resp["scheduled"]] == [40]
+        await daemon._load_task
+        assert daemon.state == "playing"
+        assert daemon.player.get_position() == pytest.approx(30.0)
+        assert [c["action"] for c in daemon._schedule_data()] == ["pause"]
+
+    @pytest.mark.asyncio
+    async def test_pending_seek_dropped_by_next_track(self, daemon, slow_decode):
+        await daemon._cmd_jump({"index": 2})
+        await daemon._cmd_seek({"pos": 30})
+        await daemon._cmd_jump({"index": 3})
+        await daemon._load_task
+        assert daemon.player.get_position() == 0.0
+
+    @pytest.mark.asyncio
+    async def test_unplayable_queue_stops_after_one_pass(self, daemon, tmp_path):
+        daemon.queue = [str(tmp_path / f"missing{i}.mp3") for i in range(3)]
+        daemon.repeat = "queue"
+        errors = []
+
+        async def emit(event, data=None):
+            if event == "error":
+                errors.append(data["message"])
+
+        daemon._emit = emit
+        await daemon._play_current()
+        for _ in range(10):
+            await daemon._load_task
+            if daemon.state == "stopped":
+                break
+        assert daemon.state == "stopped"
+        assert len(errors) == 4
+        assert errors[-1] == "No playable track in the queue"
+
+
 class TestDaemonVolume:
     @pytest.mark.asyncio
     async def test_set_volume(self, daemon):
@@ -176,8 +366,8 @@ class TestDaemonRepeat:
 
     @pytest.mark.asyncio
     async def test_invalid_mode(self, daemon):
-        with pytest.raises(ValueError):
-            await daemon._cmd_repeat({"mode": "bogus"})
+        resp = await daemon._execute({"cmd": "repeat", "args": {"mode": "bogus"}})
+        assert resp["error"]["code"] == "INVALID_ARGS"
 
 
 class TestDaemonRate:
@@ -198,10 +388,42 @@ class TestDaemonRate:
         assert result["rate"] == 0.25
 
 
+class TestNullArguments:
+    """``null`` means the argument was left out, as the protocol documents."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "cmd, args, attr, value",
+        [
+            ("repeat", {"mode": None}, "repeat", "none"),
+            ("shuffle", {"enabled": None}, "shuffle", False),
+            ("volume", {"level": None}, "volume", 80),
+            ("rate", {"speed": None, "mode": None}, "rate", 1.0),
+        ],
+    )
+    async def test_defaults_apply(self, daemon, cmd, args, attr, value):
+        resp = await daemon._dispatch(json.dumps({"cmd": cmd, "args": args}))
+        assert resp["ok"], resp
+        assert getattr(daemon, attr) == value
+
+    @pytest.mark.asyncio
+    async def test_wait_timeout(self, daemon):
+        line = {"cmd": "wait", "args": {"since": {"queue": -1}, "timeout": None}}
+        resp = await daemon._dispatch(json.dumps(line))
+        assert resp["ok"], resp
+
+    @pytest.mark.asyncio
+    async def test_save_format(self, daemon, temp_data_dir):
+        line = {"cmd": "save", "args": {"name": "mix", "format": None}}
+        resp = await daemon._dispatch(json.dumps(line))
+        assert resp["data"]["saved"].endswith("mix.json")
+
+
 class TestDaemonStatus:
     @pytest.mark.asyncio
     async def test_status_playing(self, daemon, sample_audio_file):
         await daemon._cmd_play({"file": str(sample_audio_file)})
+        await daemon._load_task
         await daemon._cmd_volume({"level": 75})
         result = await daemon._cmd_status({})
         assert result["state"] == "playing"
@@ -225,6 +447,11 @@ class TestDaemonStatus:
         result = await daemon._cmd_status({})
         assert result["rate"] == 1.5
 
+    @pytest.mark.asyncio
+    async def test_status_fields(self, daemon):
+        result = await daemon._cmd_status({"fields": ["state", "volume"]})
+        assert result == {"state": "stopped", "volume": 80}
+
 
 class TestDaemonJump:
     @pytest.mark.asyncio
@@ -294,6 +521,256 @@ class TestDaemonDispatch:
         assert daemon._has_subscribers is True
 
 
+def _apply_deltas(snapshot: dict, deltas: list[dict]) -> list[dict]:
+    """Tracks after applying ``queue_updated`` deltas to a ``queue`` reply."""
+    tracks, version = list(snapshot["tracks"]), snapshot["version"]
+    for delta in deltas:
+        if delta["op"] != "clear":
+            assert delta.get("base", delta["version"] - 1) == version, delta
+        if delta["op"] == "insert":
+            tracks[delta["index"] : delta["index"]] = delta["tracks"]
+        elif delta["op"] == "remove":
+            del tracks[delta["index"]]
+        elif delta["op"] == "move":
+            tracks.insert(delta["to"], tracks.pop(delta["from"]))
+        elif delta["op"] == "clear":
+            tracks.clear()
+        version = delta["version"]
+    return tracks
+
+
+class TestDaemonQueueDeltas:
+    @pytest.fixture
+    def deltas(self, daemon):
+        sent = []
+
+        async def emit(event, data=None):
+            if event == "queue_updated":
+                sent.append(data)
+
+        daemon._emit = emit
+        daemon._has_subscribers = True
+        return sent
+
+    @pytest.mark.asyncio
+    async def test_deltas_rebuild_snapshot(self, daemon, deltas, tmp_path):
+        before = await daemon._cmd_queue({})
+        for name in ("a", "b", "c", "d"):
+            (tmp_path / f"{name}.mp3").write_bytes(b"")
+        await daemon._cmd_add({"uri": str(tmp_path / "a.mp3")})
+        await daemon._cmd_add({"paths": [str(tmp_path)]})
+        await daemon._cmd_move({"from": 0, "to": 3})
+        daemon.queue_pos = 2
+        await daemon._cmd_remove({"index": 1})
+        snapshot = await daemon._cmd_queue({})
+        assert snapshot["version"] == len(deltas) == 4
+        assert _apply_deltas(before, deltas) == snapshot["tracks"]
+        assert deltas[-1]["current_index"] == snapshot["current_index"] == 1
+
+    @pytest.mark.asyncio
+    async def test_current_changed_on_track_change(self, daemon, deltas):
+        daemon.queue = ["a.mp3", "b.mp3"]
+        daemon.player.load = MagicMock()
+        daemon.player.play = MagicMock()
+        daemon.player.get_duration = MagicMock(return_value=1.0)
+        await daemon._cmd_jump({"index": 1})
+        await daemon._cmd_jump({"index": 1})
+        assert deltas == [{"op": "current_changed", "version": 1, "current_index": 1}]
+
+    @pytest.mark.asyncio
+    async def test_clear(self, daemon, deltas):
+        daemon.queue = ["a.mp3"]
+        await daemon._cmd_clear({})
+        assert deltas == [{"op": "clear", "version": 1, "current_index": 0}]
+
+    @pytest.mark.asyncio
+    async def test_no_deltas_without_subscribers(self, daemon, deltas):
+        daemon._has_subscribers = False
+        await daemon._cmd_add({"uri": "a.mp3"})
+        await daemon._cmd_clear({})
+        assert deltas == []
+        assert daemon.queue_version == 2
+
+
+class TestEventCoalescing:
+    @pytest.fixture
+    def coalescing(self, mock_miniaudio, tmp_path):
+        daemon = Daemon(tmp_path / "runtime", event_window=0.01)
+        daemon._has_subscribers = True
+        return daemon
+
+    @staticmethod
+    async def _sent(daemon) -> list[tuple[str, dict]]:
+        await asyncio.sleep(0.03)
+        sent = []
+        while not daemon._resp_queue.empty():
+            msg = json.loads(daemon._resp_queue.get_nowait())
+            sent.append((msg["event"], msg["data"]))
+        return sent
+
+    @pytest.mark.asyncio
+    async def test_latest_wins(self, coalescing):
+        for level in range(10, 60, 10):
+            await coalescing._cmd_volume({"level": level})
+        await coalescing._emit("error", {"message": "a"})
+        await coalescing._emit("playback_started")
+        await coalescing._emit("playback_paused", {"position": 1.0})
+        assert await self._sent(coalescing) == [
+            ("volume_changed", {"volume": 50}),
+            ("error", {"message": "a"}),
+            ("playback_paused", {"position": 1.0}),
+        ]
+        stats = await coalescing._cmd_stats({})
+        assert stats["events"] == {"published": 3, "coalesced": 5, "dropped": 0}
+
+    @pytest.mark.asyncio
+    async def test_queue_deltas_merge(self, coalescing):
+        before = await coalescing._cmd_queue({})
+        await coalescing._cmd_add({"uri": "old.mp3"})
+        await coalescing._cmd_clear({})
+        for i in range(5):
+            await coalescing._cmd_add({"uri": f"{i}.mp3"})
+        await coalescing._cmd_move({"from": 4, "to": 0})
+        sent = await self._sent(coalescing)
+        assert [d["op"] for _, d in sent] == ["clear", "insert", "move"]
+        after = await coalescing._cmd_queue({})
+        assert _apply_deltas(before, [d for _, d in sent]) == after["tracks"]
+
+    @pytest.mark.asyncio
+    async def test_responses_never_dropped(self, coalescing):
+        for _ in range(EVENT_BACKLOG * 2):
+            coalescing._publish("position_update", {"position": 0.0})
+        await coalescing._handle_fifo_line(json.dumps({"id": "r", "cmd": "ping"}))
+        lines = []
+        while not coalescing._resp_queue.empty():
+            lines.append(json.loads(coalescing._resp_queue.get_nowait()))
+        assert len(lines) == EVENT_BACKLOG + 1
+        assert lines[-1]["id"] == "r"
+        assert coalescing._events_dropped == EVENT_BACKLOG
+
+
+class TestCommandLanes:
+    def test_play_lane_depends_on_state(self, daemon):
+        assert daemon._resources("pause", {}) == ()
+        assert daemon._resources("play", {}) == ("queue",)  # starts the queue
+        assert daemon._resources("play", {"file": "a.mp3"}) == ("queue",)
+        daemon.state = "paused"
+        assert daemon._resources("play", {}) == ()
+        assert daemon._resources("load", {"name": "x"}) == ("playlists", "queue")
+
+    @pytest.mark.asyncio
+    async def test_same_resource_keeps_arrival_order(self, daemon):
+        order = []
+
+        async def slow(args):
+            await asyncio.sleep(0.02)
+            order.append("save")
+            return {}
+
+        async def quick(args):
+            order.append("remove")
+            return {}
+
+        daemon._cmd_save, daemon._cmd_remove = slow, quick
+        await asyncio.gather(
+            daemon._execute({"id": "1", "cmd": "save", "args": {"name": "x"}}),
+            daemon._execute({"id": "2", "cmd": "remove", "args": {"index": 0}}),
+            daemon._execute({"id": "3", "cmd": "volume", "args": {"level": 1}}),
+        )
+        assert order == ["save", "remove"]
+
+
+class TestDaemonBatch:
+    @pytest.mark.asyncio
+    async def test_batch_runs_in_order(self, daemon, sample_audio_file):
+        commands = [
+            {"cmd": "clear"},
+            *({"cmd": "add", "args": {"uri": str(sample_audio_file)}},) * 3,
+            {"cmd": "repeat", "args": {"mode": "queue"}},
+            {"cmd": "bogus"},
+            {"cmd": "queue"},
+        ]
+        resp = await daemon._execute(
+            {"id": "b", "cmd": "batch", "args": {"commands": commands}}
+        )
+        assert resp["id"] == "b" and resp["ok"]
+        results = resp["data"]["results"]
+        assert [r["ok"] for r in results] == [True] * 5 + [False, True]
+        assert len(results[-1]["data"]["tracks"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_stop_on_error(self, daemon):
+        commands = [{"cmd": "jump", "args": {"index": 5}}, {"cmd": "ping"}]
+        resp = await daemon._execute(
+            {
+                "id": "b",
+                "cmd": "batch",
+                "args": {"commands": commands, "stop_on_error": True},
+            }
+        )
+        assert [r["ok"] for r in resp["data"]["results"]] == [False]
+
+    @pytest.mark.asyncio
+    async def test_batch_sends_one_delta_per_mutation(self, daemon, sample_audio_file):
+        daemon._has_subscribers = True
+        commands = [{"cmd": "add", "args": {"uri": str(sample_audio_file)}}] * 4
+        await daemon._execute(
+            {"id": "b", "cmd": "batch", "args": {"commands": commands}}
+        )
+        deltas = []
+        while not daemon._resp_queue.empty():
+            deltas.append(json.loads(daemon._resp_queue.get_nowait())["data"])
+        assert [(d["op"], d["index"], d["version"]) for d in deltas] == [
+            ("insert", i, i + 1) for i in range(4)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_batch_excludes_other_commands(self, daemon):
+        order = []
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow(args):
+            order.append("slow-start")
+            started.set()
+            await release.wait()
+            order.append("slow-end")
+            return {}
+
+        async def ping(args):
+            order.append("ping")
+            return {"pong": True}
+
+        daemon._cmd_ping = ping
+        daemon._cmd_status = slow
+        batch = asyncio.create_task(
+            daemon._execute(
+                {
+                    "id": "b",
+                    "cmd": "batch",
+                    "args": {"commands": [{"cmd": "status"}]},
+                }
+            )
+        )
+        await started.wait()
+        other = asyncio.create_task(daemon._execute({"id": "p", "cmd": "ping"}))
+        await asyncio.sleep(0.01)
+        assert order == ["slow-start"]
+        release.set()
+        await asyncio.gather(batch, other)
+        assert order == ["slow-start", "slow-end", "ping"]
+
+    @pytest.mark.asyncio
+    async def test_batch_rejects_bad_input(self, daemon):
+        for args in (
+            {},
+            {"commands": [{"args": {}}]},
+            {"commands": [{"cmd": "batch"}]},
+        ):
+            resp = await daemon._execute({"id": "b", "cmd": "batch", "args": args})
+            assert resp["ok"] is False
+
+
 class TestDaemonPlaylists:
     @pytest.mark.asyncio
     async def test_save_and_load(self, daemon, sample_audio_file, temp_data_dir):
@@ -338,3 +815,317 @@ class TestDaemonDevices:
     async def test_set_device_default(self, daemon):
         result = await daemon._cmd_set_device({"device_id": None})
         assert result["device_id"] is None
+
+
+class TestDaemonSchedule:
+    @pytest.mark.asyncio
+    async def test_schedule_pause(self, daemon, sample_audio_file):
+        await daemon._cmd_play({"file": str(sample_audio_file)})
+        result = await daemon._cmd_schedule({"action": "pause", "at": 1.0})
+        assert result["scheduled"][0]["frame"] == 44100
+        assert result["scheduled"][0]["action"] == "pause"
+
+    @pytest.mark.asyncio
+    async def test_schedule_list_and_clear(self, daemon, sample_audio_file):
+        await daemon._cmd_play({"file": str(sample_audio_file)})
+        await daemon._cmd_schedule({"action": "gain", "at": 2.0, "value": 40})
+        await daemon._cmd_schedule({"action": "stop", "at": 1.0})
+        listed = await daemon._cmd_schedule({})
+        assert [c["action"] for c in listed["scheduled"]] == ["stop", "gain"]
+        cleared = await daemon._cmd_schedule({"action": "clear"})
+        assert cleared["scheduled"] == []
+
+    @pytest.mark.asyncio
+    async def test_schedule_invalid(self, daemon):
+        resp = await daemon._execute(
+            {"cmd": "schedule", "args": {"action": "explode", "at": 1.0}}
+        )
+        assert resp["error"]["code"] == "INVALID_ARGS"
+        with pytest.raises(ValueError):
+            await daemon._cmd_schedule({"action": "loop", "at": 1.0, "value": 2.0})
+
+    def test_pause_fires_on_exact_frame(self, mock_player, sample_audio_file):
+        mock_player.load(str(sample_audio_file))
+        mock_player.play()
+        mock_player.schedule(1000, "pause")
+        chunk = mock_player._read_scheduled(4096)
+        assert len(chunk) == 1000 * 2
+        assert mock_player.get_position() * 44100 == 1000
+        assert not mock_player.is_playing()
+
+    def test_loop_rearms(self, mock_player, sample_audio_file):
+        mock_player.load(str(sample_audio_file))
+        mock_player.play()
+        mock_player.schedule(300, "loop", 100)
+        mock_player._read_scheduled(500)
+        # 300 frames, jump back to 100, 200 more frames
+        assert mock_player._position == 300
+        mock_player._read_scheduled(1)
+        assert mock_player._position == 101
+        assert len(mock_player.get_schedule()) == 1
+
+    def test_seeked_past_cue_dropped(self, mock_player, sample_audio_file):
+        mock_player.load(str(sample_audio_file))
+        mock_player.play()
+        mock_player.schedule(100, "stop")
+        mock_player.seek(1.0)
+        mock_player._read_scheduled(10)
+        assert mock_player.is_playing()
+        assert mock_player.get_schedule() == []
+
+
+class TestDaemonVersions:
+    @pytest.mark.asyncio
+    async def test_wait_returns_when_watched_version_moves(self, daemon):
+        versions = (await daemon._cmd_status({}))["versions"]
+        waiter = asyncio.ensure_future(
+            daemon._execute({"cmd": "wait", "args": {"since": versions}})
+        )
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await daemon._execute({"cmd": "volume", "args": {"level": 10}})
+        resp = await asyncio.wait_for(waiter, 1)
+        assert resp["data"]["changed"] is True
+        assert resp["data"]["versions"]["settings"] == versions["settings"] + 1
+
+    @pytest.mark.asyncio
+    async def test_wait_ignores_unwatched_kinds(self, daemon):
+        since = {"queue": daemon.queue_version}
+        waiter = asyncio.ensure_future(
+            daemon._cmd_wait({"since": since, "timeout": 0.05})
+        )
+        await daemon._cmd_volume({"level": 10})
+        assert (await waiter)["changed"] is False
+        await daemon._cmd_add({"uri": "a.mp3"})
+        assert (await daemon._cmd_wait({"since": since}))["changed"] is True
+
+    @pytest.mark.asyncio
+    async def test_wait_does_not_hold_off_batch(self, daemon):
+        waiter = asyncio.ensure_future(
+            daemon._execute({"cmd": "wait", "args": {"timeout": 5}})
+        )
+        await asyncio.sleep(0.01)
+        commands = [{"cmd": "repeat", "args": {"mode": "queue"}}]
+        resp = await asyncio.wait_for(
+            daemon._execute({"cmd": "batch", "args": {"commands": commands}}), 1
+        )
+        assert resp["data"]["results"][0]["ok"]
+        assert (await asyncio.wait_for(waiter, 1))["data"]["changed"] is True
+        nested = [{"cmd": "wait", "args": {}}]
+        resp = await daemon._execute({"cmd": "batch", "args": {"commands": nested}})
+        assert not resp["ok"]
+
+    @pytest.mark.asyncio
+    async def test_stop_releases_waiters(self, daemon):
+        waiter = asyncio.ensure_future(daemon._cmd_wait({"timeout": 30}))
+        await asyncio.sleep(0.01)
+        await daemon.stop()
+        assert (await asyncio.wait_for(waiter, 1))["changed"] is False
+
+    @pytest.mark.asyncio
+    async def test_if_version_unchanged(self, daemon):
+        await daemon._cmd_add({"uri": "a.mp3"})
+        queue = await daemon._cmd_queue({})
+        assert await daemon._cmd_queue({"if_version": queue["version"]}) == {
+            "unchanged": True,
+            "version": queue["version"],
+        }
+        status = await daemon._cmd_status({})
+        assert (await daemon._cmd_status({"if_version": status["version"]}))[
+            "unchanged"
+        ]
+        await daemon._cmd_repeat({"mode": "track"})
+        assert "state" in await daemon._cmd_status({"if_version": status["version"]})
+
+
+class TestDaemonClock:
+    @pytest.mark.asyncio
+    async def test_samples_only_on_discontinuities(self, daemon, sample_audio_file):
+        samples = []
+
+        async def emit(event, data=None):
+            if event == "position_update":
+                samples.append(data)
+
+        daemon._emit = emit
+        daemon._has_subscribers = True
+        await daemon._execute({"cmd": "play", "args": {"file": str(sample_audio_file)}})
+        await daemon._load_task
+        assert [s["state"] for s in samples] == ["loading", "playing"]
+
+        # Playback that follows the last sample publishes nothing
+        t0, offset = time.monotonic(), [0.0]
+        daemon.player.get_position = lambda: offset[0] + time.monotonic() - t0
+        daemon._clock_ref = daemon._clock()
+        await daemon._execute({"cmd": "volume", "args": {"level": 50}})
+        await daemon._sync_clock()
+        assert len(samples) == 2
+
+        offset[0] += 5.0  # drifted or jumped
+        await daemon._sync_clock()
+        await daemon._execute({"cmd": "pause"})
+        assert [s["state"] for s in samples[2:]] == ["playing", "paused"]
+        assert samples[-1]["time"] <= time.monotonic()
+
+    @pytest.mark.asyncio
+    async def test_status_carries_clock(self, daemon):
+        status = await daemon._cmd_status({})
+        assert status["clock"]["state"] == "stopped"
+        assert set(status["clock"]) == {"position", "time", "rate", "state", "duration"}
+
+
+class TestDaemonStatusBlock:
+    @pytest.mark.asyncio
+    async def test_commands_update_block(self, daemon, sample_audio_file):
+        from atk.statusblock import StatusBlock, StatusReader
+
+        daemon.runtime_dir.mkdir(exist_ok=True)
+        daemon._status_block = StatusBlock(daemon.status_path)
+        reader = StatusReader(daemon.status_path)
+        await daemon._execute({"cmd": "volume", "args": {"level": 35}})
+        await daemon._execute({"cmd": "play", "args": {"file": str(sample_audio_file)}})
+        await daemon._load_task
+        data = reader.read()
+        assert data["volume"] == 35
+        assert data["state"] == "playing"
+        assert data["track"]["uri"] == str(sample_audio_file)
+        version = data["version"]
+        await daemon._execute({"cmd": "status"})
+        assert reader.read()["version"] == version
+
+    @pytest.mark.asyncio
+    async def test_block_versions_match_status(self, daemon, sample_audio_file):
+        from atk.statusblock import StatusBlock, StatusReader
+
+        daemon.runtime_dir.mkdir(exist_ok=True)
+        daemon._status_block = StatusBlock(daemon.status_path)
+        reader = StatusReader(daemon.status_path)
+        for cmd, args in (
+            ("add", {"paths": [str(sample_audio_file)] * 2}),
+            ("volume", {"level": 20}),
+            ("repeat", {"mode": "queue"}),
+            ("remove", {"index": 1}),
+        ):
+            await daemon._execute({"cmd": cmd, "args": args})
+            status = await daemon._cmd_status({})
+            data = reader.read()
+            assert data["version"] == status["version"]
+            assert data["versions"] == status["versions"]
+        reply = await daemon._execute(
+            {"cmd": "status", "args": {"if_version": data["version"]}}
+        )
+        assert reply["data"]["unchanged"]
+
+
+class TestDaemonAudioEvents:
+    @pytest.mark.asyncio
+    async def test_track_end_from_audio_thread(self, daemon, tmp_path):
+        import threading
+
+        daemon._audio.attach(
+            asyncio.get_running_loop(),
+            daemon._on_track_end,
+            daemon._on_scheduled_action,
+            daemon._on_underrun,
+        )
+        daemon.queue = [str(tmp_path / "a.mp3"), str(tmp_path / "b.mp3")]
+        ended = threading.Thread(target=daemon.player._end_callback)
+        ended.start()
+        ended.join()
+        for _ in range(50):
+            if daemon.queue_pos == 1:
+                break
+            await asyncio.sleep(0.01)
+        assert daemon.queue_pos == 1
+
+    @pytest.mark.asyncio
+    async def test_scheduled_gain_mirrored(self, daemon):
+        events = []
+
+        async def emit(event, data=None):
+            events.append((event, data))
+
+        daemon._emit = emit
+        daemon._audio.attach(
+            asyncio.get_running_loop(),
+            daemon._on_track_end,
+            daemon._on_scheduled_action,
+            daemon._on_underrun,
+        )
+        daemon.player._action_callback("gain", 40)
+        daemon._audio.drain()
+        await asyncio.sleep(0)
+        assert daemon.volume == 40
+        assert events[-1][0] == "scheduled_action"
+
+    def test_levels_follow_output(self, mock_player, sample_audio_file):
+        mock_player.load(str(sample_audio_file))
+        mock_player._samples[0::2] = 0.5
+        mock_player._samples[1::2] = -0.25
+        mock_player.set_volume(100)
+        mock_player.play()
+        gen = mock_player._audio_generator()
+        next(gen)
+        gen.send(512)
+        assert mock_player.get_levels() == [0.5, 0.25]
+        mock_player.pause()
+        gen.send(512)
+        assert mock_player.get_levels() == [0.0, 0.0]
+
+
+class TestDaemonStream:
+    @pytest.mark.asyncio
+    async def test_add_stream_uri(self, daemon, tmp_path):
+        result = await daemon._cmd_add({"uri": f"fifo:{tmp_path}/tts?rate=22050"})
+        assert result["queue_length"] == 1
+        info = await daemon._cmd_info({"index": 0})
+        assert info["stream"] is True
+        assert info["title"] == f"fifo:{tmp_path}/tts"
+
+    @pytest.mark.asyncio
+    async def test_status_reports_stream(self, daemon, tmp_path):
+        raw = tmp_path / "speech.raw"
+        raw.write_bytes(b"\x00" * 4096)
+        await daemon._cmd_play({"file": f"pcm:{raw}"})
+        await daemon._load_task
+        status = await daemon._cmd_status({})
+        assert "underruns" in status["stream"]
+        assert "buffered_ms" in status["stream"]
+
+
+class TestDaemonWarm:
+    @pytest.mark.asyncio
+    async def test_warm_upcoming(self, daemon, tmp_path):
+        submitted = []
+        daemon.decoder.warm = lambda uris: (
+            submitted.extend(uris) or {"submitted": len(uris), "cached": 0}
+        )
+        daemon.queue = [f"{tmp_path}/{i}.flac" for i in range(5)]
+        daemon.queue_pos = 3
+        result = await daemon._cmd_warm({"count": 3})
+        assert result["warming"] == 2
+        assert submitted == daemon.queue[3:5]
+
+    @pytest.mark.asyncio
+    async def test_warm_range_skips_streams(self, daemon, tmp_path):
+        daemon.decoder.warm = lambda uris: {"submitted": len(uris), "cached": 0}
+        daemon.queue = [f"{tmp_path}/a.flac", "fifo:/tmp/x", f"{tmp_path}/b.flac"]
+        result = await daemon._cmd_warm({"range": "0:3"})
+        assert result["warming"] == 2
+
+    @pytest.mark.asyncio
+    async def test_warm_runs_off_the_loop(self, daemon, tmp_path):
+        threads = []
+        daemon.decoder.warm = lambda uris: (
+            threads.append(threading.get_ident()) or {"submitted": 0, "cached": 0}
+        )
+        daemon.queue = [f"{tmp_path}/a.flac"]
+        await daemon._cmd_warm({})
+        assert threads and threads[0] != threading.get_ident()
+
+    def test_upcoming_wraps_with_repeat(self, daemon):
+        daemon.queue = ["a.mp3", "b.mp3", "c.mp3"]
+        daemon.queue_pos = 2
+        assert daemon._upcoming(3) == [2]
+        daemon.repeat = "queue"
+        assert daemon._upcoming(3) == [2, 0, 1]
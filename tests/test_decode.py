@@ -0,0 +1,96 @@
+"""Tests for the decode service and PCM cache."""
+
+from __future__ import annotations
+
+import wave
+
+import numpy as np
+import pytest
+
+from atk.decode import DecodeService
+
+
+@pytest.fixture
+def wav_file(tmp_path):
+    """A real 0.1 s stereo 44.1 kHz WAV that miniaudio can decode."""
+    path = tmp_path / "tone.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(44100)
+        w.writeframes(np.full(4410 * 2, 16384, dtype=np.int16).tobytes())
+    return path
+
+
+@pytest.fixture
+def service(tmp_path):
+    svc = DecodeService(tmp_path / "pcm", workers=1)
+    yield svc
+    svc.shutdown()
+
+
+class TestDecodeService:
+    def test_cache_miss(self, service, wav_file):
+        assert service.lookup(str(wav_file)) is None
+
+    def test_missing_file(self, service, tmp_path):
+        assert service.cache_path(str(tmp_path / "nope.flac")) is None
+
+    def test_warm_then_lookup(self, service, wav_file):
+        result = service.warm([str(wav_file)])
+        assert result == {"submitted": 1, "cached": 0}
+        samples = service.lookup(str(wav_file))
+        assert samples is not None
+        assert len(samples) == 4410 * 2
+        assert samples[0] == pytest.approx(0.5, abs=1e-3)
+        assert service.warm([str(wav_file)]) == {"submitted": 0, "cached": 1}
+
+    def test_key_changes_with_file(self, service, wav_file):
+        before = service.cache_path(str(wav_file))
+        wav_file.write_bytes(wav_file.read_bytes() + b"\0\0\0\0")
+        assert service.cache_path(str(wav_file)) != before
+
+    def test_evicts_lru(self, tmp_path):
+        svc = DecodeService(tmp_path / "pcm", max_bytes=100)
+        svc.cache_dir.mkdir()
+        for i in range(3):
+            (svc.cache_dir / f"{i}.f32").write_bytes(b"\0" * 60)
+        svc._evict()
+        assert svc.stats()["cached_tracks"] == 1
+
+    def test_evicts_least_recently_accessed(self, tmp_path):
+        svc = DecodeService(tmp_path / "pcm", max_bytes=130)
+        svc.cache_dir.mkdir()
+        files = [svc.cache_dir / f"{i}.f32" for i in range(3)]
+        for f in files:
+            f.write_bytes(b"\0" * 60)
+        svc._touch(files[0])  # oldest file, but used since
+        svc._touch(files[2])
+        svc._touch(files[1])
+        svc._evict()
+        assert [f.exists() for f in files] == [False, True, True]
+
+    def test_warm_set_never_evicted(self, service, wav_file, tmp_path):
+        service.max_bytes = 0
+        service.warm([str(wav_file)])
+        assert service.lookup(str(wav_file)) is not None
+        other = service.cache_dir / "other.f32"
+        other.write_bytes(b"\0" * 60)
+        service._evict()
+        assert not other.exists()
+        assert service.cache_path(str(wav_file)).exists()
+
+
+class TestPlayerCache:
+    def test_load_uses_cache(self, mock_miniaudio, sample_audio_file, tmp_path):
+        from atk.player import Player
+
+        svc = DecodeService(tmp_path / "pcm")
+        dest = svc.cache_path(str(sample_audio_file))
+        dest.parent.mkdir()
+        np.ones(44100 * 2, dtype=np.float32).tofile(dest)
+        mock_miniaudio.decode_file = lambda *a, **kw: pytest.fail("decoded")
+
+        player = Player(cache=svc)
+        player.load(str(sample_audio_file))
+        assert player.get_duration() == pytest.approx(1.0)
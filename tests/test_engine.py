@@ -0,0 +1,69 @@
+"""Tests for the out-of-process audio engine."""
+
+from __future__ import annotations
+
+import pytest
+
+from atk.engine import RemotePlayer, ShmRing
+
+
+@pytest.fixture
+def ring():
+    r = ShmRing(size=64)
+    yield r
+    r.close()
+    r.unlink()
+
+
+class TestShmRing:
+    def test_empty(self, ring):
+        assert ring.get() is None
+
+    def test_fifo_order(self, ring):
+        assert ring.put(b"one")
+        assert ring.put(b"two")
+        assert ring.get() == b"one"
+        assert ring.get() == b"two"
+        assert ring.get() is None
+
+    def test_full(self, ring):
+        assert ring.put(b"x" * 40)
+        assert not ring.put(b"y" * 40)
+
+    def test_wraparound(self, ring):
+        for i in range(50):
+            payload = bytes([i]) * 21
+            assert ring.put(payload)
+            assert ring.get() == payload
+
+    def test_attach_by_name(self, ring):
+        other = ShmRing(ring.name)
+        ring.put(b"hello")
+        assert other.get() == b"hello"
+        assert ring.get() is None
+        other.close()
+
+
+class TestRemotePlayer:
+    @pytest.fixture
+    def remote(self):
+        rp = RemotePlayer()
+        yield rp
+        rp.close()
+
+    def test_state_round_trip(self, remote):
+        assert remote.is_playing() is False
+        assert remote.get_schedule() == []
+        remote.set_volume(30)
+        assert remote.get_volume() == 30
+
+    def test_errors_propagate(self, remote, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            remote.load(str(tmp_path / "missing.mp3"))
+        with pytest.raises(ValueError):
+            remote.schedule(0, "explode")
+
+    def test_closed(self, remote):
+        remote.close()
+        with pytest.raises(RuntimeError):
+            remote.pause()
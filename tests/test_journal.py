@@ -0,0 +1,181 @@
+"""Tests for the state journal: replay, snapshots, and daemon restart."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from atk import journal as journal_mod
+from atk.daemon import Daemon
+from atk.journal import Journal, empty_state, replay
+
+
+def _state(**kw) -> dict:
+    return {**empty_state(), **kw}
+
+
+async def _cmd(daemon: Daemon, cmd: str, **args) -> dict:
+    resp = await daemon._dispatch(json.dumps({"id": "t", "cmd": cmd, "args": args}))
+    assert resp["ok"], resp
+    return resp["data"]
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(20):
+        f = tmp_path / f"{i:02d}.mp3"
+        f.write_bytes(b"\0" * 64)
+        paths.append(str(f))
+    return paths
+
+
+class TestReplay:
+    @staticmethod
+    def _replay(state: dict, records: list[dict]) -> dict:
+        return replay(state, [{**r, "seq": n} for n, r in enumerate(records, 1)])
+
+    def test_queue_ops(self):
+        state = self._replay(
+            _state(),
+            [
+                {"op": "insert", "index": 0, "uris": list("abcde"), "current": 0},
+                {"op": "remove", "index": 1, "current": 0},
+                {"op": "move", "from": 0, "to": 3, "current": 3},
+                {"op": "insert", "index": 4, "uris": ["f"], "current": 3},
+            ],
+        )
+        assert state["queue"] == ["c", "d", "e", "a", "f"]
+        assert state["queue_pos"] == 3
+        assert state["seq"] == 4
+        state = self._replay(state, [{"op": "clear", "current": 0}])
+        assert state["queue"] == [] and state["queue_pos"] == 0
+
+    def test_drawn_follows_the_queue(self):
+        state = _state(queue=list("abcdef"), shuffle=True, seed=7, drawn=[4, 1])
+        records = [
+            {"op": "current_changed", "current": 2},
+            {"op": "remove", "index": 1, "current": 1},
+            {"op": "move", "from": 3, "to": 0, "current": 2},
+        ]
+        state = self._replay(state, records)
+        assert state["queue"] == list("eacdf")
+        assert [state["queue"][i] for i in state["drawn"]] == ["e", "c"]
+        off = {"op": "shuffle", "enabled": False, "seed": None, "drawn": []}
+        state = self._replay(state, [off])
+        assert not state["shuffle"] and state["drawn"] == []
+
+
+class TestJournal:
+    @pytest.mark.asyncio
+    async def test_records_survive_without_close(self, tmp_path):
+        j = Journal(tmp_path)
+        j.record({"op": "insert", "index": 0, "uris": ["a", "b"], "current": 0})
+        j.record({"op": "settings", "volume": 30, "repeat": "queue"})
+        await j.flush()  # on disk; no snapshot, no close: a crash here
+        state = Journal(tmp_path).load()
+        assert state["queue"] == ["a", "b"]
+        assert (state["volume"], state["repeat"]) == (30, "queue")
+        assert state["seq"] == 2
+
+    def test_nothing_saved(self, tmp_path):
+        assert Journal(tmp_path).load() is None
+
+    @pytest.mark.asyncio
+    async def test_torn_tail_cut_off(self, tmp_path):
+        j = Journal(tmp_path)
+        j.record({"op": "insert", "index": 0, "uris": ["a"], "current": 0})
+        await j.close()
+        with open(j.journal_path, "ab") as f:
+            f.write(b'{"op":"remove","ind')
+        size = j.journal_path.stat().st_size
+        k = Journal(tmp_path)
+        assert k.load()["queue"] == ["a"]
+        assert j.journal_path.stat().st_size < size
+        k.record({"op": "clear", "current": 0})
+        await k.close()
+        assert Journal(tmp_path).load()["queue"] == []
+
+    @pytest.mark.asyncio
+    async def test_snapshot_truncates_journal(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(journal_mod, "SNAPSHOT_EVERY", 4)
+        j = Journal(tmp_path)
+        for i in range(4):
+            j.record({"op": "insert", "index": i, "uris": [str(i)], "current": 0})
+        assert j.due
+        j.snapshot(_state(queue=["0", "1", "2", "3"]))
+        assert not j.due
+        j.record({"op": "remove", "index": 0, "current": 0})
+        await j.close()
+        lines = j.journal_path.read_bytes().splitlines()
+        assert [json.loads(ln)["op"] for ln in lines] == ["remove"]
+        assert json.loads(j.snapshot_path.read_bytes())["seq"] == 4
+        assert Journal(tmp_path).load()["queue"] == ["1", "2", "3"]
+
+    @pytest.mark.asyncio
+    async def test_stale_records_after_snapshot_skipped(self, tmp_path):
+        # A crash between the snapshot's rename and the journal truncation
+        j = Journal(tmp_path)
+        j.record({"op": "insert", "index": 0, "uris": ["a"], "current": 0})
+        await j.flush()
+        stale = j.journal_path.read_bytes()
+        await j.close(_state(queue=["a"]))
+        j.journal_path.write_bytes(stale)
+        state = Journal(tmp_path).load()
+        assert state["queue"] == ["a"]
+
+
+class TestDaemonRestart:
+    @pytest.mark.asyncio
+    async def test_state_restored(self, mock_miniaudio, tmp_path, files):
+        daemon = Daemon(tmp_path / "rt", event_window=0, journal=Journal(tmp_path))
+        await _cmd(daemon, "add", paths=files)
+        await _cmd(daemon, "remove", index=0)
+        await _cmd(daemon, "move", **{"from": 0, "to": 5})
+        await _cmd(daemon, "volume", level=35)
+        await _cmd(daemon, "repeat", mode="queue")
+        await _cmd(daemon, "rate", speed=1.5)
+        await _cmd(daemon, "jump", index=3)
+        await _cmd(daemon, "shuffle", enabled=True, seed=11)
+        for _ in range(4):
+            await _cmd(daemon, "next")
+        drawn = daemon.queue.shuffle_drawn()
+        await daemon._load_task
+        await daemon._journal.flush()  # then "crash": no stop, no snapshot
+        daemon.player.close()
+
+        saved = Journal(tmp_path).load()
+        again = Daemon(tmp_path / "rt2", event_window=0)
+        again.restore(saved)
+        assert again.queue == daemon.queue
+        assert again.queue_pos == daemon.queue_pos
+        assert (again.volume, again.repeat, again.rate) == (35, "queue", 1.5)
+        assert again.shuffle and again.queue.shuffle_seed == 11
+        assert again.queue.shuffle_drawn() == drawn
+        assert saved["state"] == "playing"
+        again.player.close()
+
+    @pytest.mark.asyncio
+    async def test_resume_at_position(self, mock_miniaudio, tmp_path, files):
+        saved = _state(
+            queue=files, queue_pos=4, state="paused", position=12.5, volume=50
+        )
+        daemon = Daemon(tmp_path / "rt", event_window=0)
+        daemon.restore(saved)
+        await daemon.resume(saved)
+        await daemon._load_task
+        assert daemon.state == "paused"
+        assert daemon.player.get_position() == pytest.approx(12.5, abs=0.1)
+        assert daemon._saved_state()["queue_pos"] == 4
+        daemon.player.close()
+
+    @pytest.mark.asyncio
+    async def test_stop_snapshots(self, mock_miniaudio, tmp_path, files):
+        daemon = Daemon(tmp_path / "rt", event_window=0, journal=Journal(tmp_path))
+        await daemon.start()
+        await _cmd(daemon, "add", paths=files[:3])
+        await daemon.stop()
+        assert Journal(tmp_path).journal_path.stat().st_size == 0
+        saved = Journal(tmp_path).load()
+        assert saved["queue"] == files[:3]
@@ -0,0 +1,171 @@
+"""Tests for the wire protocol: declarations, errors and schema conformance."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from atk.daemon import Daemon
+from atk.player import SCHEDULE_ACTIONS
+from atk.protocol import (
+    COMMANDS,
+    ERROR_CATEGORIES,
+    Arg,
+    ProtocolError,
+    compile_args,
+    error_info,
+)
+
+SCHEMA_PATH = Path(__file__).parent.parent / "schema" / "atk-protocol-v1.json"
+
+
+@pytest.fixture(scope="module")
+def schema():
+    return json.loads(SCHEMA_PATH.read_text())
+
+
+class TestDeclarations:
+    def test_error_codes_match_schema(self, schema):
+        props = schema["$defs"]["error_info"]["properties"]
+        assert set(ERROR_CATEGORIES) == set(props["code"]["enum"])
+        assert set(ERROR_CATEGORIES.values()) <= set(props["category"]["enum"])
+
+    def test_schedule_actions(self):
+        assert set(COMMANDS["schedule"]["action"].choices) == {
+            *SCHEDULE_ACTIONS,
+            "clear",
+        }
+
+    def test_every_command_has_a_handler(self, mock_miniaudio, tmp_path):
+        daemon = Daemon(tmp_path / "rt")
+        assert set(daemon._commands) == set(COMMANDS)
+
+
+class TestCompileArgs:
+    def test_types_and_required(self):
+        validate = compile_args("x", {"n": Arg("integer", required=True)})
+        validate({"n": 3})
+        for bad in ({}, {"n": None}, {"n": "3"}, {"n": True}, {"n": 1, "m": 2}):
+            with pytest.raises(ProtocolError) as exc:
+                validate(bad)
+            assert exc.value.code == "INVALID_ARGS"
+
+    def test_choices_and_minimum(self):
+        validate = compile_args(
+            "x",
+            {"mode": Arg("string", choices=("a", "b")), "n": Arg("number", minimum=0)},
+        )
+        validate({"mode": "a", "n": 0.5})
+        with pytest.raises(ProtocolError, match="one of a, b"):
+            validate({"mode": "c"})
+        with pytest.raises(ProtocolError, match="at least 0"):
+            validate({"n": -1})
+
+    def test_null_is_left_out(self):
+        validate = compile_args(
+            "x", {"mode": Arg("string"), "n": Arg("integer", required=True)}
+        )
+        args = {"mode": None, "n": 1}
+        validate(args)
+        assert args == {"n": 1}
+        with pytest.raises(ProtocolError, match="n required"):
+            validate({"n": None})
+
+    def test_union_type(self):
+        validate = compile_args("x", {"index": Arg("integer|integers")})
+        validate({"index": 1})
+        validate({"index": [1, 2]})
+        with pytest.raises(ProtocolError):
+            validate({"index": [1, "2"]})
+
+    @pytest.mark.parametrize(
+        "exc, code",
+        [
+            (ProtocolError("QUEUE_EMPTY", "x"), "QUEUE_EMPTY"),
+            (FileNotFoundError("x"), "FILE_NOT_FOUND"),
+            (PermissionError("x"), "PERMISSION_DENIED"),
+            (OSError("x"), "READ_ERROR"),
+            (IndexError("x"), "INVALID_INDEX"),
+            (ValueError("x"), "INVALID_ARGS"),
+            (RuntimeError("x"), "INTERNAL_ERROR"),
+        ],
+    )
+    def test_error_info(self, exc, code):
+        info = error_info(exc)
+        assert info == {
+            "code": code,
+            "category": ERROR_CATEGORIES[code],
+            "message": "x",
+        }
+
+
+class TestSchemaConformance:
+    """Every line the socket carries validates against the published schema."""
+
+    @pytest.fixture
+    def validator(self, schema):
+        jsonschema = pytest.importorskip("jsonschema")
+        return jsonschema.Draft202012Validator(schema)
+
+    @staticmethod
+    async def _lines(reader, ids: set[str]) -> list[dict]:
+        """Lines read until every request in ``ids`` is answered."""
+        lines = []
+        pending = set(ids)
+        while pending:
+            msg = json.loads(await asyncio.wait_for(reader.readline(), 2.0))
+            lines.append(msg)
+            if msg.get("ok") is not None or msg.get("more") is False:
+                pending.discard(msg.get("id"))
+        return lines
+
+    @pytest.mark.asyncio
+    async def test_replies_errors_frames_and_events(
+        self, served, validator, sample_audio_file
+    ):
+        reader, writer = await asyncio.open_unix_connection(str(served.sock_path))
+        requests = [
+            {"id": "sub", "cmd": "subscribe"},
+            {
+                "id": "add",
+                "cmd": "add",
+                "args": {"paths": [str(sample_audio_file)] * 3},
+            },
+            {"id": "status", "cmd": "status"},
+            {"id": "queue", "cmd": "queue", "stream": True},
+            {"id": "vol", "cmd": "volume", "args": {"level": 40}},
+            {"id": "bad-args", "cmd": "remove", "args": {"index": "0"}},
+            {"id": "bad-index", "cmd": "remove", "args": {"index": 9}},
+            {"id": "unknown", "cmd": "nope"},
+            {"id": "missing", "cmd": "load", "args": {"name": "no-such-playlist"}},
+            {"id": "ping", "cmd": "ping"},
+        ]
+        for req in requests:
+            writer.write((json.dumps(req) + "\n").encode())
+        await writer.drain()
+        lines = await self._lines(reader, {req["id"] for req in requests})
+        writer.close()
+
+        for line in lines:
+            errors = list(validator.iter_errors(line))
+            assert not errors, (line, [e.message for e in errors])
+        replies = {m["id"]: m for m in lines if "ok" in m and "seq" not in m}
+        assert replies["bad-args"]["error"]["code"] == "INVALID_ARGS"
+        assert replies["bad-index"]["error"]["code"] == "INVALID_INDEX"
+        assert replies["unknown"]["error"]["code"] == "UNKNOWN_COMMAND"
+        assert replies["missing"]["error"]["category"] == "io"
+        assert any("seq" in m for m in lines)
+        assert any("event" in m for m in lines)
+
+    @pytest.mark.asyncio
+    async def test_malformed_line(self, served, validator):
+        reader, writer = await asyncio.open_unix_connection(str(served.sock_path))
+        writer.write(b"{not json\n")
+        await writer.drain()
+        reply = json.loads(await asyncio.wait_for(reader.readline(), 2.0))
+        writer.close()
+        validator.validate(reply)
+        assert reply["error"]["code"] == "INVALID_MESSAGE"
@@ -0,0 +1,74 @@
+"""Tests for the parallel bulk-add scanner."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from atk.scan import scan_paths
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """music/{a,b}/... with a few supported and unsupported files."""
+    root = tmp_path / "music"
+    for rel in ("b.mp3", "a/2.flac", "a/1.flac", "a/cover.jpg", "a/deep/x.ogg"):
+        f = root / rel
+        f.parent.mkdir(parents=True, exist_ok=True)
+        f.write_bytes(b"")
+    return root
+
+
+class TestScanPaths:
+    def test_flat_directory(self, tree):
+        result = scan_paths([str(tree)])
+        assert result["files"] == [str(tree / "b.mp3")]
+
+    def test_recursive_sorted_by_path(self, tree):
+        result = scan_paths([str(tree)], recursive=True)
+        assert result["files"] == [
+            str(tree / "a/1.flac"),
+            str(tree / "a/2.flac"),
+            str(tree / "a/deep/x.ogg"),
+            str(tree / "b.mp3"),
+        ]
+        assert result["scanned"] >= 7
+
+    def test_glob_filters_names(self, tree):
+        result = scan_paths([str(tree)], recursive=True, pattern="*.flac")
+        assert [os.path.basename(f) for f in result["files"]] == ["1.flac", "2.flac"]
+
+    def test_sort_by_name(self, tree):
+        result = scan_paths([str(tree)], recursive=True, sort="name")
+        names = [os.path.basename(f) for f in result["files"]]
+        assert names == ["1.flac", "2.flac", "b.mp3", "x.ogg"]
+
+    def test_unsorted_keeps_argument_order(self, tree):
+        paths = [str(tree / "b.mp3"), "fifo:/tmp/tts", str(tree / "a/1.flac")]
+        assert scan_paths(paths, sort="none")["files"] == paths
+
+    def test_missing_and_unsupported_are_skipped(self, tree):
+        result = scan_paths([str(tree / "nope.mp3"), str(tree / "a/cover.jpg")])
+        assert result["files"] == []
+        assert len(result["skipped"]) == 2
+
+    def test_symlink_loops_walked_once(self, tree):
+        os.symlink("..", tree / "a" / "up")
+        os.symlink("..", tree / "a" / "deep" / "up")
+        os.symlink(tree / "a", tree / "again")
+        result = scan_paths([str(tree)], recursive=True)
+        names = sorted(os.path.basename(f) for f in result["files"])
+        assert names == ["1.flac", "2.flac", "b.mp3", "x.ogg"]
+
+    def test_invalid_sort(self, tree):
+        with pytest.raises(ValueError):
+            scan_paths([str(tree)], sort="size")
+
+    def test_progress_reported(self, tmp_path):
+        for i in range(1200):
+            (tmp_path / f"{i}.mp3").write_bytes(b"")
+        calls = []
+        result = scan_paths([str(tmp_path)], progress=lambda s, f: calls.append(s))
+        assert len(result["files"]) == 1200
+        assert calls and calls[-1] >= 1000
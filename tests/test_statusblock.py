@@ -0,0 +1,88 @@
+"""Tests for the shared status block."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from atk.statusblock import _SEQ, _SEQ_OFFSET, StatusBlock, StatusReader
+
+
+def record(**kw):
+    fields = dict(
+        state="playing",
+        position=10.0,
+        anchor=100.0,
+        rate=2.0,
+        duration=60.0,
+        volume=70,
+        shuffle=True,
+        repeat="queue",
+        queue_length=5,
+        queue_position=2,
+        track=b'{"title": "Song"}',
+        version=9,
+        playback_version=4,
+        queue_version=3,
+        settings_version=2,
+    )
+    return {**fields, **kw}
+
+
+@pytest.fixture
+def block(tmp_path):
+    b = StatusBlock(tmp_path / "atk.status")
+    yield b
+    if not b._map.closed:
+        b.close()
+
+
+class TestStatusBlock:
+    def test_round_trip(self, block):
+        block.write(**record())
+        data = StatusReader(block.path).read(now=101.0)
+        assert data["state"] == "playing"
+        assert data["position"] == pytest.approx(12.0)  # extrapolated
+        assert data["clock"]["position"] == 10.0
+        assert data["track"] == {"title": "Song"}
+        assert (data["volume"], data["shuffle"], data["repeat"]) == (70, True, "queue")
+        assert (data["queue_length"], data["queue_position"]) == (5, 2)
+        assert data["version"] == 9
+        assert data["versions"] == {"playback": 4, "queue": 3, "settings": 2}
+
+    def test_reader_sees_rewrites_in_place(self, block):
+        block.write(**record())
+        reader = StatusReader(block.path)
+        block.write(**record(state="paused", track=b"", version=10))
+        data = reader.read()
+        assert data["state"] == "paused"
+        assert data["position"] == 10.0
+        assert data["track"] is None
+        assert data["version"] == 10
+
+    def test_torn_write_is_not_read(self, block):
+        block.write(**record())
+        reader = StatusReader(block.path)
+        _SEQ.pack_into(block._map, _SEQ_OFFSET, block._seq + 1)  # writer mid-way
+        with pytest.raises(BlockingIOError):
+            reader.snapshot()
+
+    def test_failed_write_leaves_block_readable(self, block):
+        block.write(**record())
+        reader = StatusReader(block.path)
+        with pytest.raises(ValueError):
+            block.write(**record(repeat=None, version=10))
+        assert reader.read()["version"] == 9
+        block.write(**record(version=11))
+        assert reader.read()["version"] == 11
+
+    def test_closed_or_dead_daemon_reads_none(self, block):
+        block.write(**record(pid=2**31 - 1))
+        reader = StatusReader(block.path)
+        assert reader.read() is None
+        block.write(**record())
+        assert reader.read() is not None
+        block.close()
+        assert reader.read() is None
+        assert not os.path.exists(block.path)
@@ -0,0 +1,146 @@
+"""Tests for ATK streaming PCM sources."""
+
+from __future__ import annotations
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from atk.stream import StreamSource, is_stream_uri, parse_stream_uri
+
+
+def _wait(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert cond()
+
+
+@pytest.fixture
+def pcm_file(tmp_path):
+    """One second of s16le stereo ramp at 44.1 kHz."""
+    path = tmp_path / "speech.raw"
+    samples = (np.arange(44100 * 2) % 1000).astype(np.int16)
+    path.write_bytes(samples.tobytes())
+    return path
+
+
+class TestStreamUri:
+    def test_is_stream_uri(self):
+        assert is_stream_uri("fifo:/tmp/x")
+        assert is_stream_uri("pcm:/tmp/x?rate=22050")
+        assert not is_stream_uri("/music/song.mp3")
+
+    def test_parse_defaults(self):
+        spec = parse_stream_uri("fifo:/tmp/tts")
+        assert spec["path"] == "/tmp/tts"
+        assert spec["rate"] == 44100
+        assert spec["channels"] == 2
+        assert spec["format"] == "s16le"
+
+    def test_parse_params(self):
+        spec = parse_stream_uri("pcm:/tmp/tts?rate=22050&channels=1&format=f32le")
+        assert (spec["rate"], spec["channels"], spec["format"]) == (22050, 1, "f32le")
+
+    def test_parse_invalid(self):
+        with pytest.raises(ValueError):
+            parse_stream_uri("fifo:/tmp/x?format=mp3")
+        with pytest.raises(ValueError):
+            parse_stream_uri("fifo:/tmp/x?buffer=0")
+        with pytest.raises(ValueError):
+            parse_stream_uri("pcm:-")
+
+
+class TestStreamSource:
+    def test_reads_file_to_eof(self, pcm_file):
+        src = StreamSource(f"pcm:{pcm_file}", 44100, 2)
+        src.open()
+        _wait(lambda: src.stats()["eof"])
+        total = 0
+        while not src.finished:
+            total += len(src.read(4096)) // 2
+        assert total == 44100
+        assert src.underruns == 0
+
+    def test_prefill_holds_output(self, tmp_path):
+        fifo = tmp_path / "tts.fifo"
+        os.mkfifo(fifo)
+        src = StreamSource(f"fifo:{fifo}?prefill=200", 44100, 2)
+        src.open()
+        fd = os.open(fifo, os.O_WRONLY)
+        try:
+            os.write(fd, np.zeros(4410 * 2, dtype=np.int16).tobytes())  # 100 ms
+            _wait(lambda: src.stats()["buffered_ms"] >= 100)
+            assert len(src.read(1024)) == 0
+            os.write(fd, np.zeros(4410 * 2 * 2, dtype=np.int16).tobytes())
+            _wait(lambda: src.stats()["buffered_ms"] >= 300)
+            assert len(src.read(1024)) == 1024 * 2
+        finally:
+            os.close(fd)
+        src.close()
+
+    def test_underrun_counted(self, tmp_path):
+        fifo = tmp_path / "tts.fifo"
+        os.mkfifo(fifo)
+        src = StreamSource(f"fifo:{fifo}?prefill=0", 44100, 2)
+        src.open()
+        fd = os.open(fifo, os.O_WRONLY)
+        try:
+            os.write(fd, np.zeros(100 * 2, dtype=np.int16).tobytes())
+            _wait(lambda: src.stats()["buffered_ms"] > 0)
+            assert len(src.read(1024)) == 100 * 2
+            assert src.underruns == 1
+        finally:
+            os.close(fd)
+        src.close()
+
+    def test_mono_resampled_to_stereo(self, tmp_path):
+        path = tmp_path / "mono.raw"
+        path.write_bytes(np.ones(22050, dtype=np.float32).tobytes())
+        src = StreamSource(f"pcm:{path}?rate=22050&channels=1&format=f32le", 44100, 2)
+        src.open()
+        _wait(lambda: src.stats()["eof"])
+        out = src.read(100000)
+        assert abs(len(out) // 2 - 44100) <= 2
+        assert np.allclose(out, 1.0)
+
+    def test_high_water_mark_holds_reader(self, pcm_file):
+        src = StreamSource(f"pcm:{pcm_file}?buffer=100&prefill=0", 44100, 2)
+        src.open()
+        _wait(lambda: src.stats()["buffered_ms"] >= 100)
+        time.sleep(0.05)
+        stats = src.stats()
+        assert not stats["eof"]
+        assert stats["buffered_ms"] < 150  # at most one read block over
+        total = 0
+        deadline = time.monotonic() + 2.0
+        while not src.finished and time.monotonic() < deadline:
+            total += len(src.read(4096)) // 2
+        assert total == 44100  # nothing dropped
+        src.close()
+
+    def test_close_releases_waiting_reader(self, pcm_file):
+        src = StreamSource(f"pcm:{pcm_file}?buffer=10&prefill=0", 44100, 2)
+        src.open()
+        _wait(lambda: src.stats()["buffered_ms"] >= 10)
+        src.close()
+        src._thread.join(1.0)
+        assert not src._thread.is_alive()
+
+
+class TestPlayerStream:
+    def test_player_plays_stream(self, mock_player, pcm_file):
+        mock_player.load(f"pcm:{pcm_file}")
+        mock_player.play()
+        assert mock_player.is_playing()
+        _wait(lambda: mock_player.get_stream_stats()["eof"])
+        chunk = mock_player._read_chunk(1000)
+        assert len(chunk) == 2000
+        assert mock_player.get_position() == pytest.approx(1000 / 44100)
+        assert mock_player.get_duration() == 0.0
+
+    def test_missing_stream(self, mock_player, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            mock_player.load(f"fifo:{tmp_path}/nope")
@@ -0,0 +1,201 @@
+"""Tests for the indexed queue structures."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from atk import tracklist
+from atk.tracklist import FLAG_UNPLAYABLE, IndexedList, Track, TrackQueue
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    """Tiny blocks so splits and block removal are exercised."""
+    monkeypatch.setattr(tracklist, "BLOCK_SIZE", 4)
+
+
+class TestIndexedList:
+    def test_matches_list_under_random_ops(self):
+        rng = random.Random(7)
+        ref: list[int] = []
+        il = IndexedList()
+        nxt = 0
+        for _ in range(2000):
+            op = rng.random()
+            if op < 0.5 or not ref:
+                i = rng.randint(0, len(ref))
+                ref.insert(i, nxt)
+                il.insert(i, nxt)
+                nxt += 1
+            elif op < 0.8:
+                i = rng.randrange(len(ref))
+                assert il.pop(i) == ref.pop(i)
+            else:
+                v = rng.choice(ref)
+                assert il.index(v) == ref.index(v)
+            assert len(il) == len(ref)
+        assert list(il) == ref
+        assert [il[i] for i in range(len(ref))] == ref
+        assert list(il.iter_from(len(ref) // 2)) == ref[len(ref) // 2 :]
+
+    def test_extend_then_insert(self):
+        il = IndexedList(range(10))
+        il.insert(3, 100)
+        assert list(il) == [0, 1, 2, 100, 3, 4, 5, 6, 7, 8, 9]
+        assert il[-1] == 9
+
+    def test_errors(self):
+        il = IndexedList([1, 2])
+        with pytest.raises(ValueError):
+            il.append(1)
+        with pytest.raises(ValueError):
+            il.index(5)
+        with pytest.raises(IndexError):
+            il[2]
+
+
+class TestTrackQueue:
+    def test_list_interface(self):
+        q = TrackQueue(f"{i}.mp3" for i in range(10))
+        assert len(q) == 10
+        assert q[3] == "3.mp3"
+        assert q[2:5] == ["2.mp3", "3.mp3", "4.mp3"]
+        assert q.pop(0) == "0.mp3"
+        q.insert(0, "new.mp3")
+        q.move(0, 9)
+        assert q[9] == "new.mp3"
+        assert q == [f"{i}.mp3" for i in range(1, 10)] + ["new.mp3"]
+
+    def test_shuffle_follows_removal_and_move(self):
+        q = TrackQueue(f"{i}.mp3" for i in range(20))
+        q.shuffle_on(first=5)
+        assert q.shuffled(0) == 5
+        order = [q[i] for i in q.shuffle_indices()]
+        q.pop(7)
+        order.remove("7.mp3")
+        q.move(0, 10)
+        assert [q[i] for i in q.shuffle_indices()] == order
+        assert sorted(q.shuffle_indices()) == list(range(19))
+
+    def test_shuffle_insert_and_index(self):
+        q = TrackQueue(["a", "b", "c"])
+        q.set_shuffle_order([2, 0])
+        with pytest.raises(ValueError):
+            q.shuffle_index(1)
+        q.shuffle_insert(1, 1)
+        assert q.shuffle_indices() == [2, 1, 0]
+        assert q.shuffle_index(0) == 2
+        q.shuffle_off()
+        assert q.shuffle_indices() == []
+
+    def test_tombstones_compacted(self, monkeypatch):
+        monkeypatch.setattr(TrackQueue, "COMPACT_MIN", 8)
+        q = TrackQueue(f"{i}.mp3" for i in range(40))
+        q.shuffle_on(seed=3)
+        q.shuffled(4)  # five drawn, the rest still in the pool
+        drawn = [q[q.shuffled(k)] for k in range(5)]
+        uris = list(q)
+        for i in range(38, 8, -1):
+            uris.remove(q.pop(i))
+        assert q._next < 40  # compacted along the way
+        assert q._next == len(q) + len(q._removed)
+        assert list(q) == uris
+        order = [q[i] for i in q.shuffle_indices()]
+        kept = [u for u in drawn if u in uris]
+        assert order[: len(kept)] == kept
+        assert sorted(order) == sorted(uris)
+
+class TestTrack:
+    def test_info_matches_file_name(self):
+        assert Track("/m/Artist - Song.mp3").info() == {
+            "uri": "/m/Artist - Song.mp3",
+            "artist": "Artist",
+            "title": "Song",
+        }
+        assert Track("/m/a.b.flac").info() == {"uri": "/m/a.b.flac", "title": "a.b"}
+        assert Track("fifo:/tmp/s?rate=22050").info() == {
+            "uri": "fifo:/tmp/s?rate=22050",
+            "title": "fifo:/tmp/s",
+            "stream": True,
+        }
+
+    def test_duration_and_flags(self):
+        t = Track("/m/song.wav")
+        t.duration = 12.5
+        t.flags |= FLAG_UNPLAYABLE
+        assert t.info() == {
+            "uri": "/m/song.wav",
+            "title": "song",
+            "unplayable": True,
+            "duration": 12.5,
+        }
+
+    def test_queue_records_share_artist_names(self):
+        q = TrackQueue(["/a/X - One.mp3", "/b/X - Two.mp3"])
+        first, second = q.tracks()
+        assert first.artist is second.artist
+        assert q.track(1) is second
+        assert not hasattr(first, "__dict__")
+        q.pop(0)
+        assert list(q.tracks()) == [second]
+
+
+class TestLazyShuffle:
+    def test_is_a_permutation(self):
+        q = TrackQueue(str(i) for i in range(200))
+        q.shuffle_on()
+        order = q.shuffle_indices()
+        assert sorted(order) == list(range(200))
+        assert order != list(range(200))
+
+    def test_same_seed_same_order(self):
+        a = TrackQueue(str(i) for i in range(100))
+        b = TrackQueue(str(i) for i in range(100))
+        seed = a.shuffle_on()
+        b.shuffle_on(seed=seed)
+        assert a.shuffle_indices() == b.shuffle_indices()
+
+    def test_draws_only_what_is_visited(self):
+        q = TrackQueue(str(i) for i in range(1_000_000))
+        q.shuffle_on(first=0)
+        assert q.shuffle_len() == 1_000_000
+        seen = [q.shuffled(k) for k in range(5)]
+        assert seen[0] == 0
+        assert len(q._shuffled._drawn) == 5
+        assert len(q._shuffled._at) <= 10
+
+    def test_removals_and_adds(self):
+        q = TrackQueue(str(i) for i in range(50))
+        for _ in range(10):
+            q.pop(3)
+        q.shuffle_on(first=0)
+        q.shuffled(5)
+        q.pop(q.shuffled(2))
+        q.append("new")
+        q.shuffle_add([len(q) - 1])
+        names = [q[i] for i in q.shuffle_indices()]
+        assert sorted(names) == sorted(q)
+        assert len(names) == len(q) == 40
+
+    def test_jump_to_undrawn_track_continues_from_it(self):
+        q = TrackQueue(str(i) for i in range(10))
+        q.shuffle_on(first=0)
+        k = q.shuffle_index(7)
+        assert k == 1 and q.shuffled(1) == 7
+
+    def test_restore_drawn_prefix(self):
+        q = TrackQueue(str(i) for i in range(100))
+        for _ in range(5):
+            q.pop(10)
+        seed = q.shuffle_on(first=7)
+        q.shuffled(9)
+        drawn = q.shuffle_drawn()
+        assert len(drawn) == 10 and drawn[0] == 7
+        r = TrackQueue(q)
+        assert r.shuffle_on(seed=seed, drawn=drawn) == seed
+        assert r.shuffle_drawn() == drawn
+        order = r.shuffle_indices()
+        assert order[:10] == drawn
+        assert sorted(order) == list(range(95))
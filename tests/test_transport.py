@@ -0,0 +1,434 @@
+"""Tests for the Unix socket transport."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import os
+import socket
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from atk import cli
+from atk.cli import SocketClient
+from atk.codec import MSGPACK
+from atk.daemon import Daemon
+
+
+async def _request(writer, req_id: str, cmd: str, args: dict | None = None) -> None:
+    line = json.dumps({"id": req_id, "cmd": cmd, "args": args or {}}) + "\n"
+    writer.write(line.encode())
+    await writer.drain()
+
+
+class TestSocketTransport:
+    @pytest.mark.asyncio
+    async def test_pipelined_requests(self, served):
+        reader, writer = await asyncio.open_unix_connection(str(served.sock_path))
+        for i in range(3):
+            await _request(writer, f"r{i}", "ping")
+        ids = [json.loads(await reader.readline())["id"] for _ in range(3)]
+        assert ids == ["r0", "r1", "r2"]
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_responses_routed_to_requester(self, served):
+        r1, w1 = await asyncio.open_unix_connection(str(served.sock_path))
+        r2, w2 = await asyncio.open_unix_connection(str(served.sock_path))
+        await _request(w1, "one", "ping")
+        await _request(w2, "two", "volume", {"level": 40})
+        assert json.loads(await r1.readline())["id"] == "one"
+        assert json.loads(await r2.readline())["id"] == "two"
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(r1.readline(), 0.1)
+        w1.close()
+        w2.close()
+
+    @pytest.mark.asyncio
+    async def test_events_only_to_subscribers(self, served, sample_audio_file):
+        r1, w1 = await asyncio.open_unix_connection(str(served.sock_path))
+        r2, w2 = await asyncio.open_unix_connection(str(served.sock_path))
+        await _request(w1, "sub", "subscribe")
+        assert json.loads(await r1.readline())["id"] == "sub"
+        await _request(w2, "add", "add", {"uri": str(sample_audio_file)})
+        assert json.loads(await r2.readline())["id"] == "add"
+        evt = json.loads(await asyncio.wait_for(r1.readline(), 1.0))
+        assert evt["event"] == "queue_updated"
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(r2.readline(), 0.1)
+        w1.close()
+        w2.close()
+
+    @pytest.mark.asyncio
+    async def test_controls_overtake_heavy_commands(self, served):
+        def slow_write(name, fmt, uris):
+            time.sleep(0.2)
+            return served.runtime_dir / f"{name}.{fmt}"
+
+        served._write_playlist = slow_write
+        reader, writer = await asyncio.open_unix_connection(str(served.sock_path))
+        await _request(writer, "save", "save", {"name": "x"})
+        await _request(writer, "add", "add", {"uri": "/m/a.mp3"})
+        await _request(writer, "vol", "volume", {"level": 30})
+        await _request(writer, "pause", "pause")
+        ids = [json.loads(await reader.readline())["id"] for _ in range(4)]
+        # Controls answer at once; add waits behind save on the queue lane
+        assert ids[:2] == ["vol", "pause"]
+        assert ids[2:] == ["save", "add"]
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_client_multiplexes_threads(self, served):
+        client = SocketClient(served.sock_path)
+        try:
+            results = await asyncio.gather(
+                *(asyncio.to_thread(client.request, "ping") for _ in range(8))
+            )
+            assert all(r["ok"] and r["data"]["pong"] for r in results)
+        finally:
+            client.close()
+
+
+class TestSocketClient:
+    @pytest.fixture
+    def pair(self, tmp_path):
+        """A SocketClient and the server end of its connection."""
+        path = tmp_path / "s.sock"
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(path))
+        server.listen()
+        client = SocketClient(path)
+        conn, _ = server.accept()
+        yield client, conn
+        client.close()
+        conn.close()
+        server.close()
+
+    def test_partial_line_survives_timeout(self, pair):
+        client, conn = pair
+        conn.sendall(b'{"id": "a", ')
+        assert client._recv(time.monotonic() + 0.05) is None
+        conn.sendall(b'"ok": true}\n{"id": "b"}\n')
+        line = client._recv(time.monotonic() + 1.0)
+        assert json.loads(line) == {"id": "a", "ok": True}
+        assert json.loads(client._recv(time.monotonic() + 1.0)) == {"id": "b"}
+
+    def test_hangup_raises(self, pair):
+        client, conn = pair
+        conn.close()
+        with pytest.raises(ConnectionError):
+            client.request("ping", timeout=1.0)
+
+    def test_sent_request_never_resent(self):
+        client = MagicMock()
+        client.wait.side_effect = ConnectionError("Daemon closed the connection")
+        with (
+            patch("atk.cli.ensure_daemon"),
+            patch("atk.cli._socket_client", return_value=client),
+            patch("atk.cli.send_command_fifo") as fifo,
+        ):
+            with pytest.raises(ConnectionError):
+                cli.send_command("next")
+        fifo.assert_not_called()
+
+    def test_unsent_request_falls_back_to_fifo(self):
+        client = MagicMock()
+        client.send.side_effect = BrokenPipeError()
+        with (
+            patch("atk.cli.ensure_daemon"),
+            patch("atk.cli._socket_client", return_value=client),
+            patch("atk.cli.send_command_fifo", return_value={"ok": True}) as fifo,
+        ):
+            assert cli.send_command("next") == {"ok": True}
+        fifo.assert_called_once_with("next", None, None)
+
+
+def _reply_fifo(tmp_path, name: str) -> tuple[str, int]:
+    path = tmp_path / name
+    os.mkfifo(path)
+    return str(path), os.open(path, os.O_RDWR | os.O_NONBLOCK)
+
+
+async def _read_reply(fd: int, timeout: float = 1.0) -> dict:
+    deadline = asyncio.get_running_loop().time() + timeout
+    buf = b""
+    while b"\n" not in buf:
+        try:
+            buf += os.read(fd, 65536)
+        except BlockingIOError:
+            if asyncio.get_running_loop().time() > deadline:
+                raise asyncio.TimeoutError from None
+            await asyncio.sleep(0.005)
+    return json.loads(buf.split(b"\n")[0])
+
+
+def _fifo_line(req_id: str, cmd: str, reply: str, args: dict | None = None) -> str:
+    return json.dumps({"id": req_id, "cmd": cmd, "args": args or {}, "reply": reply})
+
+
+class TestReplyFifos:
+    @pytest.mark.asyncio
+    async def test_response_goes_to_named_fifo(self, served, tmp_path):
+        path, fd = _reply_fifo(tmp_path, "a")
+        await served._handle_fifo_line(_fifo_line("x", "ping", path))
+        resp = await _read_reply(fd)
+        assert resp["id"] == "x" and resp["ok"]
+        assert served._resp_queue.empty()
+        os.close(fd)
+
+    @pytest.mark.asyncio
+    async def test_no_crosstalk(self, served, tmp_path):
+        pa, fa = _reply_fifo(tmp_path, "a")
+        pb, fb = _reply_fifo(tmp_path, "b")
+        await served._handle_fifo_line(_fifo_line("from-a", "ping", pa))
+        await served._handle_fifo_line(_fifo_line("from-b", "ping", pb))
+        assert (await _read_reply(fa))["id"] == "from-a"
+        assert (await _read_reply(fb))["id"] == "from-b"
+        os.close(fa)
+        os.close(fb)
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_fifo_reply(self, served, tmp_path):
+        target = tmp_path / "file.txt"
+        target.write_text("")
+        await served._handle_fifo_line(_fifo_line("x", "ping", str(target)))
+        resp = json.loads(served._resp_queue.get_nowait())
+        assert not resp["ok"] and "not a FIFO" in resp["error"]["message"]
+        assert target.read_text() == ""
+
+    @pytest.mark.asyncio
+    async def test_stalled_subscriber_does_not_block_others(
+        self, served, tmp_path, sample_audio_file
+    ):
+        stalled, fd_stalled = _reply_fifo(tmp_path, "stalled")
+        live, fd_live = _reply_fifo(tmp_path, "live")
+        for path, fd in ((stalled, fd_stalled), (live, fd_live)):
+            await served._handle_fifo_line(_fifo_line("s", "subscribe", path))
+            assert (await _read_reply(fd))["ok"]
+        # Flood events; only the live subscriber keeps reading.
+        received = []
+
+        async def drain() -> None:
+            buf = b""
+            while True:
+                try:
+                    buf += os.read(fd_live, 1 << 20)
+                except BlockingIOError:
+                    await asyncio.sleep(0.001)
+                    continue
+                *lines, buf = buf.split(b"\n")
+                received.extend(json.loads(line) for line in lines)
+
+        reader = asyncio.create_task(drain())
+        for _ in range(3000):
+            await served._emit("position_update", {"position": 1.0})
+            await asyncio.sleep(0)
+        await served._handle_fifo_line(_fifo_line("p", "ping", live))
+        for _ in range(200):
+            if any(m.get("id") == "p" for m in received):
+                break
+            await asyncio.sleep(0.01)
+        reader.cancel()
+        assert served._reply_clients[stalled].dropped > 0
+        assert served._reply_clients[live].dropped == 0
+        assert any(m.get("id") == "p" for m in received)
+        os.close(fd_stalled)
+        os.close(fd_live)
+
+
+class TestCommandReader:
+    @pytest.fixture
+    async def started(self, mock_miniaudio, tmp_path):
+        daemon = Daemon(tmp_path / "rt")
+        await daemon.start()
+        yield daemon
+        await daemon.stop()
+
+    @pytest.mark.asyncio
+    async def test_every_line_of_a_burst_is_handled(self, started, tmp_path):
+        path, fd = _reply_fifo(tmp_path, "r")
+        burst = "".join(_fifo_line(f"r{i}", "ping", path) + "\n" for i in range(50))
+        with open(started.cmd_pipe, "w") as f:
+            f.write(burst)
+        ids: list[str] = []
+        buf = b""
+        deadline = asyncio.get_running_loop().time() + 2.0
+        while len(ids) < 50 and asyncio.get_running_loop().time() < deadline:
+            try:
+                buf += os.read(fd, 1 << 16)
+            except BlockingIOError:
+                await asyncio.sleep(0.005)
+                continue
+            *lines, buf = buf.split(b"\n")
+            ids.extend(json.loads(line)["id"] for line in lines)
+        assert ids == [f"r{i}" for i in range(50)]
+        os.close(fd)
+
+    @pytest.mark.asyncio
+    async def test_survives_writer_hangups(self, started, tmp_path):
+        path, fd = _reply_fifo(tmp_path, "r")
+        for i in range(3):
+            with open(started.cmd_pipe, "w") as f:
+                f.write(_fifo_line(f"w{i}", "ping", path) + "\n")
+            assert (await _read_reply(fd))["id"] == f"w{i}"
+        os.close(fd)
+
+
+    @pytest.mark.asyncio
+    async def test_survives_undecodable_line(self, started, tmp_path):
+        resp = os.open(started.resp_pipe, os.O_RDONLY | os.O_NONBLOCK)
+        path, fd = _reply_fifo(tmp_path, "r")
+        with open(started.cmd_pipe, "wb") as f:
+            f.write(b"\xff\xfe\n")
+        with open(started.cmd_pipe, "w") as f:
+            f.write(_fifo_line("after", "ping", path) + "\n")
+        assert (await _read_reply(fd))["id"] == "after"
+        error = await _read_reply(resp)
+        assert error["error"]["code"] == "INVALID_MESSAGE"
+        os.close(fd)
+        os.close(resp)
+
+
+class TestStreamedResponses:
+    @pytest.mark.asyncio
+    async def test_socket_stream_reassembles(self, served, monkeypatch):
+        monkeypatch.setattr("atk.daemon.STREAM_CHUNK", 100)
+        served.queue = [f"/m/{i}.mp3" for i in range(250)]
+        client = SocketClient(served.sock_path)
+        try:
+            frames = await asyncio.to_thread(lambda: list(client.stream("queue")))
+        finally:
+            client.close()
+        assert [f["seq"] for f in frames] == [0, 1, 2, 3]
+        assert [f["more"] for f in frames] == [True, True, True, False]
+        assert frames[0]["ok"] and frames[0]["data"]["current_index"] == 0
+        tracks = [t for f in frames[:-1] for t in f["data"]["tracks"]]
+        assert [t["uri"] for t in tracks] == served.queue
+        assert [len(f["data"]["tracks"]) for f in frames[:-1]] == [100, 100, 50]
+
+    @pytest.mark.asyncio
+    async def test_stream_error_is_one_frame(self, served):
+        reader, writer = await asyncio.open_unix_connection(str(served.sock_path))
+        line = {"id": "e", "cmd": "info", "args": {"index": 5}, "stream": True}
+        writer.write((json.dumps(line) + "\n").encode())
+        await writer.drain()
+        frame = json.loads(await reader.readline())
+        assert frame["seq"] == 0 and frame["more"] is False
+        assert not frame["ok"] and "Invalid index" in frame["error"]["message"]
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_reply_fifo_stays_open_for_stream(
+        self, served, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr("atk.daemon.STREAM_CHUNK", 10)
+        monkeypatch.setattr("atk.daemon.STREAM_WINDOW", 2)
+        served.queue = [f"/m/{i}.mp3" for i in range(95)]
+        path, fd = _reply_fifo(tmp_path, "s")
+        request = json.loads(_fifo_line("s", "queue", path))
+        await served._handle_fifo_line(json.dumps({**request, "stream": True}))
+        frames: list[dict] = []
+        buf = b""
+        while not frames or frames[-1]["more"]:
+            try:
+                buf += os.read(fd, 65536)
+            except BlockingIOError:
+                await asyncio.sleep(0.001)
+                continue
+            *lines, buf = buf.split(b"\n")
+            frames.extend(json.loads(line) for line in lines)
+        assert [f["seq"] for f in frames] == list(range(11))
+        assert sum(len(f.get("data", {}).get("tracks", [])) for f in frames) == 95
+        os.close(fd)
+
+
+class TestFraming:
+    @staticmethod
+    async def _read_frame(reader) -> dict:
+        payload = await asyncio.wait_for(MSGPACK.read(reader, 1 << 20), 1.0)
+        return MSGPACK.decode(payload)
+
+    @pytest.mark.asyncio
+    async def test_msgpack_requests_events_and_streams(
+        self, served, sample_audio_file, monkeypatch
+    ):
+        monkeypatch.setattr("atk.daemon.STREAM_CHUNK", 2)
+        connect = functools.partial(SocketClient, served.sock_path, framing="msgpack")
+        client = await asyncio.to_thread(connect)
+        listener = await asyncio.to_thread(connect)
+        plain = SocketClient(served.sock_path)
+        try:
+            assert (await asyncio.to_thread(listener.request, "subscribe"))["ok"]
+            events = listener.events()
+            add = {"paths": [str(sample_audio_file)] * 3}
+            resp = await asyncio.to_thread(client.request, "add", add)
+            assert resp["ok"] and resp["v"] == 1
+            evt = await asyncio.to_thread(next, events)
+            assert evt["event"] == "queue_updated"
+            frames = await asyncio.to_thread(lambda: list(client.stream("queue")))
+            assert [f["seq"] for f in frames] == [0, 1, 2]
+            # JSON connections are unaffected
+            status = await asyncio.to_thread(plain.request, "status")
+            assert status["data"]["queue_length"] == 3
+        finally:
+            for c in (client, listener, plain):
+                c.close()
+
+    @pytest.mark.asyncio
+    async def test_reply_in_old_framing_then_switch(self, served):
+        reader, writer = await asyncio.open_unix_connection(str(served.sock_path))
+        await _request(writer, "f", "framing", {"codec": "msgpack"})
+        reply = json.loads(await reader.readline())
+        assert reply["ok"] and reply["data"]["codec"] == "msgpack"
+        writer.write(MSGPACK.encode({"id": "p", "cmd": "ping"}))
+        assert (await self._read_frame(reader))["data"]["pong"]
+        writer.write(
+            MSGPACK.encode({"id": "j", "cmd": "framing", "args": {"codec": "json"}})
+        )
+        assert (await self._read_frame(reader))["ok"]
+        await _request(writer, "p2", "ping")
+        assert json.loads(await reader.readline())["id"] == "p2"
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_malformed_frame(self, served):
+        reader, writer = await asyncio.open_unix_connection(str(served.sock_path))
+        await _request(writer, "f", "framing", {"codec": "msgpack"})
+        await reader.readline()
+        writer.write(b"\x00\x00\x00\x02\x92\x01")  # array of 2, one item
+        err = await self._read_frame(reader)
+        assert err["error"]["code"] == "INVALID_MESSAGE"
+        assert "MessagePack" in err["error"]["message"]
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_refused_with_requests_in_flight(self, served):
+        def slow_write(name, fmt, uris):
+            time.sleep(0.2)
+            return served.runtime_dir / f"{name}.{fmt}"
+
+        served._write_playlist = slow_write
+        reader, writer = await asyncio.open_unix_connection(str(served.sock_path))
+        await _request(writer, "save", "save", {"name": "x"})
+        await _request(writer, "f", "framing", {"codec": "msgpack"})
+        replies = {}
+        for _ in range(2):
+            msg = json.loads(await asyncio.wait_for(reader.readline(), 2.0))
+            replies[msg["id"]] = msg
+        assert replies["f"]["error"]["code"] == "INVALID_MESSAGE"
+        assert replies["save"]["ok"]
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_socket_only(self, served, tmp_path):
+        path, fd = _reply_fifo(tmp_path, "r")
+        args = {"codec": "msgpack"}
+        await served._handle_fifo_line(_fifo_line("f", "framing", path, args))
+        assert (await _read_reply(fd))["error"]["code"] == "INVALID_MESSAGE"
+        batch = {"commands": [{"cmd": "framing", "args": args}]}
+        resp = await served._execute({"id": "b", "cmd": "batch", "args": batch})
+        assert resp["error"]["code"] == "INVALID_ARGS"
+        os.close(fd)